@@ -3,10 +3,13 @@ Cypher Backend - Flask Application
 Main API server for CampX results retrieval and analysis
 """
 
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
 import sys
 import os
+import re
+import atexit
+from datetime import datetime
 
 # Ensure backend directory is in python path
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -19,6 +22,13 @@ from services.scraper import CampXScraper
 from services.parser import ResultsParser
 from services.analytics import AnalyticsEngine
 from services.exporter import ResultsExporter
+from services.single_flight import SingleFlight
+from services.results_cache import ResultsCache, LRUCache
+from services.ranking import get_shared_ranking_index, ranking_cgpa
+from services.subject_stats import get_shared_subject_stats
+from services.quantile_sketch import get_shared_quantile_sketches
+from services.result_diff import diff_results, result_version
+from services.results_store import ResultsStore
 
 # Initialize logger
 logger = setup_logger('api')
@@ -31,9 +41,146 @@ def create_app():
     # Initialize components
     # We initialize them here to ensure they pick up environment config at runtime
     scraper = CampXScraper()
-    parser = ResultsParser()
+    parser = ResultsParser(Config.MEMO_ENTRIES, Config.MEMO_SEMESTER_ENTRIES) if Config.MEMO_ENABLED else ResultsParser()
     analytics = AnalyticsEngine()
     exporter = ResultsExporter()
+    # Coalesces concurrent lookups of the same (hallTicket, examType)
+    flights = SingleFlight()
+    results_cache = ResultsCache() if Config.CACHE_ENABLED else None
+    # (content key per exam type) -> (merged results, analytics); read-only once stored
+    analysis_memo = LRUCache(Config.MEMO_ENTRIES) if Config.MEMO_ENABLED else None
+    # version -> response, so clients sending sinceVersion can be answered with a diff
+    result_versions = LRUCache(Config.RESULT_VERSION_ENTRIES) if Config.RESULT_VERSION_ENTRIES else None
+    # cache key -> per-semester analytics partials of the last result for that lookup
+    analytics_snapshots = LRUCache(Config.INCREMENTAL_ANALYTICS_ENTRIES) if Config.INCREMENTAL_ANALYTICS_ENABLED else None
+    ranking = get_shared_ranking_index() if Config.RANKING_ENABLED else None
+    subject_stats = get_shared_subject_stats() if Config.SUBJECT_STATS_ENABLED else None
+    sketches = get_shared_quantile_sketches() if Config.QUANTILE_SKETCH_ENABLED else None
+    results_store = ResultsStore() if Config.RESULTS_STORE_ENABLED else None
+    if results_store is not None and ranking is not None and not ranking.stats()['students']:
+        seeded = results_store.seed_ranking(ranking)
+        if seeded:
+            logger.info(f"Seeded ranking index with {seeded} stored students")
+    if scraper.negative_cache:
+        atexit.register(scraper.negative_cache.save_if_dirty)
+    if sketches is not None and Config.QUANTILE_SKETCH_PATH:
+        atexit.register(sketches.save_if_dirty, Config.QUANTILE_SKETCH_PATH)
+    
+    def feeds_cohort(exam_types):
+        """
+        Only plain general lookups stand for the student in the cohort indexes
+        (ranking, subject statistics, sketches, results store). Merged lookups
+        replace failed attempts with later passes, so letting them in too would
+        flip a student between two shapes depending on which ran last.
+        """
+        return tuple(exam_types) == ('general',)
+    
+    def run_pipeline(hall_ticket, exam_types, view_type, cache_key):
+        """
+        Scrape -> parse -> analyze for one lookup, caching successful responses.
+        Several exam types are fetched concurrently and merged into one result.
+        Returns: (response dict, None) or (None, error message)
+        """
+        # Scrape
+        if len(exam_types) == 1:
+            raw_by_type = {exam_types[0]: scraper.fetch_results(hall_ticket, exam_types[0], view_type)}
+        else:
+            raw_by_type = scraper.fetch_results_multi(hall_ticket, exam_types, view_type)
+        raw_by_type = {exam_type: raw for exam_type, raw in raw_by_type.items() if raw}
+        if not raw_by_type:
+            return None, 'Failed to retrieve results. Please check hall ticket.'
+        
+        # Parse
+        keyed = [parser.parse_compact_keyed(raw) for raw in raw_by_type.values()]
+        memo_key = tuple(key for key, _ in keyed)
+        memoized = analysis_memo.get(memo_key) if analysis_memo is not None and all(memo_key) else None
+        if memoized is not None:
+            # Upstream returned the same data as an earlier fetch
+            results_data, analytics_data, version = memoized
+        else:
+            results_data = parser.merge_parsed_results([compact.to_dict() for _, compact in keyed if compact is not None])
+            if not results_data:
+                return None, 'Unable to parse results from response.'
+            
+            # Analyze, re-scanning only semesters that changed since this lookup last ran
+            if analytics_snapshots is not None:
+                analytics_data, snapshot = analytics.calculate_incremental(
+                    results_data, analytics_snapshots.get(cache_key),
+                    parser.semester_keys(compact for _, compact in keyed))
+                if snapshot is not None:
+                    analytics_snapshots.set(cache_key, snapshot)
+            else:
+                analytics_data = analytics.calculate_analytics(results_data)
+            version = result_version(results_data)
+            if analysis_memo is not None and all(memo_key):
+                analysis_memo.set(memo_key, (results_data, analytics_data, version))
+        # Subject statistics keep one contribution per student
+        if subject_stats is not None and feeds_cohort(exam_types):
+            subject_stats.ingest(results_data)
+        
+        # Response
+        response = {
+            **results_data,
+            'analytics': analytics_data,
+            'version': version
+        }
+        if len(exam_types) > 1:
+            response['examTypes'] = list(raw_by_type)
+        
+        if results_cache:
+            results_cache.set(cache_key, response)
+        if results_store is not None and feeds_cohort(exam_types):
+            results_store.upsert(response, exam_types)
+        return response, None
+    
+    def observe_result(response, exam_types):
+        """
+        Feed the cohort indexes and attach rank / percentile. Ranks move as the
+        cohort fills in, so they go on a shallow copy and are never cached.
+        Cached results from other workers count toward this worker's subject
+        statistics the first time it serves them.
+        """
+        student_info = response.get('studentInfo', {})
+        hall_ticket = student_info.get('hallTicket')
+        if not hall_ticket:
+            return response
+        complete = feeds_cohort(exam_types)
+        if complete and subject_stats is not None and not subject_stats.has_student(hall_ticket):
+            subject_stats.ingest(response)
+        # Sketches keep the first observation of a student for good
+        if complete and sketches is not None:
+            sketches.ingest(response)
+        if ranking is None:
+            return response
+        if complete:
+            ranking.update(hall_ticket, student_info.get('batch'), student_info.get('program'),
+                           ranking_cgpa(response), student_info.get('name'))
+        return {**response, 'ranking': ranking.rank(hall_ticket)}
+    
+    def versioned(response, since_version):
+        """
+        Remember the response under its version and, when the client already
+        holds since_version, answer with only what changed since then. An
+        unknown since_version (evicted, other worker) gets the full response.
+        """
+        version = response.get('version')
+        if result_versions is None or not version:
+            return response
+        result_versions.set(version, response)
+        if not since_version:
+            return response
+        if since_version == version:
+            return {'version': version, 'unchanged': True}
+        previous = result_versions.get(since_version)
+        hall_ticket = response.get('studentInfo', {}).get('hallTicket')
+        if previous is None or previous.get('studentInfo', {}).get('hallTicket') != hall_ticket:
+            return response
+        return {
+            'version': version,
+            'sinceVersion': since_version,
+            'diff': diff_results(previous, response),
+            **({'ranking': response['ranking']} if 'ranking' in response else {})
+        }
     
     @app.route('/api/health', methods=['GET'])
     def health_check():
@@ -45,6 +192,24 @@ def create_app():
             'version': '1.0.1'
         })
 
+    @app.route('/api/metrics', methods=['GET'])
+    def metrics():
+        """Operational counters for the fetch pipeline"""
+        return jsonify({
+            'singleFlight': flights.stats(),
+            'rateLimiter': scraper.rate_limiter.stats() if scraper.rate_limiter else None,
+            'resultsCache': results_cache.stats() if results_cache else None,
+            'negativeCache': scraper.negative_cache.stats() if scraper.negative_cache else None,
+            'circuitBreaker': scraper.circuit_breaker.stats(),
+            'hedging': scraper.hedger.stats() if scraper.hedger else None,
+            'ranking': ranking.stats() if ranking else None,
+            'subjectStats': subject_stats.stats() if subject_stats else None,
+            'quantileSketches': sketches.stats() if sketches else None,
+            'resultsStore': results_store.stats() if results_store is not None else None,
+            'memo': {**parser.memo_stats(), 'analysis': analysis_memo.stats()} if analysis_memo is not None else None,
+            'incrementalAnalytics': analytics_snapshots.stats() if analytics_snapshots is not None else None
+        })
+
     @app.route('/api/fetch-results', methods=['POST'])
     def fetch_results():
         """Fetch results from CampX"""
@@ -55,7 +220,11 @@ def create_app():
                 
             hall_ticket = data.get('hallTicket')
             exam_type = data.get('examType', '')
+            # Optional list of exam types to fetch concurrently and merge
+            exam_types = data.get('examTypes') or [exam_type]
             view_type = data.get('viewType', 'All Semesters')
+            # Version the client already holds; answered with a diff when known
+            since_version = data.get('sinceVersion')
             
             if not hall_ticket:
                 logger.warning("Fetch request missing hall ticket")
@@ -73,42 +242,234 @@ def create_app():
                 logger.warning(f"Invalid hall ticket: {error_msg}")
                 return jsonify({'error': error_msg}), 400
             
-            if exam_type:
-                is_valid, error_msg = validate_exam_type(exam_type)
-                if not is_valid:
-                    logger.warning(f"Invalid exam type: {error_msg}")
-                    return jsonify({'error': error_msg}), 400
+            if since_version is not None and (not isinstance(since_version, str) or len(since_version) > 64):
+                return jsonify({'error': 'sinceVersion must be a version string from an earlier response'}), 400
+            
+            if not isinstance(exam_types, list) or len(exam_types) > 5:
+                return jsonify({'error': 'examTypes must be a list of up to 5 exam types'}), 400
+            for requested_type in exam_types:
+                if not isinstance(requested_type, str):
+                    return jsonify({'error': 'examTypes must be a list of up to 5 exam types'}), 400
+                if requested_type:
+                    is_valid, error_msg = validate_exam_type(requested_type)
+                    if not is_valid:
+                        logger.warning(f"Invalid exam type: {error_msg}")
+                        return jsonify({'error': error_msg}), 400
+            exam_types = tuple(dict.fromkeys((t or 'general').lower() for t in exam_types))
             
             logger.info(f"Fetching results for {hall_ticket}")
             
-            # Scrape
-            api_data = scraper.fetch_results(hall_ticket, exam_type, view_type)
-            if not api_data:
-                return jsonify({'error': 'Failed to retrieve results. Please check hall ticket.'}), 404
+            key = (hall_ticket.upper(), '+'.join(exam_types))
+            cache_key = ':'.join(key)
             
-            # Parse
-            results_data = parser.parse_api_response(api_data)
-            if not results_data:
-                return jsonify({'error': 'Unable to parse results from response.'}), 404
+            if results_cache:
+                cached = results_cache.get(cache_key)
+                if cached is not None:
+                    logger.info(f"Serving cached results for {hall_ticket}")
+                    return jsonify(versioned(observe_result(cached, exam_types), since_version)), 200
+                
+                # Don't queue behind a down upstream or a running refresh when
+                # a last known good result exists
+                if scraper.circuit_breaker.is_open:
+                    stale_reason = 'upstream-unavailable'
+                elif flights.in_flight(key):
+                    stale_reason = 'refreshing'
+                else:
+                    stale_reason = None
+                if stale_reason:
+                    stale = results_cache.get_stale(cache_key)
+                    if stale is not None:
+                        logger.info(f"Serving stale results for {hall_ticket} ({stale_reason})")
+                        return jsonify({**versioned(observe_result(stale, exam_types), since_version), 'stale': True, 'staleReason': stale_reason}), 200
             
-            # Analyze
-            analytics_data = analytics.calculate_analytics(results_data)
+            (response, error), shared = flights.do(key, run_pipeline, hall_ticket, exam_types, view_type, cache_key)
+            if shared:
+                logger.info(f"Coalesced lookup for {hall_ticket} onto in-flight request")
             
-            # Response
-            response = {
-                **results_data,
-                'analytics': analytics_data
-            }
+            if error:
+                stale = results_cache.get_stale(cache_key) if results_cache else None
+                if stale is not None:
+                    logger.warning(f"Refresh failed for {hall_ticket}, serving stale results")
+                    return jsonify({**versioned(observe_result(stale, exam_types), since_version), 'stale': True, 'staleReason': 'refresh-failed'}), 200
+                if scraper.circuit_breaker.is_open:
+                    return jsonify({'error': 'Results service is temporarily unavailable. Please try again shortly.'}), 503
+                return jsonify({'error': error}), 404
             
-            return jsonify(response), 200
+            return jsonify(versioned(observe_result(response, exam_types), since_version)), 200
             
         except Exception as e:
             logger.error(f"API Error: {str(e)}")
             return jsonify({'error': f'Internal server error: {str(e)}'}), 500
 
+    @app.route('/api/ranking/top', methods=['GET'])
+    def ranking_top():
+        """Top students by CGPA in a batch, optionally narrowed to a program"""
+        if ranking is None:
+            return jsonify({'error': 'Ranking is disabled'}), 404
+        
+        batch = request.args.get('batch')
+        program = request.args.get('program')
+        if not batch:
+            return jsonify({'error': 'batch is required'}), 400
+        try:
+            k = int(request.args.get('k', 10))
+        except ValueError:
+            return jsonify({'error': 'k must be an integer'}), 400
+        if not 1 <= k <= 100:
+            return jsonify({'error': 'k must be between 1 and 100'}), 400
+        
+        return jsonify({
+            'batch': batch,
+            'program': program,
+            'students': ranking.top(batch, program, k)
+        }), 200
+
+    @app.route('/api/stats/subjects', methods=['GET'])
+    def subject_statistics():
+        """Marks mean / std dev, pass rate and grade histogram per subject in a batch"""
+        if subject_stats is None:
+            return jsonify({'error': 'Subject statistics are disabled'}), 404
+        
+        batch = request.args.get('batch')
+        code = request.args.get('code')
+        if not batch:
+            return jsonify({'error': 'batch is required'}), 400
+        
+        if code:
+            stats = subject_stats.get(batch, code.upper())
+            if stats is None:
+                return jsonify({'error': f'No results seen for {code} in batch {batch}'}), 404
+            return jsonify(stats), 200
+        return jsonify({'batch': batch, 'subjects': subject_stats.batch_subjects(batch)}), 200
+
+    @app.route('/api/stats/percentile', methods=['GET'])
+    def cohort_percentile():
+        """
+        Approximate percentile of a CGPA / SGPA / marks value in a cohort,
+        or with q=<0..1> the value at that fraction of the cohort
+        """
+        if sketches is None:
+            return jsonify({'error': 'Percentile sketches are disabled'}), 404
+        
+        metric = request.args.get('metric', 'cgpa')
+        batch = request.args.get('batch')
+        program = request.args.get('program')
+        detail = None
+        if metric == 'sgpa':
+            detail = request.args.get('semester')
+            if not detail or not detail.isdigit():
+                return jsonify({'error': 'semester is required for sgpa'}), 400
+            detail = int(detail)
+        elif metric == 'marks':
+            detail = (request.args.get('code') or '').upper()
+            if not detail:
+                return jsonify({'error': 'code is required for marks'}), 400
+        elif metric != 'cgpa':
+            return jsonify({'error': 'metric must be one of cgpa, sgpa, marks'}), 400
+        
+        try:
+            if 'q' in request.args:
+                q = float(request.args['q'])
+                if not 0 <= q <= 1:
+                    raise ValueError
+                result = sketches.quantile(metric, q, batch, program, detail)
+            else:
+                result = sketches.percentile(metric, float(request.args['value']), batch, program, detail)
+        except (KeyError, ValueError):
+            return jsonify({'error': 'value (number) or q (0-1) is required'}), 400
+        
+        if result is None:
+            return jsonify({'error': 'No results seen for that cohort'}), 404
+        return jsonify({'metric': metric, 'batch': batch, 'program': program, **result}), 200
+
+    @app.route('/api/cohort/subject-results', methods=['GET'])
+    def cohort_subject_results():
+        """
+        Stored attempts of one subject, filtered by batch / program / grade /
+        exam month (e.g. every F in CS101 for batch 2022)
+        """
+        if results_store is None:
+            return jsonify({'error': 'Results store is disabled'}), 404
+        
+        code = (request.args.get('code') or '').upper()
+        if not code:
+            return jsonify({'error': 'code is required'}), 400
+        try:
+            limit = min(max(int(request.args.get('limit', 100)), 1), 1000)
+            offset = max(int(request.args.get('offset', 0)), 0)
+        except ValueError:
+            return jsonify({'error': 'limit and offset must be integers'}), 400
+        
+        grade = request.args.get('grade')
+        filters = {
+            'batch': request.args.get('batch'),
+            'program': request.args.get('program'),
+            'grade': grade.upper() if grade else None,
+            'examMonth': request.args.get('examMonth')
+        }
+        results = results_store.subject_results(
+            code, filters['batch'], filters['program'], filters['grade'], filters['examMonth'], limit, offset)
+        return jsonify({'code': code, **filters, 'offset': offset, 'count': len(results), 'results': results}), 200
+
+    @app.route('/api/cohort/summary', methods=['GET'])
+    def cohort_summary():
+        """CGPA distribution, pass rate and backlog counts for a batch / program"""
+        if results_store is None:
+            return jsonify({'error': 'Results store is disabled'}), 404
+        
+        summary = results_store.cohort_summary(request.args.get('batch'), request.args.get('program'))
+        if summary is None:
+            return jsonify({'error': 'No results stored for that cohort'}), 404
+        return jsonify(summary), 200
+
+    @app.route('/api/cohort/subject-difficulty', methods=['GET'])
+    def cohort_subject_difficulty():
+        """Subjects of a batch / program ranked by fail rate"""
+        if results_store is None:
+            return jsonify({'error': 'Results store is disabled'}), 404
+        
+        try:
+            limit = min(max(int(request.args.get('limit', 10)), 1), 1000)
+            min_attempts = max(int(request.args.get('minAttempts', 1)), 1)
+        except ValueError:
+            return jsonify({'error': 'limit and minAttempts must be integers'}), 400
+        order = request.args.get('order', 'hardest')
+        if order not in ('hardest', 'easiest'):
+            return jsonify({'error': 'order must be hardest or easiest'}), 400
+        
+        batch, program = request.args.get('batch'), request.args.get('program')
+        subjects = results_store.subject_difficulty(batch, program, limit, min_attempts, order == 'easiest')
+        return jsonify({'batch': batch, 'program': program, 'order': order, 'subjects': subjects}), 200
+
+    def csv_download(chunks, name):
+        """
+        Stream CSV chunks straight into the response as {name}_{timestamp}.csv.
+        No Content-Length is known up front, so the server sends it with
+        chunked transfer encoding.
+        """
+        filename = f"{re.sub(r'[^A-Za-z0-9]+', '_', str(name))}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        return Response(
+            stream_with_context(chunks),
+            mimetype='text/csv',
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+        )
+
+    @app.route('/api/cohort/export', methods=['GET'])
+    def export_cohort():
+        """Stream every stored subject attempt of a batch / program as CSV"""
+        if results_store is None:
+            return jsonify({'error': 'Results store is disabled'}), 404
+        
+        batch, program = request.args.get('batch'), request.args.get('program')
+        logger.info(f"Cohort export requested for batch={batch} program={program}")
+        return csv_download(
+            exporter.stream_cohort_csv(results_store.iter_subject_rows(batch, program)),
+            '_'.join(filter(None, ('cohort', batch or 'all', program)))
+        )
+
     @app.route('/api/export', methods=['POST'])
     def export_results():
-        """Export results to CSV or Excel"""
+        """Export results to CSV (streamed) or Excel"""
         try:
             data = request.get_json()
             results_data = data.get('data')
@@ -119,6 +480,10 @@ def create_app():
             
             logger.info(f"Export requested for format: {export_format}")
             
+            if export_format.lower() != 'excel':
+                hall_ticket = results_data.get('studentInfo', {}).get('hallTicket') or 'unknown'
+                return csv_download(exporter.stream_csv(results_data), f"results_{hall_ticket}")
+            
             file_path = exporter.export(results_data, export_format)
             
             if not file_path or not os.path.exists(file_path):
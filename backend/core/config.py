@@ -16,6 +16,88 @@ class Config:
     CAMPX_INSTITUTION_CODE = os.getenv('CAMPX_INSTITUTION_CODE')
     CAMPX_TENANT_ID = os.getenv('CAMPX_TENANT_ID')
     
+    # Upstream Connection Settings
+    # Connections kept alive per upstream host (shared by all request threads)
+    CAMPX_POOL_SIZE = int(os.getenv('CAMPX_POOL_SIZE', 20))
+    # Number of distinct upstream hosts to keep pools for
+    CAMPX_POOL_HOSTS = int(os.getenv('CAMPX_POOL_HOSTS', 4))
+    CAMPX_TIMEOUT = float(os.getenv('CAMPX_TIMEOUT', 10))
+    
+    # Batch Fetch Settings
+    # Keep at or below CAMPX_POOL_SIZE so every in-flight lookup gets a pooled connection
+    BATCH_CONCURRENCY = int(os.getenv('BATCH_CONCURRENCY', 10))
+    
+    # Upstream Rate Limiting (AIMD token bucket, per tenant)
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'True').lower() == 'true'
+    RATE_LIMIT_INITIAL = float(os.getenv('RATE_LIMIT_INITIAL', 20))    # requests/second
+    RATE_LIMIT_MIN = float(os.getenv('RATE_LIMIT_MIN', 1))
+    RATE_LIMIT_MAX = float(os.getenv('RATE_LIMIT_MAX', 200))
+    RATE_LIMIT_INCREASE = float(os.getenv('RATE_LIMIT_INCREASE', 1))   # req/s gained per second of healthy traffic
+    RATE_LIMIT_DECREASE = float(os.getenv('RATE_LIMIT_DECREASE', 0.5)) # multiplier applied on 429/503/timeout
+    RATE_LIMIT_BURST = float(os.getenv('RATE_LIMIT_BURST', 20))
+    
+    # Hedged Requests (send a second copy when the first is slower than recent traffic)
+    HEDGE_ENABLED = os.getenv('HEDGE_ENABLED', 'False').lower() == 'true'
+    HEDGE_PERCENTILE = float(os.getenv('HEDGE_PERCENTILE', 95))
+    HEDGE_BUDGET = float(os.getenv('HEDGE_BUDGET', 0.1))  # max hedges as a fraction of requests
+    HEDGE_MIN_SAMPLES = int(os.getenv('HEDGE_MIN_SAMPLES', 20))
+    
+    # Upstream Circuit Breaker
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', 5))   # consecutive failures to open
+    CIRCUIT_RECOVERY_TIMEOUT = float(os.getenv('CIRCUIT_RECOVERY_TIMEOUT', 30))  # seconds before a half-open probe
+    CIRCUIT_HALF_OPEN_PROBES = int(os.getenv('CIRCUIT_HALF_OPEN_PROBES', 1))
+    
+    # Results Cache Settings (in-process LRU in front of a shared SQLite store)
+    CACHE_ENABLED = os.getenv('CACHE_ENABLED', 'True').lower() == 'true'
+    CACHE_DIR = os.getenv('CACHE_DIR', './cache')
+    CACHE_TTL = int(os.getenv('CACHE_TTL', 6 * 60 * 60))  # seconds
+    CACHE_MEMORY_ENTRIES = int(os.getenv('CACHE_MEMORY_ENTRIES', 1024))
+    CACHE_MEMORY_MAX_BYTES = int(os.getenv('CACHE_MEMORY_MAX_BYTES', 64 * 1024 * 1024))  # serialised size
+    CACHE_MAX_BYTES = int(os.getenv('CACHE_MAX_BYTES', 256 * 1024 * 1024))
+    # How long expired results are kept to serve (marked stale) during upstream incidents
+    CACHE_STALE_TTL = int(os.getenv('CACHE_STALE_TTL', 7 * 24 * 60 * 60))
+    
+    # Negative Cache Settings (not-found hall tickets, Bloom filter persisted in CACHE_DIR)
+    NEGATIVE_CACHE_ENABLED = os.getenv('NEGATIVE_CACHE_ENABLED', 'True').lower() == 'true'
+    NEGATIVE_CACHE_TTL = int(os.getenv('NEGATIVE_CACHE_TTL', 15 * 60))  # seconds
+    NEGATIVE_CACHE_CAPACITY = int(os.getenv('NEGATIVE_CACHE_CAPACITY', 100000))
+    NEGATIVE_CACHE_ERROR_RATE = float(os.getenv('NEGATIVE_CACHE_ERROR_RATE', 0.0001))
+    
+    # Raw Response Archive ('off', 'record' or 'replay')
+    ARCHIVE_MODE = os.getenv('ARCHIVE_MODE', 'off').lower()
+    ARCHIVE_DIR = os.getenv('ARCHIVE_DIR', './archive')
+    
+    # Cohort Ranking (in-memory, fed by fetched results)
+    RANKING_ENABLED = os.getenv('RANKING_ENABLED', 'True').lower() == 'true'
+    RANKING_RESOLUTION = int(os.getenv('RANKING_RESOLUTION', 100))  # CGPA buckets per grade point
+    
+    # Per-subject cohort statistics (in-memory, fed by fetched results)
+    SUBJECT_STATS_ENABLED = os.getenv('SUBJECT_STATS_ENABLED', 'True').lower() == 'true'
+    
+    # Percentile Sketches (KLL; CGPA, SGPA and subject marks)
+    QUANTILE_SKETCH_ENABLED = os.getenv('QUANTILE_SKETCH_ENABLED', 'True').lower() == 'true'
+    QUANTILE_SKETCH_ERROR = float(os.getenv('QUANTILE_SKETCH_ERROR', 0.01))  # target rank error (fraction)
+    # Optional seed, e.g. quantiles.json written by scripts/reprocess_archive.py; live ingests are saved back to it
+    QUANTILE_SKETCH_PATH = os.getenv('QUANTILE_SKETCH_PATH', '')
+    QUANTILE_SKETCH_SAVE_INTERVAL = int(os.getenv('QUANTILE_SKETCH_SAVE_INTERVAL', 300))  # seconds
+    QUANTILE_SKETCH_STUDENTS = int(os.getenv('QUANTILE_SKETCH_STUDENTS', 200000))  # seen-student filter capacity
+    
+    # Content-hash memo of parse / analytics output (per worker, LRU)
+    MEMO_ENABLED = os.getenv('MEMO_ENABLED', 'True').lower() == 'true'
+    MEMO_ENTRIES = int(os.getenv('MEMO_ENTRIES', 1024))  # parsed responses and analysed lookups
+    MEMO_SEMESTER_ENTRIES = int(os.getenv('MEMO_SEMESTER_ENTRIES', 8192))  # parsed semester blocks
+    
+    # Persistent results store (SQLite, shared by workers) for cohort queries
+    RESULTS_STORE_ENABLED = os.getenv('RESULTS_STORE_ENABLED', 'True').lower() == 'true'
+    RESULTS_STORE_PATH = os.getenv('RESULTS_STORE_PATH', os.path.join(CACHE_DIR, 'results_store.db'))
+    
+    # Result versions kept for sinceVersion diffs (per worker, LRU; 0 disables diffs)
+    RESULT_VERSION_ENTRIES = int(os.getenv('RESULT_VERSION_ENTRIES', 2048))
+    
+    # Incremental analytics: per-semester partials kept per lookup (per worker, LRU)
+    INCREMENTAL_ANALYTICS_ENABLED = os.getenv('INCREMENTAL_ANALYTICS_ENABLED', 'False').lower() == 'true'
+    INCREMENTAL_ANALYTICS_ENTRIES = int(os.getenv('INCREMENTAL_ANALYTICS_ENTRIES', 1024))
+    
     # Test Settings
     EX_HTN = os.getenv('EX_HTN')
     
@@ -3,11 +3,18 @@ Cypher Analytics Engine
 Computes GPA, trends, and summarizes performance data.
 """
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import logging
 
+import numpy as np
+
 logger = logging.getLogger('api')
 
+
+def _number(value: float):
+    """int when whole (backlog counts), else float"""
+    return int(value) if value.is_integer() else value
+
 class AnalyticsEngine:
     """Engine for processing parsed results and generating insights"""
     
@@ -15,6 +22,7 @@ class AnalyticsEngine:
         'O': 10, 'A+': 9, 'A': 8, 'B+': 7, 'B': 6, 'C': 5, 'P': 4,
         'F': 0, 'AB': 0, 'I': 0, 'MALPRACTICE': 0
     }
+    FAILED_GRADES = frozenset(['F', 'AB', 'I', 'ABSENT', 'MALPRACTICE'])
 
     def calculate_analytics(self, results_data: Dict) -> Dict:
         """
@@ -25,10 +33,110 @@ class AnalyticsEngine:
         semester_info = results_data.get('semesterInfo', {})
         summary = results_data.get('summary', {})
         
+        marks_summary = summary.get('marks', {})
+        need_marks = not marks_summary or marks_summary.get('total', 0) == 0
+        sgpa_semesters = self._sgpa_semesters(semester_info)
+        scan = self._scan_subjects(subjects, need_marks, not summary.get('credits'), sgpa_semesters)
+        return self._assemble(results_data, scan, sgpa_semesters is not None)
+
+    def calculate_incremental(self, results_data: Dict, previous: Optional[Dict] = None,
+                              semester_keys: Optional[Dict] = None) -> Tuple[Dict, Optional[Dict]]:
+        """
+        calculate_analytics from per-semester partial sums (grade points x
+        credits, credits, pass / fail counts, marks). previous is the snapshot
+        returned for an earlier version of the same lookup: semesters whose
+        subjects are unchanged reuse its partials, so after a supplementary or
+        revaluation result only the affected semesters are scanned before the
+        partials are folded into the cumulative totals.
+        
+        semester_keys (ResultsParser.semester_keys) identifies unchanged
+        semesters by content key; without it subjects are compared by value,
+        which costs about as much as scanning them again.
+        
+        Returns (analytics, snapshot). The output equals calculate_analytics
+        up to floating-point summation order. Falls back to the full
+        calculation (snapshot None) when semester numbers repeat or subjects
+        sit outside semesterInfo.
+        """
+        subjects = results_data.get('subjects', [])
+        semester_info = results_data.get('semesterInfo', {})
+        semesters = semester_info.get('semesters', [])
+        if (self._sgpa_semesters(semester_info) is None
+                or sum(len(sem.get('subjects', [])) for sem in semesters) != len(subjects)):
+            return self.calculate_analytics(results_data), None
+        
+        previous_parts = previous.get('semesters', {}) if previous else {}
+        parts = {}
+        recomputed = 0
+        for sem in semesters:
+            sem_num = sem.get('semester')
+            sem_subjects = sem.get('subjects', [])
+            key = semester_keys.get(sem_num) if semester_keys else None
+            part = previous_parts.get(sem_num)
+            if part is None:
+                unchanged = False
+            elif key is not None:
+                unchanged = part['key'] == key
+            else:
+                unchanged = part['subjects'] is sem_subjects or part['subjects'] == sem_subjects
+            if not unchanged:
+                part = self._scan_subjects(sem_subjects, True, True, {sem_num})
+                part['subjects'] = sem_subjects
+                part['key'] = key
+                recomputed += 1
+            parts[sem_num] = part
+        
+        scan = self._fold_partials(parts.values(), len(subjects))
+        return self._assemble(results_data, scan, True), {'semesters': parts, 'recomputed': recomputed}
+
+    def _fold_partials(self, parts, total_subjects: int) -> Dict:
+        """Combine per-semester _scan_subjects outputs into one, in semester order"""
+        gpa_points = gpa_credits = 0
+        credits_total = credits_earned = 0
+        marks_obtained = marks_max = 0
+        failed = 0
+        distribution = {}
+        failed_subjects = []
+        semesters = {}
+        for part in parts:
+            gpa_points += part['gpaPoints']
+            gpa_credits += part['gpaCredits']
+            credits_total += part['creditsTotal']
+            credits_earned += part['creditsEarned']
+            marks_obtained += part['marksObtained']
+            marks_max += part['marksMax']
+            failed += part['failed']
+            failed_subjects.extend(part['failedSubjects'])
+            for grade, count in part['distribution'].items():
+                distribution[grade] = distribution.get(grade, 0) + count
+            semesters.update(part['semesters'])
+        
+        return {
+            'gpaPoints': gpa_points,
+            'gpaCredits': gpa_credits,
+            'distribution': distribution,
+            'passed': total_subjects - failed,
+            'failed': failed,
+            'failedSubjects': failed_subjects,
+            'creditsTotal': credits_total,
+            'creditsEarned': credits_earned,
+            'marks': {'obtained': int(marks_obtained), 'total': int(marks_max)},
+            'semesters': semesters
+        }
+
+    def _assemble(self, results_data: Dict, scan: Dict, fused_trends: bool) -> Dict:
+        """
+        Analytics dict from a subject scan. Like before, fills in
+        summary['marks'] and missing semester SGPAs on results_data.
+        """
+        subjects = results_data.get('subjects', [])
+        semester_info = results_data.get('semesterInfo', {})
+        summary = results_data.get('summary', {})
+        
         # Calculate Percentage (Use summary or calculate manual)
         marks_summary = summary.get('marks', {})
         if not marks_summary or marks_summary.get('total', 0) == 0:
-            marks_summary = self._calculate_marks_summary(subjects)
+            marks_summary = scan['marks']
             if 'marks' not in summary: summary['marks'] = {}
             summary['marks'].update(marks_summary)
              
@@ -38,14 +146,33 @@ class AnalyticsEngine:
             total = marks_summary.get('total', 0)
             percentage = round((obtained / total) * 100, 2)
         
+        backlog_summary = summary.get('backlogs')
+        official_failed_count = backlog_summary.get('due', scan['failed']) if backlog_summary else scan['failed']
+        credits_summary_data = summary.get('credits')
+        if credits_summary_data:
+            credits_summary = {
+                'total': credits_summary_data.get('total', 0),
+                'earned': credits_summary_data.get('obtained', 0)
+            }
+        else:
+            credits_summary = {
+                'total': round(scan['creditsTotal'], 1),
+                'earned': round(scan['creditsEarned'], 1)
+            }
+        
         analytics = {
             'totalSubjects': len(subjects),
-            'gpa': self._calculate_gpa(subjects),
-            'gradeDistribution': self._grade_distribution(subjects),
-            'passFailStatus': self._pass_fail_status(subjects, summary.get('backlogs')),
-            'creditsSummary': self._credits_summary(subjects, summary.get('credits')),
+            'gpa': round(scan['gpaPoints'] / scan['gpaCredits'], 2) if scan['gpaCredits'] else None,
+            'gradeDistribution': scan['distribution'],
+            'passFailStatus': {
+                'passed': scan['passed'],
+                'failed': official_failed_count,
+                'failedSubjects': scan['failedSubjects'],
+                'overallStatus': 'All Clear' if official_failed_count == 0 else f'{official_failed_count} Active Backlog(s)'
+            },
+            'creditsSummary': credits_summary,
             'performanceLevel': None,
-            'trends': self._calculate_trends(semester_info),
+            'trends': self._fused_trends(semester_info, scan['semesters'] if fused_trends else None),
             'overallPercentage': percentage,
             'rawSummary': summary
         }
@@ -56,100 +183,275 @@ class AnalyticsEngine:
             
         return analytics
 
-    def _calculate_gpa(self, subjects: List[Dict]) -> Optional[float]:
-        """Calculate Cumulative GPA (CGPA)"""
-        total_points = 0
-        total_credits = 0
+    def _scan_subjects(self, subjects: List[Dict], need_marks: bool = False, need_credits: bool = True,
+                       sgpa_semesters=()) -> Dict:
+        """
+        Fused single pass over the flat subject list. Each subject's grade and
+        credits are normalised once and feed every aggregate; the result is
+        equal to the one-pass-per-aspect reference in
+        tests/benchmarks/analytics_reference.py, which the unit tests check.
+        Fallback-only sums (marks, credits, SGPA for sgpa_semesters) are
+        skipped when the API already supplied them.
+        """
+        grade_points_table = self.GRADE_POINTS
+        failed_grades = self.FAILED_GRADES
+        gpa_points = gpa_credits = 0
+        credits_total = credits_earned = 0
+        marks_obtained = marks_max = 0
+        failed = 0
+        distribution = {}
+        failed_subjects = []
+        semesters = {}      # semester -> [points, credits], only for sgpa_semesters
         
         for sub in subjects:
-            grade = sub.get('grade', '').upper()
+            raw_grade = sub.get('grade', 'N/A')
+            grade = raw_grade.upper() if 'grade' in sub else ''
             credits_str = sub.get('credits', '0')
-            
             try:
                 credits = float(credits_str) if credits_str else 0
             except (ValueError, TypeError):
                 credits = 0
-                
-            if grade in self.GRADE_POINTS:
-                points = self.GRADE_POINTS[grade]
-                total_points += (points * credits)
-                total_credits += credits
-        
-        if total_credits == 0:
-            return None
+            table_points = grade_points_table.get(grade)
             
-        return round(total_points / total_credits, 2)
-
-    def _grade_distribution(self, subjects: List[Dict]) -> Dict:
-        """Count occurrences of each grade"""
-        distribution = {}
-        for sub in subjects:
-            grade = sub.get('grade', 'N/A')
-            distribution[grade] = distribution.get(grade, 0) + 1
-        return distribution
-    
-    def _pass_fail_status(self, subjects: List[Dict], backlog_summary: Dict = None) -> Dict:
-        """Determine pass/fail status with soft wording"""
-        failed_subjects = []
-        passed = 0
-        failed = 0
-        
-        # Manual count for subject list
-        for subject in subjects:
-            status = subject.get('status', {})
-            is_passed = status.get('passed')
-            grade = subject.get('grade', '').upper()
+            distribution[raw_grade] = distribution.get(raw_grade, 0) + 1
             
-            if is_passed is None:
-                is_failed = grade in ['F', 'AB', 'I', 'ABSENT', 'MALPRACTICE']
-            else:
-                is_failed = not is_passed
-                
-            if is_failed:
+            if table_points is not None:
+                gpa_points += table_points * credits
+                gpa_credits += credits
+            
+            status = sub.get('status')
+            is_passed = status.get('passed') if status else None
+            if (grade in failed_grades) if is_passed is None else not is_passed:
                 failed += 1
                 failed_subjects.append({
-                    'name': subject.get('name', 'Unknown Subject'),
-                    'code': subject.get('code', ''),
+                    'name': sub.get('name', 'Unknown Subject'),
+                    'code': sub.get('code', ''),
                     'grade': grade,
-                    'semester': subject.get('semester')
+                    'semester': sub.get('semester')
                 })
-            else:
-                passed += 1
-        
-        # Use official backlog count if available
-        official_failed_count = backlog_summary.get('due', failed) if backlog_summary else failed
+            
+            if need_credits:
+                credits_total += credits
+                if is_passed:
+                    credits_earned += credits
+            
+            # SGPA fallback sums: API grade points first, then the grade table
+            if sgpa_semesters and sub.get('semester') in sgpa_semesters:
+                points = sub.get('gradePoints')
+                if points is not None or table_points is not None:
+                    acc = semesters.get(sub.get('semester'))
+                    if acc is None:
+                        acc = semesters[sub.get('semester')] = [0, 0]
+                    acc[0] += (float(points) if points is not None else table_points) * credits
+                    acc[1] += credits
+            
+            if need_marks:
+                max_marks = sub.get('maxMarks', {})
+                subject_total = float(max_marks.get('internal') or 0) + float(max_marks.get('external') or 0)
+                if subject_total > 0:
+                    marks_str = str(sub.get('marks', ''))
+                    marks_max += subject_total
+                    try:
+                        marks_obtained += float(marks_str) if marks_str.replace('.', '').isdigit() else 0
+                    except ValueError:
+                        # e.g. '1.2.3' or superscript digits pass isdigit() but not float()
+                        pass
         
         return {
-            'passed': passed,
-            'failed': official_failed_count,
+            'gpaPoints': gpa_points,
+            'gpaCredits': gpa_credits,
+            'distribution': distribution,
+            'passed': len(subjects) - failed,
+            'failed': failed,
             'failedSubjects': failed_subjects,
-            'overallStatus': 'All Clear' if official_failed_count == 0 else f'{official_failed_count} Active Backlog(s)'
+            'creditsTotal': credits_total,
+            'creditsEarned': credits_earned,
+            'marks': {'obtained': int(marks_obtained), 'total': int(marks_max)},
+            'marksObtained': marks_obtained,
+            'marksMax': marks_max,
+            'semesters': semesters
         }
     
-    def _credits_summary(self, subjects: List[Dict], credits_summary_data: Dict = None) -> Dict:
-        """Calculate total credits or use official summary"""
-        if credits_summary_data:
-            return {
-                'total': credits_summary_data.get('total', 0),
-                'earned': credits_summary_data.get('obtained', 0)
-            }
-
-        total_credits = 0
-        earned_credits = 0
-        for sub in subjects:
-            credits_str = sub.get('credits', '0')
-            try:
-                credits = float(credits_str) if credits_str else 0
-            except:
-                credits = 0
-            total_credits += credits
-            if sub.get('status', {}).get('passed'):
-                earned_credits += credits
+    def _sgpa_semesters(self, semester_info: Dict) -> Optional[set]:
+        """
+        Semester numbers whose API SGPA is missing/zero, or None when semester
+        numbers repeat (the subject sums can't be told apart then)
+        """
+        semesters = semester_info.get('semesters', [])
+        numbers = {sem.get('semester') for sem in semesters}
+        if len(numbers) != len(semesters):
+            return None
+        return {sem.get('semester') for sem in semesters
+                if not sem.get('sgpa') or sem.get('sgpa') == 0 or sem.get('sgpa') == '0'}
+    
+    def _fused_trends(self, semester_info: Dict, semester_sums: Optional[Dict]) -> Dict:
+        """SGPA per semester using the sums from _scan_subjects"""
+        if semester_sums is None:
+            return self._calculate_trends(semester_info)
         
-        return {
-            'total': round(total_credits, 1),
-            'earned': round(earned_credits, 1)
-        }
+        labels = []
+        data = []
+        for sem in semester_info.get('semesters', []):
+            sem_num = sem.get('semester')
+            sgpa = sem.get('sgpa')
+            
+            # If API SGPA is missing/zero, use the subject sums
+            if not sgpa or sgpa == 0 or sgpa == '0':
+                total_points, total_credits = semester_sums.get(sem_num, (0, 0))
+                if total_credits > 0:
+                    sgpa = round(total_points / total_credits, 2)
+                    sem['sgpa'] = sgpa
+            
+            if sem_num and sgpa is not None:
+                try:
+                    val = float(sgpa)
+                    labels.append(f"Sem {sem_num}")
+                    data.append(val)
+                except (ValueError, TypeError): continue
+                
+        return {'labels': labels, 'data': data}
+    
+    def calculate_batch(self, table) -> List[Dict]:
+        """
+        Analytics for every student of a CohortTable in one vectorized pass.
+        Returns one dict per student (table order) equal to calculate_analytics
+        output without 'rawSummary'. Sums are accumulated in subject order with
+        bincount and rounded with Python's round(), so values match exactly.
+        Unlike the per-student path, inputs are not mutated.
+        """
+        n = len(table)
+        n_sem = len(table.sem_student)
+        student = table.student
+        counts = np.diff(table.offsets)
+        
+        # Per grade label lookups, so each row is a single gather
+        upper = [(g or '').upper() for g in table.grade_labels]
+        label_points = np.array([self.GRADE_POINTS.get(g, np.nan) for g in upper], dtype=np.float64)
+        label_fail = np.array([g in self.FAILED_GRADES for g in upper], dtype=bool)
+        row_points = label_points[table.grade]
+        known = ~np.isnan(row_points)
+        credits = table.credits
+        
+        # CGPA
+        gpa_points = np.bincount(student[known], (row_points * credits)[known], minlength=n)
+        gpa_credits = np.bincount(student[known], credits[known], minlength=n)
+        
+        # Pass / fail
+        failed_mask = np.where(table.passed < 0, label_fail[table.grade], table.passed == 0)
+        failed_counts = np.bincount(student, failed_mask, minlength=n).astype(np.int64)
+        
+        # Credits (fallback when there is no official summary)
+        credit_totals = np.bincount(student, credits, minlength=n)
+        passed_rows = table.passed == 1
+        credit_earned = np.bincount(student[passed_rows], credits[passed_rows], minlength=n)
+        
+        # Marks (fallback when the summary has no total)
+        subject_max = table.int_max + table.ext_max
+        has_max = subject_max > 0
+        marks_max = np.bincount(student[has_max], subject_max[has_max], minlength=n)
+        marks_obtained = np.bincount(student[has_max], np.nan_to_num(table.marks)[has_max], minlength=n)
+        
+        # SGPA fallback: API grade points first, then the grade table
+        sem_points_row = np.where(np.isnan(table.grade_points), row_points, table.grade_points)
+        sem_known = ~np.isnan(sem_points_row) & (table.sem_row >= 0)
+        sem_rows = table.sem_row[sem_known]
+        sem_points = np.bincount(sem_rows, (sem_points_row * credits)[sem_known], minlength=n_sem)
+        sem_credits = np.bincount(sem_rows, credits[sem_known], minlength=n_sem)
+        
+        # Grade distribution in first-seen order per student
+        n_labels = max(len(table.grade_labels), 1)
+        pair_keys, first_row, pair_counts = np.unique(
+            student.astype(np.int64) * n_labels + table.grade, return_index=True, return_counts=True)
+        order = np.argsort(first_row, kind='stable')
+        pair_keys, pair_counts = pair_keys[order], pair_counts[order]
+        pair_bounds = np.searchsorted(pair_keys // n_labels, np.arange(n + 1))
+        
+        failed_rows = np.flatnonzero(failed_mask)
+        failed_bounds = np.searchsorted(student[failed_rows], np.arange(n + 1)).tolist()
+        failed_subjects_all = [{
+            'name': table.name_labels[name],
+            'code': table.code_labels[code],
+            'grade': upper[grade],
+            'semester': semester or None
+        } for name, code, grade, semester in zip(
+            table.name[failed_rows].tolist(), table.code[failed_rows].tolist(),
+            table.grade[failed_rows].tolist(), table.semester[failed_rows].tolist())]
+        
+        # Divide in NumPy (same IEEE result), round in Python to match round()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            gpa_ratio = (gpa_points / gpa_credits).tolist()
+            sem_ratio = (sem_points / sem_credits).tolist()
+        
+        # Everything the per-student loop touches as plain Python values
+        counts = counts.tolist()
+        gpa_credits = gpa_credits.tolist()
+        failed_counts = failed_counts.tolist()
+        backlogs_due = np.where(table.has_backlog_summary, table.summary_backlogs_due, np.nan).tolist()
+        has_credits_summary = table.has_credits_summary.tolist()
+        summary_credits_total = np.nan_to_num(table.summary_credits_total).tolist()
+        summary_credits_obtained = np.nan_to_num(table.summary_credits_obtained).tolist()
+        credit_totals = credit_totals.tolist()
+        credit_earned = credit_earned.tolist()
+        summary_marks_total = np.nan_to_num(table.summary_marks_total).tolist()
+        summary_marks_obtained = np.nan_to_num(table.summary_marks_obtained).tolist()
+        marks_max = marks_max.tolist()
+        marks_obtained = marks_obtained.tolist()
+        sem_offsets = table.sem_offsets.tolist()
+        sem_sgpa = table.sem_sgpa.tolist()
+        sem_credits = sem_credits.tolist()
+        sem_number = table.sem_number.tolist()
+        pair_bounds = pair_bounds.tolist()
+        pair_grades = (pair_keys % n_labels).tolist()
+        pair_counts = pair_counts.tolist()
+        grade_labels = table.grade_labels
+        
+        results = []
+        for i in range(n):
+            gpa = round(gpa_ratio[i], 2) if gpa_credits[i] != 0 else None
+            
+            lo, hi = pair_bounds[i], pair_bounds[i + 1]
+            distribution = {grade_labels[g]: c for g, c in zip(pair_grades[lo:hi], pair_counts[lo:hi])}
+            
+            failed = failed_counts[i]
+            official_failed = failed if backlogs_due[i] != backlogs_due[i] else _number(backlogs_due[i])
+            
+            if has_credits_summary[i]:
+                credits_summary = {'total': summary_credits_total[i], 'earned': summary_credits_obtained[i]}
+            else:
+                credits_summary = {'total': round(credit_totals[i], 1), 'earned': round(credit_earned[i], 1)}
+            
+            if summary_marks_total[i] == 0:
+                total, obtained = int(marks_max[i]), int(marks_obtained[i])
+            else:
+                total, obtained = summary_marks_total[i], summary_marks_obtained[i]
+            percentage = round((obtained / total) * 100, 2) if total > 0 else 0.0
+            
+            labels, data = [], []
+            for s in range(sem_offsets[i], sem_offsets[i + 1]):
+                sgpa = sem_sgpa[s]
+                if (sgpa != sgpa or sgpa == 0) and sem_credits[s] > 0:
+                    sgpa = round(sem_ratio[s], 2)
+                if sem_number[s] and sgpa == sgpa:
+                    labels.append(f"Sem {sem_number[s]}")
+                    data.append(sgpa)
+            
+            results.append({
+                'totalSubjects': counts[i],
+                'gpa': gpa,
+                'gradeDistribution': distribution,
+                'passFailStatus': {
+                    'passed': counts[i] - failed,
+                    'failed': official_failed,
+                    'failedSubjects': failed_subjects_all[failed_bounds[i]:failed_bounds[i + 1]],
+                    'overallStatus': 'All Clear' if official_failed == 0 else f'{official_failed} Active Backlog(s)'
+                },
+                'creditsSummary': credits_summary,
+                'performanceLevel': self._get_performance_level(gpa) if gpa else None,
+                'trends': {'labels': labels, 'data': data},
+                'overallPercentage': percentage
+            })
+        
+        return results
 
     def _calculate_trends(self, semester_info: Dict) -> Dict:
         """Calculate SGPA per semester (Manual fallback if missing)"""
@@ -197,20 +499,3 @@ class AnalyticsEngine:
         elif gpa >= 6.0: return 'Good'
         elif gpa >= 5.0: return 'Average'
         else: return 'Needs Improvement'
-
-    def _calculate_marks_summary(self, subjects: List[Dict]) -> Dict:
-        total_obtained = 0
-        total_max = 0
-        for sub in subjects:
-            max_marks = sub.get('maxMarks', {})
-            int_max = float(max_marks.get('internal') or 0)
-            ext_max = float(max_marks.get('external') or 0)
-            marks_str = str(sub.get('marks', ''))
-            try:
-                obtained = float(marks_str) if marks_str.replace('.', '').isdigit() else 0
-            except: obtained = 0
-            subject_total = int_max + ext_max
-            if subject_total > 0:
-                total_max += subject_total
-                total_obtained += obtained
-        return {'obtained': int(total_obtained), 'total': int(total_max)}
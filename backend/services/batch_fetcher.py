@@ -0,0 +1,94 @@
+"""
+Async Batch Fetcher Service
+Fetches and parses results for whole rosters with bounded concurrency
+"""
+
+import asyncio
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Path hack for sibling imports if run directly
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from core.config import Config
+from core.logger import setup_logger
+from services.scraper import CampXScraper
+from services.parser import ResultsParser
+
+logger = setup_logger(__name__)
+
+
+class AsyncBatchFetcher:
+    """
+    asyncio client for fetching many hall tickets at once.
+    
+    Each lookup runs CampXScraper.fetch_results (same headers, same pooled
+    session) on a worker thread, so at most `concurrency` requests are in
+    flight. Results are yielded in completion order, not input order.
+    """
+    
+    def __init__(self, scraper=None, parser=None, concurrency=None):
+        self.scraper = scraper or CampXScraper()
+        self.parser = parser or ResultsParser()
+        self.concurrency = max(1, concurrency or Config.BATCH_CONCURRENCY)
+    
+    def _fetch_and_parse(self, hall_ticket, exam_type):
+        """Blocking fetch + parse for a single hall ticket (runs on a worker thread)"""
+        api_data = self.scraper.fetch_results(hall_ticket, exam_type)
+        if not api_data:
+            return None
+        return self.parser.parse_api_response(api_data)
+    
+    async def iter_results(self, hall_tickets, exam_type='general'):
+        """
+        Fetch results for every hall ticket in `hall_tickets`
+        Yields: (hall_ticket, parsed results dict or None) as each lookup finishes
+        """
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='batch-fetch')
+        tickets = iter(hall_tickets)
+        pending = {}
+        
+        def submit_next():
+            for hall_ticket in tickets:
+                future = loop.run_in_executor(executor, self._fetch_and_parse, hall_ticket, exam_type)
+                pending[future] = hall_ticket
+                return True
+            return False
+        
+        try:
+            # Sliding window: only `concurrency` lookups are queued at any time,
+            # so the input iterable can be arbitrarily large
+            while len(pending) < self.concurrency and submit_next():
+                pass
+            
+            while pending:
+                done, _ = await asyncio.wait(pending.keys(), return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    hall_ticket = pending.pop(future)
+                    try:
+                        parsed = future.result()
+                    except Exception as e:
+                        logger.error(f"Batch fetch failed for {hall_ticket}: {str(e)}")
+                        parsed = None
+                    submit_next()
+                    yield hall_ticket, parsed
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    async def fetch_all(self, hall_tickets, exam_type='general'):
+        """Collect batch results into a dict keyed by hall ticket"""
+        results = {}
+        async for hall_ticket, parsed in self.iter_results(hall_tickets, exam_type):
+            results[hall_ticket] = parsed
+        return results
+    
+    def run(self, hall_tickets, exam_type='general'):
+        """Synchronous entry point for scripts: fetch a whole roster and return a dict"""
+        return asyncio.run(self.fetch_all(hall_tickets, exam_type))
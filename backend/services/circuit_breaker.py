@@ -0,0 +1,126 @@
+"""
+Circuit Breaker
+Stops calling the upstream after repeated failures and probes it with
+a limited number of half-open requests before resuming traffic
+"""
+
+import os
+import sys
+import threading
+import time
+from typing import Dict
+
+# Path hack for sibling imports if run directly
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from core.config import Config
+from core.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Classic three-state breaker.
+    
+    closed    -> requests flow; `failure_threshold` consecutive failures open it
+    open      -> requests are refused until `recovery_timeout` has passed
+    half_open -> up to `half_open_max_calls` probes; a success closes the
+                 circuit, a failure re-opens it for another timeout
+    """
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, failure_threshold=None, recovery_timeout=None, half_open_max_calls=None):
+        self.failure_threshold = failure_threshold or Config.CIRCUIT_FAILURE_THRESHOLD
+        self.recovery_timeout = recovery_timeout if recovery_timeout is not None else Config.CIRCUIT_RECOVERY_TIMEOUT
+        self.half_open_max_calls = half_open_max_calls or Config.CIRCUIT_HALF_OPEN_PROBES
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.times_opened = 0
+    
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+    
+    @property
+    def is_open(self) -> bool:
+        """True while requests would be refused without probing"""
+        with self._lock:
+            return self._state == self.OPEN and time.monotonic() - self._opened_at < self.recovery_timeout
+    
+    def allow_request(self) -> bool:
+        """Check (and reserve, when half-open) permission to call the upstream"""
+        with self._lock:
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.recovery_timeout:
+                    self.rejected += 1
+                    return False
+                self._state = self.HALF_OPEN
+                self._probes = 0
+                logger.info("Circuit half-open, probing upstream")
+            
+            if self._state == self.HALF_OPEN:
+                if self._probes >= self.half_open_max_calls:
+                    self.rejected += 1
+                    return False
+                self._probes += 1
+            return True
+    
+    def release(self):
+        """Hand back a half-open probe reserved by a call that never went out"""
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+    
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("Upstream recovered, circuit closed")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probes = 0
+    
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or (
+                self._state == self.CLOSED and self._failures >= self.failure_threshold
+            ):
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self.times_opened += 1
+                logger.warning(f"Circuit opened after {self._failures} consecutive upstream failures")
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'state': self._state,
+                'consecutiveFailures': self._failures,
+                'timesOpened': self.times_opened,
+                'rejected': self.rejected
+            }
+
+
+_shared_breaker = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_circuit_breaker() -> CircuitBreaker:
+    """Process-wide breaker for the CampX upstream"""
+    global _shared_breaker
+    if _shared_breaker is None:
+        with _shared_lock:
+            if _shared_breaker is None:
+                _shared_breaker = CircuitBreaker()
+    return _shared_breaker
@@ -0,0 +1,228 @@
+"""
+Cohort Table
+Columnar, array-backed view of many students' parsed results. One row per
+subject attempt, grouped contiguously by student; repeated strings (codes,
+grades, names, exam months, batches, programs) are dictionary-encoded.
+Analytics and export work on the arrays instead of per-subject dicts.
+"""
+
+import math
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def _to_float(value, default=math.nan) -> float:
+    try:
+        return float(value) if value not in (None, '') else default
+    except (ValueError, TypeError):
+        return default
+
+
+def _parse_credits(value) -> float:
+    """Same rule as the analytics GPA pass: blank or unparseable -> 0"""
+    try:
+        return float(value) if value else 0.0
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def _parse_marks(value) -> float:
+    """Same rule as the analytics marks summary: non-numeric -> NaN (counts as 0)"""
+    text = str(value if value is not None else '')
+    try:
+        return float(text) if text.replace('.', '').isdigit() else math.nan
+    except ValueError:
+        # e.g. '1.2.3' or superscript digits pass isdigit() but not float()
+        return math.nan
+
+
+class _Dictionary:
+    """Label <-> integer code mapping built in first-seen order"""
+    
+    def __init__(self):
+        self.index: Dict = {}
+        self.labels: List = []
+        self.codes: List[int] = []
+    
+    def add(self, label):
+        code = self.index.get(label)
+        if code is None:
+            code = self.index[label] = len(self.labels)
+            self.labels.append(label)
+        self.codes.append(code)
+    
+    def array(self) -> np.ndarray:
+        return np.array(self.codes, dtype=np.int32)
+
+
+class CohortTable:
+    """
+    Columnar subject table for a cohort.
+    
+    Subject columns (length n_rows):
+        student, semester, sem_row, credits, grade_points, marks,
+        int_max, ext_max, passed (1 / 0 / -1 when unknown),
+        code, name, grade, exam_month (dictionary codes into *_labels)
+    Student columns (length n_students):
+        offsets (n_students + 1; rows of student i are offsets[i]:offsets[i+1]),
+        cgpa, batch, program (dictionary codes), summary_* (NaN when missing),
+        has_credits_summary, has_backlog_summary
+    Semester columns (length n_semesters, sorted per student like semesterInfo):
+        sem_offsets, sem_student, sem_number, sem_sgpa (API value, NaN if missing; 0 means not computed)
+    """
+    
+    def __init__(self, **columns):
+        for name, value in columns.items():
+            setattr(self, name, value)
+    
+    @classmethod
+    def from_results(cls, results: Iterable) -> 'CohortTable':
+        """
+        Build from parse_api_response / merge_parsed_results outputs (or
+        compact StudentResult records). Rows follow each student's flat
+        'subjects' order.
+        """
+        hall_tickets, student_names, cgpa = [], [], []
+        batch, program = _Dictionary(), _Dictionary()
+        summary_cols = {key: [] for key in (
+            'marks_obtained', 'marks_total', 'credits_total', 'credits_obtained', 'backlogs_due')}
+        has_credits, has_backlogs = [], []
+        offsets, sem_offsets = [0], [0]
+        sem_student, sem_number, sem_sgpa = [], [], []
+        
+        student, semester, sem_row = [], [], []
+        credits, grade_points, marks, int_max, ext_max, passed = [], [], [], [], [], []
+        code, name, grade, exam_month = _Dictionary(), _Dictionary(), _Dictionary(), _Dictionary()
+        
+        for data in results:
+            if data is None:
+                continue
+            if hasattr(data, 'to_dict'):
+                data = data.to_dict()
+            idx = len(hall_tickets)
+            info = data.get('studentInfo', {})
+            semester_info = data.get('semesterInfo', {})
+            summary = data.get('summary', {})
+            
+            hall_tickets.append(info.get('hallTicket'))
+            student_names.append(info.get('name'))
+            batch.add(info.get('batch'))
+            program.add(info.get('program'))
+            cgpa.append(_to_float(semester_info.get('cgpa')))
+            
+            marks_summary = summary.get('marks') or {}
+            credits_summary = summary.get('credits') or {}
+            backlog_summary = summary.get('backlogs') or {}
+            summary_cols['marks_obtained'].append(_to_float(marks_summary.get('obtained')))
+            summary_cols['marks_total'].append(_to_float(marks_summary.get('total')))
+            summary_cols['credits_total'].append(_to_float(credits_summary.get('total')))
+            summary_cols['credits_obtained'].append(_to_float(credits_summary.get('obtained')))
+            summary_cols['backlogs_due'].append(_to_float(backlog_summary.get('due')))
+            has_credits.append(bool(credits_summary))
+            has_backlogs.append(bool(backlog_summary))
+            
+            # Subject dicts are shared between the flat list and semesters,
+            # so map each row to its semester by identity
+            row_semester = {}
+            for sem in semester_info.get('semesters', []):
+                sem_idx = len(sem_student)
+                sem_student.append(idx)
+                sem_number.append(sem.get('semester') or 0)
+                sem_sgpa.append(_to_float(sem.get('sgpa')))
+                for sub in sem.get('subjects', []):
+                    row_semester[id(sub)] = sem_idx
+            sem_offsets.append(len(sem_student))
+            
+            for sub in data.get('subjects', []):
+                status = sub.get('status', {})
+                max_marks = sub.get('maxMarks', {})
+                is_passed = status.get('passed')
+                student.append(idx)
+                semester.append(sub.get('semester') or 0)
+                sem_row.append(row_semester.get(id(sub), -1))
+                credits.append(_parse_credits(sub.get('credits', '0')))
+                grade_points.append(_to_float(sub.get('gradePoints')))
+                marks.append(_parse_marks(sub.get('marks', '')))
+                int_max.append(float(max_marks.get('internal') or 0))
+                ext_max.append(float(max_marks.get('external') or 0))
+                passed.append(-1 if is_passed is None else int(bool(is_passed)))
+                code.add(sub.get('code'))
+                name.add(sub.get('name'))
+                grade.add(sub.get('grade'))
+                exam_month.add(sub.get('examMonth'))
+            offsets.append(len(student))
+        
+        return cls(
+            hall_tickets=hall_tickets,
+            student_names=student_names,
+            offsets=np.array(offsets, dtype=np.int64),
+            cgpa=np.array(cgpa, dtype=np.float64),
+            batch=batch.array(), batch_labels=batch.labels,
+            program=program.array(), program_labels=program.labels,
+            **{f'summary_{key}': np.array(values, dtype=np.float64) for key, values in summary_cols.items()},
+            has_credits_summary=np.array(has_credits, dtype=bool),
+            has_backlog_summary=np.array(has_backlogs, dtype=bool),
+            sem_offsets=np.array(sem_offsets, dtype=np.int64),
+            sem_student=np.array(sem_student, dtype=np.int32),
+            sem_number=np.array(sem_number, dtype=np.int32),
+            sem_sgpa=np.array(sem_sgpa, dtype=np.float64),
+            student=np.array(student, dtype=np.int32),
+            semester=np.array(semester, dtype=np.int32),
+            sem_row=np.array(sem_row, dtype=np.int32),
+            credits=np.array(credits, dtype=np.float64),
+            grade_points=np.array(grade_points, dtype=np.float64),
+            marks=np.array(marks, dtype=np.float64),
+            int_max=np.array(int_max, dtype=np.float64),
+            ext_max=np.array(ext_max, dtype=np.float64),
+            passed=np.array(passed, dtype=np.int8),
+            code=code.array(), code_labels=code.labels,
+            name=name.array(), name_labels=name.labels,
+            grade=grade.array(), grade_labels=grade.labels,
+            exam_month=exam_month.array(), exam_month_labels=exam_month.labels,
+        )
+    
+    def __len__(self):
+        return len(self.hall_tickets)
+    
+    @property
+    def n_rows(self) -> int:
+        return int(self.offsets[-1])
+    
+    def student_index(self, hall_ticket: str) -> Optional[int]:
+        try:
+            return self.hall_tickets.index(hall_ticket)
+        except ValueError:
+            return None
+    
+    def student_rows(self, idx: int) -> slice:
+        """Row slice holding student idx's subjects"""
+        return slice(int(self.offsets[idx]), int(self.offsets[idx + 1]))
+    
+    def decode(self, column: str, rows=slice(None)) -> List:
+        """Decode a dictionary-encoded column back to its labels"""
+        labels = getattr(self, f'{column}_labels')
+        return [labels[c] for c in getattr(self, column)[rows]]
+    
+    def to_frame(self) -> pd.DataFrame:
+        """One row per subject with dictionary-encoded columns decoded"""
+        def decoded(column, codes):
+            return np.array(getattr(self, f'{column}_labels'), dtype=object)[codes]
+        
+        student = self.student
+        return pd.DataFrame({
+            'hallTicket': np.array(self.hall_tickets, dtype=object)[student],
+            'studentName': np.array(self.student_names, dtype=object)[student],
+            'batch': decoded('batch', self.batch[student]),
+            'program': decoded('program', self.program[student]),
+            'semester': self.semester,
+            'code': decoded('code', self.code),
+            'name': decoded('name', self.name),
+            'credits': self.credits,
+            'grade': decoded('grade', self.grade),
+            'gradePoints': self.grade_points,
+            'marks': self.marks,
+            'examMonth': decoded('exam_month', self.exam_month),
+            'passed': pd.array(np.where(self.passed < 0, None, self.passed == 1), dtype='boolean'),
+        })
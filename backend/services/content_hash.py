@@ -0,0 +1,27 @@
+"""
+Content Hashing
+Stable digests of decoded JSON values, used as memo keys so that a
+re-fetch returning the same data (or the same semester blocks) reuses
+earlier parse and analytics results.
+"""
+
+import hashlib
+import json
+import marshal
+
+# marshal format 2 writes every value in full (no back-references), so equal
+# values with the same key order always serialise to the same bytes
+_MARSHAL_VERSION = 2
+
+
+def stable_hash(value) -> str:
+    """
+    128-bit hex digest of a JSON-like value (dict, list, str, number, bool,
+    None). Equal documents with the same key order hash equally; a reordered
+    document only costs a memo miss.
+    """
+    try:
+        data = marshal.dumps(value, _MARSHAL_VERSION)
+    except ValueError:
+        data = json.dumps(value, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
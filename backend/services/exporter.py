@@ -1,8 +1,10 @@
 """
 Results Exporter Service
-Generates CSV and Excel files from results data
+Generates CSV and Excel files from results data, and streams CSV in
+chunks without touching the export directory
 """
 
+import io
 import os
 import csv
 import pandas as pd
@@ -23,6 +25,25 @@ logger = setup_logger(__name__)
 class ResultsExporter:
     """Exports results data to CSV or Excel format"""
     
+    # CohortTable.to_frame() column -> export header
+    COHORT_COLUMNS = {
+        'hallTicket': 'Hall Ticket',
+        'studentName': 'Name',
+        'batch': 'Batch',
+        'program': 'Program',
+        'semester': 'Semester',
+        'code': 'Subject Code',
+        'name': 'Subject Name',
+        'credits': 'Credits',
+        'grade': 'Grade',
+        'marks': 'Marks',
+        'examMonth': 'Exam Month',
+        'passed': 'Passed',
+    }
+    
+    # Encoded CSV is handed to the response in chunks of roughly this size
+    STREAM_CHUNK_SIZE = 64 * 1024
+    
     def __init__(self):
         self.export_dir = Config.EXPORT_DIR
         self._ensure_export_dir()
@@ -56,52 +77,101 @@ class ResultsExporter:
             logger.error(f"Export failed: {str(e)}")
             return None
     
-    def _export_csv(self, results_data: dict, filename: str) -> str:
-        """Export to CSV format"""
-        filepath = os.path.join(self.export_dir, filename)
-        
+    def export_cohort(self, table, format: str = 'csv') -> str:
+        """Export a CohortTable as one row per subject attempt"""
+        try:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            frame = table.to_frame()[list(self.COHORT_COLUMNS)].rename(columns=self.COHORT_COLUMNS)
+            
+            if format.lower() == 'excel':
+                filepath = os.path.join(self.export_dir, f"cohort_{len(table)}_{timestamp}.xlsx")
+                frame.to_excel(filepath, sheet_name='Subjects', index=False, engine='openpyxl')
+            else:
+                filepath = os.path.join(self.export_dir, f"cohort_{len(table)}_{timestamp}.csv")
+                frame.to_csv(filepath, index=False, encoding='utf-8')
+            
+            logger.info(f"Exported cohort of {len(table)} students to {filepath}")
+            return filepath
+            
+        except Exception as e:
+            logger.error(f"Cohort export failed: {str(e)}")
+            return None
+    
+    @staticmethod
+    def iter_csv(rows, chunk_size: int = STREAM_CHUNK_SIZE):
+        """Encode rows lazily, yielding CSV text in chunks of about chunk_size characters"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(row)
+            if buffer.tell() >= chunk_size:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    
+    def stream_csv(self, results_data: dict):
+        """Single student's CSV report (same layout as export()) as text chunks"""
+        return self.iter_csv(self._csv_rows(results_data), self.STREAM_CHUNK_SIZE)
+    
+    def stream_cohort_csv(self, subjects):
+        """
+        Cohort CSV (COHORT_COLUMNS, one row per subject attempt) from an
+        iterable of dicts, e.g. ResultsStore.iter_subject_rows(); memory
+        stays constant however many students it covers
+        """
+        return self.iter_csv(self._cohort_rows(subjects), self.STREAM_CHUNK_SIZE)
+    
+    def _cohort_rows(self, subjects):
+        yield list(self.COHORT_COLUMNS.values())
+        for subject in subjects:
+            yield [subject.get(column) for column in self.COHORT_COLUMNS]
+    
+    def _csv_rows(self, results_data: dict):
+        """Rows of the single-student CSV report"""
         student_info = results_data.get('studentInfo', {})
         subjects = results_data.get('subjects', [])
         analytics = results_data.get('analytics', {})
         
+        # Student information
+        yield ['STUDENT INFORMATION']
+        yield ['Hall Ticket', student_info.get('hallTicket', 'N/A')]
+        yield ['Name', student_info.get('name', 'N/A')]
+        yield ['Program', student_info.get('program', 'N/A')]
+        yield []
+        
+        # Analytics summary
+        yield ['PERFORMANCE SUMMARY']
+        yield ['GPA', analytics.get('gpa', 'N/A')]
+        yield ['Performance Level', analytics.get('performanceLevel', 'N/A')]
+        yield ['Total Subjects', analytics.get('totalSubjects', 0)]
+        
+        pass_fail = analytics.get('passFailStatus', {})
+        yield ['Passed Subjects', pass_fail.get('passed', 0)]
+        yield ['Failed Subjects', pass_fail.get('failed', 0)]
+        yield ['Overall Status', pass_fail.get('overallStatus', 'N/A')]
+        yield []
+        
+        # Subject details
+        yield ['SUBJECT-WISE RESULTS']
+        if subjects:
+            yield ['Subject Code', 'Subject Name', 'Credits', 'Grade', 'Marks']
+            for subject in subjects:
+                yield [
+                    subject.get('code', ''),
+                    subject.get('name', ''),
+                    subject.get('credits', ''),
+                    subject.get('grade', ''),
+                    subject.get('marks', '')
+                ]
+    
+    def _export_csv(self, results_data: dict, filename: str) -> str:
+        """Export to CSV format"""
+        filepath = os.path.join(self.export_dir, filename)
+        
         with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            
-            # Write student information
-            writer.writerow(['STUDENT INFORMATION'])
-            writer.writerow(['Hall Ticket', student_info.get('hallTicket', 'N/A')])
-            writer.writerow(['Name', student_info.get('name', 'N/A')])
-            writer.writerow(['Program', student_info.get('program', 'N/A')])
-            writer.writerow([])
-            
-            # Write analytics summary
-            writer.writerow(['PERFORMANCE SUMMARY'])
-            writer.writerow(['GPA', analytics.get('gpa', 'N/A')])
-            writer.writerow(['Performance Level', analytics.get('performanceLevel', 'N/A')])
-            writer.writerow(['Total Subjects', analytics.get('totalSubjects', 0)])
-            
-            pass_fail = analytics.get('passFailStatus', {})
-            writer.writerow(['Passed Subjects', pass_fail.get('passed', 0)])
-            writer.writerow(['Failed Subjects', pass_fail.get('failed', 0)])
-            writer.writerow(['Overall Status', pass_fail.get('overallStatus', 'N/A')])
-            writer.writerow([])
-            
-            # Write subject details
-            writer.writerow(['SUBJECT-WISE RESULTS'])
-            if subjects:
-                # Header
-                headers = ['Subject Code', 'Subject Name', 'Credits', 'Grade', 'Marks']
-                writer.writerow(headers)
-                
-                # Subjects
-                for subject in subjects:
-                    writer.writerow([
-                        subject.get('code', ''),
-                        subject.get('name', ''),
-                        subject.get('credits', ''),
-                        subject.get('grade', ''),
-                        subject.get('marks', '')
-                    ])
+            csv.writer(csvfile).writerows(self._csv_rows(results_data))
         
         return filepath
     
@@ -0,0 +1,168 @@
+"""
+Hedged Requests
+Sends a second identical upstream request when the first has not answered
+within a percentile of recent latency, bounded by a retry budget
+"""
+
+import math
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, Optional
+
+# Path hack for sibling imports if run directly
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from core.config import Config
+from core.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class LatencyTracker:
+    """Sliding window of recent request latencies (seconds)"""
+    
+    def __init__(self, window: int = 500, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+    
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+    
+    def percentile(self, p: float) -> Optional[float]:
+        """Nearest-rank percentile, or None until `min_samples` have been seen"""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        rank = max(1, math.ceil(p / 100 * len(ordered)))
+        return ordered[rank - 1]
+
+
+class RetryBudget:
+    """
+    Token budget capping extra requests at `ratio` of normal traffic.
+    Every request deposits `ratio` tokens (up to `max_tokens`); each hedge spends one.
+    """
+    
+    def __init__(self, ratio: float, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = 0.0
+        self._lock = threading.Lock()
+    
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+    
+    def try_spend(self) -> bool:
+        with self._lock:
+            # Tolerance keeps e.g. ten deposits of 0.1 worth one full token
+            if self._tokens >= 1.0 - 1e-9:
+                self._tokens = max(0.0, self._tokens - 1.0)
+                return True
+            return False
+    
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            return self._tokens
+
+
+class Hedger:
+    """Runs a request, hedging it once if it is slower than the chosen latency percentile"""
+    
+    def __init__(self, percentile: float = None, budget_ratio: float = None,
+                 min_samples: int = None, max_workers: int = None):
+        self.percentile = percentile or Config.HEDGE_PERCENTILE
+        self.latency = LatencyTracker(min_samples=min_samples if min_samples is not None else Config.HEDGE_MIN_SAMPLES)
+        self.budget = RetryBudget(budget_ratio if budget_ratio is not None else Config.HEDGE_BUDGET)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or Config.CAMPX_POOL_SIZE, thread_name_prefix='hedge'
+        )
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+    
+    def _timed(self, fn: Callable, submitted: float):
+        # Timed from submission, so time queued behind other requests counts
+        # toward the hedge threshold just as it counts toward wait() below
+        result = fn()
+        self.latency.record(time.perf_counter() - submitted)
+        return result
+    
+    def run(self, fn: Callable, can_hedge: Callable[[], bool] = None):
+        """
+        Call `fn()`; if it has not returned within the latency percentile and
+        the budget allows (and `can_hedge()` agrees), race a second `fn()`.
+        Returns the first successful result; raises only if every attempt failed.
+        """
+        with self._lock:
+            self.requests += 1
+        self.budget.deposit()
+        
+        primary = self._executor.submit(self._timed, fn, time.perf_counter())
+        delay = self.latency.percentile(self.percentile)
+        if delay is None:
+            return primary.result()
+        
+        done, _ = wait([primary], timeout=delay)
+        # A primary still queued means the pool is saturated; a hedge would only queue behind it
+        if done or not primary.running() or not self.budget.try_spend() or (can_hedge and not can_hedge()):
+            return primary.result()
+        
+        with self._lock:
+            self.hedged += 1
+        hedge = self._executor.submit(self._timed, fn, time.perf_counter())
+        logger.info(f"Hedging upstream request after {delay * 1000:.0f} ms")
+        
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if future is hedge:
+                    with self._lock:
+                        self.hedge_wins += 1
+                return result
+        raise error
+    
+    def stats(self) -> Dict:
+        delay = self.latency.percentile(self.percentile)
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'hedged': self.hedged,
+                'hedgeWins': self.hedge_wins,
+                'hedgeRate': round(self.hedged / self.requests, 4) if self.requests else 0.0,
+                'budgetTokens': round(self.budget.tokens, 2),
+                'hedgeDelayMs': round(delay * 1000, 1) if delay is not None else None
+            }
+
+
+_shared_hedger = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_hedger() -> Hedger:
+    """Process-wide hedger so latency history and budget span every scraper"""
+    global _shared_hedger
+    if _shared_hedger is None:
+        with _shared_lock:
+            if _shared_hedger is None:
+                _shared_hedger = Hedger()
+    return _shared_hedger
@@ -0,0 +1,127 @@
+"""
+Compact Results Model
+Frozen, slotted records for parsed results. Repeated strings (subject
+codes, names, grades, credits, exam months) are interned so cohort-sized
+batches share them. Convert to the API's JSON shape with to_dict() only
+at the edge. dataclass(slots=True) needs Python 3.10+.
+"""
+
+import sys
+from dataclasses import dataclass, field
+from itertools import chain
+from typing import Any, Dict, Optional, Tuple
+
+
+def intern_str(value):
+    """Intern strings; pass every other value through unchanged"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _copy_dict(value):
+    return dict(value) if isinstance(value, dict) else value
+
+
+@dataclass(frozen=True, slots=True)
+class SubjectResult:
+    """One subject attempt as reported by CampX"""
+    code: str
+    name: Optional[str]
+    credits: Any
+    grade: Optional[str]
+    grade_points: Any
+    marks: Any
+    exam_month: Optional[str]
+    type: Any
+    passed: bool
+    absent: bool
+    malpractice: bool
+    int_max: Any
+    ext_max: Any
+    semester: Any
+    
+    def to_dict(self) -> Dict:
+        return {
+            'code': self.code,
+            'name': self.name,
+            'credits': self.credits,
+            'grade': self.grade,
+            'gradePoints': self.grade_points,
+            'marks': self.marks,
+            'examMonth': self.exam_month,
+            'type': self.type,
+            'status': {
+                'passed': self.passed,
+                'absent': self.absent,
+                'malpractice': self.malpractice
+            },
+            'maxMarks': {
+                'internal': self.int_max,
+                'external': self.ext_max
+            },
+            'semester': self.semester
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class SemesterResult:
+    semester: Any
+    sgpa: Any
+    subjects: Tuple[SubjectResult, ...]
+    key: Optional[str] = field(default=None, compare=False, repr=False)  # content hash of the API block, when memoized
+
+
+@dataclass(frozen=True, slots=True)
+class StudentResult:
+    """Parsed results for one student; semesters are kept in API order"""
+    hall_ticket: Optional[str]
+    name: Optional[str]
+    photo: Optional[str]
+    batch: Optional[str]
+    program: Optional[str]
+    cgpa: Any
+    semesters: Tuple[SemesterResult, ...]
+    summary_marks: Dict
+    summary_credits: Dict
+    summary_backlogs: Dict
+    
+    @property
+    def subjects(self) -> Tuple[SubjectResult, ...]:
+        """Flat subject list across semesters (API order)"""
+        return tuple(chain.from_iterable(sem.subjects for sem in self.semesters))
+    
+    def to_dict(self) -> Dict:
+        """
+        Build the parse_api_response JSON shape. Each subject dict is shared
+        between the flat 'subjects' list and its semester, as before.
+        """
+        all_subjects = []
+        semesters_data = []
+        for sem in self.semesters:
+            sem_subjects = [subject.to_dict() for subject in sem.subjects]
+            all_subjects.extend(sem_subjects)
+            semesters_data.append({
+                'semester': sem.semester,
+                'sgpa': sem.sgpa,
+                'subjects': sem_subjects
+            })
+        
+        return {
+            'studentInfo': {
+                'hallTicket': self.hall_ticket,
+                'name': self.name,
+                'photo': self.photo,
+                'batch': self.batch,
+                'program': self.program
+            },
+            'subjects': all_subjects,
+            'semesterInfo': {
+                'cgpa': self.cgpa if self.cgpa else 0.0,
+                'semesters': sorted(semesters_data, key=lambda x: x['semester'] or 0)
+            },
+            # Copies, since analytics fills in missing marks totals on the response
+            'summary': {
+                'marks': _copy_dict(self.summary_marks),
+                'credits': _copy_dict(self.summary_credits),
+                'backlogs': _copy_dict(self.summary_backlogs)
+            }
+        }
@@ -0,0 +1,225 @@
+"""
+Negative Cache Service
+Remembers hall tickets the portal reported as not found, using
+time-windowed Bloom filters that are persisted across restarts
+"""
+
+import hashlib
+import math
+import os
+import struct
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+# Path hack for sibling imports if run directly
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from core.config import Config
+from core.logger import setup_logger
+from services.periodic import PeriodicTask
+
+logger = setup_logger(__name__)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter using double hashing over one blake2b digest"""
+    
+    def __init__(self, capacity: int, error_rate: float, bits: Optional[bytearray] = None):
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bits if bits is not None else bytearray((self.num_bits + 7) // 8)
+    
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1, h2 = struct.unpack('<QQ', digest)
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+    
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+    
+    def __contains__(self, item: str) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+    
+    def union(self, other_bits: bytes):
+        """OR another filter's bits (same size) into this one"""
+        merged = int.from_bytes(self.bits, 'little') | int.from_bytes(other_bits, 'little')
+        self.bits = bytearray(merged.to_bytes(len(self.bits), 'little'))
+
+
+class NegativeCache:
+    """
+    Not-found cache with a TTL built from two rotating Bloom filters.
+    
+    Time is split into absolute windows of TTL/2. Keys are added to the
+    current window's filter and looked up in the current and previous
+    windows, so an entry lives between TTL/2 and TTL. Because windows are
+    aligned to wall-clock time, every worker agrees on them and filters from
+    different processes can be merged with a bitwise OR when saved.
+    
+    Bloom filters have false positives (bounded by `error_rate`); an
+    existing ticket can be wrongly reported as missing until its window ages out.
+    
+    add() only marks the filters dirty; persisting is left to save() /
+    save_if_dirty(), which the shared cache runs every `save_interval`
+    seconds on a background thread.
+    """
+    
+    MAGIC = b'CYNC'
+    HEADER = struct.Struct('<4sIIqq')  # magic, num_bits, num_hashes, current window, previous window
+    
+    def __init__(self, path: Optional[str] = None, ttl: int = None, capacity: int = None,
+                 error_rate: float = None, save_interval: float = 30.0):
+        self.path = path
+        self.ttl = ttl or Config.NEGATIVE_CACHE_TTL
+        self.capacity = capacity or Config.NEGATIVE_CACHE_CAPACITY
+        self.error_rate = error_rate or Config.NEGATIVE_CACHE_ERROR_RATE
+        self.window = max(1.0, self.ttl / 2)
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.additions = 0
+        
+        now_window = self._window_id()
+        self._current_id = now_window
+        self._current = self._new_filter()
+        self._previous_id = now_window - 1
+        self._previous = self._new_filter()
+        
+        if self.path:
+            self._load()
+    
+    def _new_filter(self, bits=None) -> BloomFilter:
+        return BloomFilter(self.capacity, self.error_rate, bits)
+    
+    def _window_id(self) -> int:
+        return int(time.time() // self.window)
+    
+    def _rotate(self):
+        """Advance windows so that `current` matches wall-clock time (lock held)"""
+        now_window = self._window_id()
+        if now_window == self._current_id:
+            return
+        if now_window == self._current_id + 1:
+            self._previous, self._previous_id = self._current, self._current_id
+        else:
+            self._previous, self._previous_id = self._new_filter(), now_window - 1
+        self._current, self._current_id = self._new_filter(), now_window
+    
+    def contains(self, key: str) -> bool:
+        with self._lock:
+            self._rotate()
+            found = key in self._current or key in self._previous
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return found
+    
+    def add(self, key: str):
+        with self._lock:
+            self._rotate()
+            self._current.add(key)
+            self.additions += 1
+            self._dirty = True
+    
+    def _read_file(self):
+        """Returns: {window id: bits} from the persisted file, or {} if unusable"""
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return {}
+        except OSError as e:
+            logger.error(f"Failed to read negative cache: {str(e)}")
+            return {}
+        
+        if len(data) < self.HEADER.size:
+            return {}
+        magic, num_bits, num_hashes, current_id, previous_id = self.HEADER.unpack_from(data)
+        size = (self._current.num_bits + 7) // 8
+        if (magic != self.MAGIC or num_bits != self._current.num_bits
+                or num_hashes != self._current.num_hashes or len(data) != self.HEADER.size + 2 * size):
+            logger.warning("Ignoring negative cache file with different filter parameters")
+            return {}
+        offset = self.HEADER.size
+        return {
+            current_id: data[offset:offset + size],
+            previous_id: data[offset + size:offset + 2 * size]
+        }
+    
+    def _merge_from(self, windows: Dict[int, bytes]):
+        """OR persisted filters into the live windows they belong to (lock held)"""
+        for window_id, bits in windows.items():
+            if window_id == self._current_id:
+                self._current.union(bits)
+            elif window_id == self._previous_id:
+                self._previous.union(bits)
+    
+    def _load(self):
+        with self._lock:
+            self._rotate()
+            self._merge_from(self._read_file())
+    
+    def save(self):
+        """Merge with the file on disk (other workers' additions) and write atomically"""
+        if not self.path:
+            return
+        # File I/O stays outside the lock so lookups are not held up by it
+        on_disk = self._read_file()
+        with self._lock:
+            self._rotate()
+            self._merge_from(on_disk)
+            payload = self.HEADER.pack(
+                self.MAGIC, self._current.num_bits, self._current.num_hashes,
+                self._current_id, self._previous_id
+            ) + bytes(self._current.bits) + bytes(self._previous.bits)
+            self._dirty = False
+        
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error(f"Failed to persist negative cache: {str(e)}")
+    
+    def save_if_dirty(self):
+        if self._dirty:
+            self.save()
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'additions': self.additions,
+                'ttlSeconds': self.ttl,
+                'filterBytes': 2 * len(self._current.bits)
+            }
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_negative_cache() -> NegativeCache:
+    """Process-wide negative cache persisted under CACHE_DIR by a background saver"""
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_lock:
+            if _shared_cache is None:
+                cache = NegativeCache(os.path.join(Config.CACHE_DIR, 'not_found.bloom'))
+                PeriodicTask(cache.save_if_dirty, cache.save_interval, 'negative-cache-save').start()
+                _shared_cache = cache
+    return _shared_cache
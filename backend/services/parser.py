@@ -1,5 +1,6 @@
 import json
 import os
+import re
 import sys
 
 # Path hack for sibling imports if run directly
@@ -8,108 +9,260 @@ backend_dir = os.path.dirname(current_dir)
 if backend_dir not in sys.path:
     sys.path.insert(0, backend_dir)
 
+from typing import Dict, List, Optional, Tuple
+
 from core.logger import setup_logger
+from services.content_hash import stable_hash
+from services.models import StudentResult, SemesterResult, SubjectResult, intern_str
+from services.results_cache import LRUCache
 
 logger = setup_logger(__name__)
 
+MONTHS = {m: i for i, m in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], start=1
+)}
+
+
+def exam_month_key(month_year):
+    """
+    Sortable (year, month) for an examMonth value such as 'Dec-2022' or '12/2022'
+    Returns (0, 0) when the value cannot be understood
+    """
+    if not month_year:
+        return (0, 0)
+    text = str(month_year).lower()
+    year_match = re.search(r'(19|20)\d{2}', text)
+    year = int(year_match.group(0)) if year_match else 0
+    month = 0
+    name_match = re.search(r'[a-z]{3}', text)
+    if name_match and name_match.group(0) in MONTHS:
+        month = MONTHS[name_match.group(0)]
+    else:
+        num_match = re.search(r'\b(0?[1-9]|1[0-2])\b', text)
+        if num_match:
+            month = int(num_match.group(0))
+    return (year, month)
+
 class ResultsParser:
     """Parser for extracting student results from API response"""
 
+    def __init__(self, memo_entries: int = 0, semester_memo_entries: Optional[int] = None):
+        """
+        memo_entries > 0 memoizes parsed responses by content hash (LRU), and
+        each semester block separately (default 8 blocks per response), so a
+        re-fetch where only one semester changed re-parses just that block.
+        Parsed records are frozen, so sharing them between results is safe.
+        """
+        self.memo = LRUCache(memo_entries) if memo_entries else None
+        self.semester_memo = LRUCache(semester_memo_entries or memo_entries * 8) if memo_entries else None
+
     def parse_api_response(self, api_data):
         """
         Parse JSON response from CampX API
         """
+        compact = self.parse_compact(api_data)
+        if compact is None:
+            return None
+        
+        try:
+            return compact.to_dict()
+        except Exception as e:
+            logger.error(f"Error parsing API data: {str(e)}")
+            return None
+
+    def parse_compact(self, api_data) -> Optional[StudentResult]:
+        """
+        Parse JSON response from CampX API into the compact slotted model.
+        Use this for cohort-sized batches; call .to_dict() at the API edge.
+        """
+        return self.parse_compact_keyed(api_data)[1]
+
+    def parse_compact_keyed(self, api_data) -> Tuple[Optional[str], Optional[StudentResult]]:
+        """
+        parse_compact plus the response's content key (None without a memo or
+        on failure). Equal keys mean equal parsed results, so callers can
+        memoize work derived from them.
+        """
         if not api_data:
             logger.warning("Received empty API data")
-            return None
-            
+            return None, None
+        if self.memo is None:
+            return None, self._parse_compact(api_data)
+        
+        try:
+            # The response key is built from the block keys, so each block is hashed once
+            block_keys = [stable_hash(sem) for sem in api_data.get('results', [])]
+            rest = {field: value for field, value in api_data.items() if field != 'results'}
+            key = stable_hash([stable_hash(rest), block_keys])
+        except Exception as e:
+            logger.error(f"Error parsing API data: {str(e)}")
+            return None, None
+        
+        compact = self.memo.get(key)
+        if compact is None:
+            compact = self._parse_compact(api_data, block_keys)
+            if compact is None:
+                return None, None
+            self.memo.set(key, compact)
+        return key, compact
+
+    def _parse_compact(self, api_data, block_keys: Optional[List[str]] = None) -> Optional[StudentResult]:
         try:
             # 1. Student Info
             student = api_data.get('student', {})
             program = api_data.get('program', {})
-            student_info = {
-                'hallTicket': student.get('rollNo'),
-                'name': student.get('fullName'),
-                'photo': student.get('photo'),
-                'batch': student.get('batch'),
-                'program': program.get('branchDisplay') or program.get('branchName')
-            }
-            
-            # 2. Results (Grouped by Semester)
-            # We will return list of semesters, each with summary and subjects
-            results_list = api_data.get('results', [])
-            semesters_data = []
             
-            # Also keep a flat list for analytics compatibility if needed, 
-            # but ideally analytics should handle structure. 
-            # Let's provide both or ensure analytics can handle it.
-            # For now, let's keep 'subjects' flat list for backward compat with current analytics,
-            # and add 'semesters' for UI.
-            all_subjects = []
-            
-            for sem in results_list:
-                sem_no = sem.get('semNo')
-                sem_subjects = []
-                
-                for sub_res in sem.get('subjectsResults', []):
-                    sub = sub_res.get('subject', {})
-                    grade_info = sub_res.get('consideredGrade', {})
-                    
-                    code = sub.get('subjectCode')
-                    if not code: continue
-                    
-                    subject_entry = {
-                        'code': code,
-                        'name': sub.get('name'),
-                        'credits': grade_info.get('credits'),
-                        'grade': grade_info.get('grade'),
-                        'gradePoints': grade_info.get('gradePoints'),
-                        'marks': sub.get('total'), # Extract Total Marks for calculation
-                        'examMonth': grade_info.get('monthYear'), # New Field
-                        'type': sub.get('subjectTypeId'), 
-                        'status': {
-                            'passed': grade_info.get('passed', False),
-                            'absent': grade_info.get('isAbsent', False),
-                            'malpractice': grade_info.get('isMalPracticed', False)
-                        },
-                        'maxMarks': {
-                            'internal': sub.get('intMax'),
-                            'external': sub.get('extMax')
-                        },
-                        'semester': sem_no
-                    }
-                    sem_subjects.append(subject_entry)
-                    all_subjects.append(subject_entry)
-                
-                semesters_data.append({
-                    'semester': sem_no,
-                    'sgpa': sem.get('sgpa'),
-                    'subjects': sem_subjects
-                })
+            # 2. Results (Grouped by Semester, kept in API order)
+            semesters = [
+                self._parse_semester(sem, block_keys[i] if block_keys else None)
+                for i, sem in enumerate(api_data.get('results', []))
+            ]
             
             # 3. Summary Block (Richer data)
             summary = api_data.get('summary', {})
             
-            # 4. Overall Info
-            cgpa = api_data.get('cgpa')
-            
-            semester_info = {
-                'cgpa': cgpa if cgpa else 0.0,
-                'semesters': sorted(semesters_data, key=lambda x: x['semester'] or 0)
-            }
-            
-            return {
-                'studentInfo': student_info,
-                'subjects': all_subjects, # Flattened for analytics
-                'semesterInfo': semester_info, # Structured for UI
-                'summary': {
-                    'marks': summary.get('marksObtained', {}),
-                    'credits': summary.get('creditsObtained', {}),
-                    'backlogs': summary.get('subjectDue', {})
-                }
-            }
+            return StudentResult(
+                hall_ticket=student.get('rollNo'),
+                name=student.get('fullName'),
+                photo=student.get('photo'),
+                batch=intern_str(student.get('batch')),
+                program=intern_str(program.get('branchDisplay') or program.get('branchName')),
+                cgpa=api_data.get('cgpa'),
+                semesters=tuple(semesters),
+                summary_marks=summary.get('marksObtained', {}),
+                summary_credits=summary.get('creditsObtained', {}),
+                summary_backlogs=summary.get('subjectDue', {})
+            )
             
         except Exception as e:
             logger.error(f"Error parsing API data: {str(e)}")
             return None
 
+    def _parse_semester(self, sem, key: Optional[str] = None) -> SemesterResult:
+        """One results[] block; memoized by its content key when given"""
+        if key is not None:
+            cached = self.semester_memo.get(key)
+            if cached is not None:
+                return cached
+        
+        sem_no = sem.get('semNo')
+        sem_subjects = []
+        
+        for sub_res in sem.get('subjectsResults', []):
+            sub = sub_res.get('subject', {})
+            grade_info = sub_res.get('consideredGrade', {})
+            
+            code = sub.get('subjectCode')
+            if not code: continue
+            
+            sem_subjects.append(SubjectResult(
+                code=intern_str(code),
+                name=intern_str(sub.get('name')),
+                credits=intern_str(grade_info.get('credits')),
+                grade=intern_str(grade_info.get('grade')),
+                grade_points=grade_info.get('gradePoints'),
+                marks=sub.get('total'), # Extract Total Marks for calculation
+                exam_month=intern_str(grade_info.get('monthYear')),
+                type=sub.get('subjectTypeId'),
+                passed=grade_info.get('passed', False),
+                absent=grade_info.get('isAbsent', False),
+                malpractice=grade_info.get('isMalPracticed', False),
+                int_max=sub.get('intMax'),
+                ext_max=sub.get('extMax'),
+                semester=sem_no
+            ))
+        
+        result = SemesterResult(
+            semester=sem_no,
+            sgpa=sem.get('sgpa'),
+            subjects=tuple(sem_subjects),
+            key=key
+        )
+        if key is not None:
+            self.semester_memo.set(key, result)
+        return result
+
+    @staticmethod
+    def semester_keys(compacts) -> Optional[Dict]:
+        """
+        Content key per semester number over one lookup's parsed responses
+        (the semesters merge_parsed_results builds from them), for
+        AnalyticsEngine.calculate_incremental. None without a memo.
+        """
+        keys = {}
+        for compact in compacts:
+            if compact is None:
+                continue
+            for sem in compact.semesters:
+                if sem.key is None:
+                    return None
+                keys.setdefault(sem.semester, []).append(sem.key)
+        return {sem_no: tuple(sem_keys) for sem_no, sem_keys in keys.items()}
+
+    def memo_stats(self) -> Optional[Dict]:
+        if self.memo is None:
+            return None
+        return {'responses': self.memo.stats(), 'semesters': self.semester_memo.stats()}
+
+    def merge_parsed_results(self, parsed_list):
+        """
+        Merge parsed results from several exam types into one structure.
+        
+        The same subject can appear once per attempt (e.g. a regular F and a
+        supplementary pass). Subjects are keyed by (semester, code) and the
+        latest attempt by examMonth wins; on a tie a passed attempt wins.
+        Semester SGPA, CGPA, student info and summary come from the first
+        result that has them, so list the most complete exam type first.
+        """
+        parsed_list = [p for p in parsed_list if p]
+        if not parsed_list:
+            return None
+        if len(parsed_list) == 1:
+            return parsed_list[0]
+        
+        def attempt_rank(subject):
+            return (exam_month_key(subject.get('examMonth')), bool(subject.get('status', {}).get('passed')))
+        
+        best = {}           # (semester, code) -> subject entry
+        sem_order = {}      # semester -> [(semester, code), ...] in first-seen order
+        sem_sgpa = {}
+        for parsed in parsed_list:
+            for sem in parsed.get('semesterInfo', {}).get('semesters', []):
+                sem_no = sem.get('semester')
+                keys = sem_order.setdefault(sem_no, [])
+                if not sem_sgpa.get(sem_no):
+                    sem_sgpa[sem_no] = sem.get('sgpa')
+                for subject in sem.get('subjects', []):
+                    key = (sem_no, subject.get('code'))
+                    current = best.get(key)
+                    if current is None:
+                        keys.append(key)
+                        best[key] = subject
+                    elif attempt_rank(subject) > attempt_rank(current):
+                        best[key] = subject
+        
+        semesters = []
+        all_subjects = []
+        for sem_no in sorted(sem_order, key=lambda x: x or 0):
+            sem_subjects = [best[key] for key in sem_order[sem_no]]
+            semesters.append({
+                'semester': sem_no,
+                'sgpa': sem_sgpa.get(sem_no),
+                'subjects': sem_subjects
+            })
+            all_subjects.extend(sem_subjects)
+        
+        first = parsed_list[0]
+        cgpa = next((p['semesterInfo'].get('cgpa') for p in parsed_list if p.get('semesterInfo', {}).get('cgpa')), 0.0)
+        summary = next((p['summary'] for p in parsed_list if any(p.get('summary', {}).values())), first.get('summary', {}))
+        student_info = next((p['studentInfo'] for p in parsed_list if p.get('studentInfo', {}).get('hallTicket')), first.get('studentInfo', {}))
+        
+        return {
+            'studentInfo': student_info,
+            'subjects': all_subjects,
+            'semesterInfo': {
+                'cgpa': cgpa,
+                'semesters': semesters
+            },
+            'summary': summary
+        }
@@ -0,0 +1,53 @@
+"""
+Periodic Tasks
+Runs background housekeeping (e.g. persisting in-memory filters and
+sketches) on a daemon thread instead of on request threads
+"""
+
+import os
+import sys
+import threading
+from typing import Callable, Optional
+
+# Path hack for sibling imports if run directly
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from core.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class PeriodicTask:
+    """
+    Calls `fn` every `interval` seconds on a daemon thread until stopped.
+    Errors are logged and the schedule continues; a run that is still going
+    delays the next one rather than overlapping it.
+    """
+    
+    def __init__(self, fn: Callable[[], None], interval: float, name: str):
+        self.fn = fn
+        self.interval = interval
+        self.name = name
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self) -> 'PeriodicTask':
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        return self
+    
+    def stop(self, timeout: Optional[float] = None):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+    
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.fn()
+            except Exception as e:
+                logger.error(f"Periodic task {self.name} failed: {str(e)}")
@@ -0,0 +1,359 @@
+"""
+Quantile Sketches
+KLL sketches for approximate percentiles over large cohorts: CGPA and
+per-semester SGPA at university / batch / batch + program level, and
+subject marks per batch. Memory per sketch is O(k log n), rank error is
+roughly 1/k, sketches merge across workers and persist as JSON.
+"""
+
+import base64
+import json
+import math
+import os
+import random
+import sys
+import threading
+import zlib
+from bisect import bisect_left, bisect_right
+from typing import Dict, Optional
+
+# Path hack for sibling imports if run directly
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from core.config import Config
+from core.logger import setup_logger
+from services.negative_cache import BloomFilter
+from services.periodic import PeriodicTask
+from services.ranking import ranking_cgpa
+from services.subject_stats import marks_value
+
+logger = setup_logger(__name__)
+
+ALL = '*'
+
+
+def k_for_error(epsilon: float) -> int:
+    """Sketch size k for a target normalised rank error (empirical KLL bound)"""
+    return max(8, int(math.ceil((2.296 / epsilon) ** (1 / 0.9723))))
+
+
+def error_for_k(k: int) -> float:
+    return 2.296 / k ** 0.9723
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch (Karnin, Lang, Liberty 2016). Level h holds items of
+    weight 2**h; a full level is sorted and every other item (random offset)
+    is promoted, so the sketch stays exact until roughly k values.
+    """
+    
+    def __init__(self, k: int = 200, c: float = 2 / 3, seed: Optional[int] = None):
+        self.k = k
+        self.c = c
+        self.count = 0
+        self.compactors = [[]]
+        self._rng = random.Random(seed)
+        self._cdf = None
+        self._refresh_capacity()
+    
+    def _capacity(self, level: int) -> int:
+        depth = len(self.compactors) - level - 1
+        return int(math.ceil(self.c ** depth * self.k)) + 1
+    
+    def _refresh_capacity(self):
+        self._max_size = sum(self._capacity(h) for h in range(len(self.compactors)))
+        self._size = sum(len(items) for items in self.compactors)
+    
+    def update(self, value: float):
+        self.compactors[0].append(float(value))
+        self._size += 1
+        self.count += 1
+        self._cdf = None
+        if self._size >= self._max_size:
+            self._compress()
+    
+    def _compress(self):
+        while self._size >= self._max_size:
+            for level, items in enumerate(self.compactors):
+                if len(items) < self._capacity(level):
+                    continue
+                if level + 1 == len(self.compactors):
+                    self.compactors.append([])
+                items.sort()
+                # An odd item out stays behind so total weight is preserved
+                leftover = [items.pop()] if len(items) % 2 else []
+                offset = 1 if self._rng.random() < 0.5 else 0
+                self.compactors[level + 1].extend(items[offset::2])
+                self.compactors[level] = leftover
+                self._refresh_capacity()
+                break
+    
+    def merge(self, other: 'KLLSketch'):
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append([])
+        for level, items in enumerate(other.compactors):
+            self.compactors[level].extend(items)
+        self.count += other.count
+        self._cdf = None
+        self._refresh_capacity()
+        self._compress()
+    
+    def _weighted(self):
+        """Sorted items with cumulative weights, rebuilt only after updates"""
+        if self._cdf is None:
+            pairs = sorted((item, 1 << level) for level, items in enumerate(self.compactors) for item in items)
+            cumulative, total = [], 0
+            for _, weight in pairs:
+                total += weight
+                cumulative.append(total)
+            self._cdf = ([item for item, _ in pairs], cumulative)
+        return self._cdf
+    
+    def rank(self, value: float) -> float:
+        """Approximate fraction of values <= value"""
+        items, cumulative = self._weighted()
+        if not items:
+            return 0.0
+        index = bisect_right(items, value)
+        return cumulative[index - 1] / cumulative[-1] if index else 0.0
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate value at fraction q (0..1)"""
+        items, cumulative = self._weighted()
+        if not items:
+            return None
+        index = bisect_left(cumulative, q * cumulative[-1])
+        return items[min(index, len(items) - 1)]
+    
+    @property
+    def error_bound(self) -> float:
+        """Normalised rank error; 0 until the first compaction (still exact)"""
+        return error_for_k(self.k) if len(self.compactors) > 1 else 0.0
+    
+    def to_dict(self) -> Dict:
+        return {'k': self.k, 'c': self.c, 'count': self.count, 'compactors': self.compactors}
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'KLLSketch':
+        sketch = cls(data['k'], data['c'])
+        sketch.count = data['count']
+        sketch.compactors = [list(items) for items in data['compactors']]
+        sketch._refresh_capacity()
+        return sketch
+
+
+class QuantileSketches:
+    """
+    Thread-safe registry of KLL sketches keyed by (metric, batch, program, detail):
+        ('cgpa',  batch|*, program|*, *)
+        ('sgpa',  batch|*, program|*, semester)
+        ('marks', batch|*, *,         subject code)
+    
+    Sketches are insert-only, so each student is added once per registry; a
+    changed result is picked up when the sketches are rebuilt (for example by
+    reprocessing the archive). Students already added are remembered in a
+    fixed-size Bloom filter sized for `student_capacity`, so memory does not
+    grow with the cohort; about SEEN_ERROR_RATE of new students are taken
+    for seen ones and left out.
+    """
+    
+    METRICS = ('cgpa', 'sgpa', 'marks')
+    SEEN_ERROR_RATE = 0.001
+    
+    def __init__(self, k: Optional[int] = None, student_capacity: Optional[int] = None):
+        self.k = k or k_for_error(Config.QUANTILE_SKETCH_ERROR)
+        self.student_capacity = student_capacity or Config.QUANTILE_SKETCH_STUDENTS
+        self._sketches: Dict[tuple, KLLSketch] = {}
+        self._seen = BloomFilter(self.student_capacity, self.SEEN_ERROR_RATE)
+        self.students = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+    
+    def _add(self, key: tuple, value: float):
+        sketch = self._sketches.get(key)
+        if sketch is None:
+            sketch = self._sketches[key] = KLLSketch(self.k)
+        sketch.update(value)
+    
+    def ingest(self, results_data: Dict, student_key: Optional[str] = None):
+        """Add one student's CGPA, SGPAs and subject marks (parsed result, analytics optional)"""
+        student_info = results_data.get('studentInfo', {})
+        student_key = student_key or student_info.get('hallTicket')
+        batch = student_info.get('batch') or ALL
+        program = student_info.get('program') or ALL
+        # dict.fromkeys drops repeats when batch / program are unknown
+        cohorts = tuple(dict.fromkeys(((ALL, ALL), (batch, ALL), (batch, program))))
+        
+        with self._lock:
+            if not student_key or student_key in self._seen:
+                return
+            self._seen.add(student_key)
+            self.students += 1
+            self._dirty = True
+            
+            cgpa = ranking_cgpa(results_data)
+            if cgpa is not None:
+                for cohort in cohorts:
+                    self._add(('cgpa', *cohort, ALL), cgpa)
+            
+            for sem in results_data.get('semesterInfo', {}).get('semesters', []):
+                try:
+                    sgpa = float(sem.get('sgpa') or 0)
+                except (ValueError, TypeError):
+                    continue
+                if sgpa > 0 and sem.get('semester'):
+                    for cohort in cohorts:
+                        self._add(('sgpa', *cohort, sem['semester']), sgpa)
+            
+            for sub in results_data.get('subjects', []):
+                marks = marks_value(sub.get('marks'))
+                if marks is not None and sub.get('code'):
+                    for cohort_batch in dict.fromkeys((ALL, batch)):
+                        self._add(('marks', cohort_batch, ALL, sub['code']), marks)
+    
+    def has_student(self, student_key: str) -> bool:
+        with self._lock:
+            return student_key in self._seen
+    
+    def _sketch(self, metric, batch, program, detail) -> Optional[KLLSketch]:
+        if metric == 'marks':
+            program = ALL
+        return self._sketches.get((metric, batch or ALL, program or ALL, detail if detail is not None else ALL))
+    
+    def percentile(self, metric: str, value: float, batch=None, program=None, detail=None) -> Optional[Dict]:
+        """Share of the cohort (percent) at or below value, or None for an unknown cohort"""
+        with self._lock:
+            sketch = self._sketch(metric, batch, program, detail)
+            if sketch is None:
+                return None
+            return {
+                'percentile': round(sketch.rank(value) * 100, 2),
+                'count': sketch.count,
+                'errorBound': round(sketch.error_bound * 100, 2)
+            }
+    
+    def quantile(self, metric: str, q: float, batch=None, program=None, detail=None) -> Optional[Dict]:
+        """Approximate value at fraction q of the cohort"""
+        with self._lock:
+            sketch = self._sketch(metric, batch, program, detail)
+            if sketch is None:
+                return None
+            return {
+                'value': sketch.quantile(q),
+                'count': sketch.count,
+                'errorBound': round(sketch.error_bound * 100, 2)
+            }
+    
+    def merge(self, other: 'QuantileSketches'):
+        """Fold in sketches built over a disjoint set of students"""
+        with self._lock:
+            for key, sketch in other._sketches.items():
+                current = self._sketches.get(key)
+                if current is None:
+                    self._sketches[key] = KLLSketch.from_dict(sketch.to_dict())
+                else:
+                    current.merge(sketch)
+            if (other._seen.num_bits, other._seen.num_hashes) == (self._seen.num_bits, self._seen.num_hashes):
+                self._seen.union(other._seen.bits)
+            else:
+                logger.warning("Merged sketches track students with a different filter size; "
+                               "their students may be added again")
+            self.students += other.students
+            self._dirty = True
+    
+    def to_dict(self, include_students: bool = True) -> Dict:
+        """include_students: also write the seen-student filter (zlib + base64)"""
+        with self._lock:
+            return {
+                'k': self.k,
+                'sketches': [[list(key), sketch.to_dict()] for key, sketch in self._sketches.items()],
+                'students': self.students,
+                'seen': {
+                    'capacity': self.student_capacity,
+                    'errorRate': self.SEEN_ERROR_RATE,
+                    'bits': base64.b64encode(zlib.compress(bytes(self._seen.bits))).decode('ascii')
+                } if include_students else None
+            }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'QuantileSketches':
+        seen = data.get('seen')
+        registry = cls(data['k'], seen['capacity'] if seen else None)
+        for key, sketch in data['sketches']:
+            registry._sketches[tuple(key)] = KLLSketch.from_dict(sketch)
+        students = data.get('students') or 0
+        if seen:
+            bits = bytearray(zlib.decompress(base64.b64decode(seen['bits'])))
+            registry._seen = BloomFilter(seen['capacity'], seen['errorRate'], bits)
+        elif isinstance(students, list):
+            # Files written before the filter listed every hall ticket
+            for student_key in students:
+                registry._seen.add(student_key)
+            students = len(students)
+        registry.students = students
+        return registry
+    
+    def save(self, path: str):
+        """Write atomically as JSON"""
+        self._dirty = False
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+    
+    def save_if_dirty(self, path: str):
+        if self._dirty:
+            self.save(path)
+    
+    @classmethod
+    def load(cls, path: str) -> 'QuantileSketches':
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'sketches': len(self._sketches),
+                'students': self.students,
+                'k': self.k,
+                'errorBound': round(error_for_k(self.k), 4)
+            }
+
+
+_shared_sketches = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_quantile_sketches() -> QuantileSketches:
+    """
+    Process-wide sketches fed by every fetched result, seeded from
+    QUANTILE_SKETCH_PATH (e.g. quantiles.json from an archive reprocess) and
+    saved back to it every QUANTILE_SKETCH_SAVE_INTERVAL seconds
+    """
+    global _shared_sketches
+    if _shared_sketches is None:
+        with _shared_lock:
+            if _shared_sketches is None:
+                path = Config.QUANTILE_SKETCH_PATH
+                seed = None
+                if path and os.path.exists(path):
+                    try:
+                        seed = QuantileSketches.load(path)
+                    except (OSError, ValueError, KeyError, zlib.error) as e:
+                        logger.warning(f"Could not load quantile sketches from {path}: {str(e)}")
+                # Keep the seed's filter size so its students stay recognised
+                sketches = QuantileSketches(student_capacity=seed.student_capacity if seed else None)
+                if seed is not None:
+                    sketches.merge(seed)
+                    sketches._dirty = False
+                    logger.info(f"Seeded quantile sketches from {path}")
+                if path:
+                    PeriodicTask(lambda: sketches.save_if_dirty(path), Config.QUANTILE_SKETCH_SAVE_INTERVAL,
+                                 'quantile-sketch-save').start()
+                _shared_sketches = sketches
+    return _shared_sketches
@@ -0,0 +1,186 @@
+"""
+Ranking Index
+In-memory CGPA rankings per batch and per (batch, program). Each cohort is
+a Fenwick tree over fixed-width CGPA buckets, so inserting, moving and
+ranking a student are O(log buckets) without rescanning the cohort.
+"""
+
+import os
+import sys
+import threading
+from typing import Dict, List, Optional
+
+# Path hack for sibling imports if run directly
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from core.config import Config
+from core.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class FenwickTree:
+    """Binary indexed tree of counts over positions 0..size-1"""
+    
+    def __init__(self, size: int):
+        self.size = size
+        self._tree = [0] * (size + 1)
+        self.total = 0
+    
+    def add(self, position: int, delta: int = 1):
+        self.total += delta
+        i = position + 1
+        while i <= self.size:
+            self._tree[i] += delta
+            i += i & -i
+    
+    def prefix_sum(self, position: int) -> int:
+        """Sum of counts at positions 0..position (0 when position < 0)"""
+        total = 0
+        i = min(position, self.size - 1) + 1
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+
+class _Cohort:
+    """One ranked group: bucket counts plus who sits in each bucket"""
+    
+    def __init__(self, size: int):
+        self.tree = FenwickTree(size)
+        self.buckets: Dict[int, Dict[str, Dict]] = {}  # bucket -> hall ticket -> entry
+    
+    def add(self, bucket: int, hall_ticket: str, entry: Dict):
+        self.tree.add(bucket, 1)
+        self.buckets.setdefault(bucket, {})[hall_ticket] = entry
+    
+    def remove(self, bucket: int, hall_ticket: str):
+        self.tree.add(bucket, -1)
+        members = self.buckets[bucket]
+        del members[hall_ticket]
+        if not members:
+            del self.buckets[bucket]
+
+
+class RankingIndex:
+    """
+    Thread-safe CGPA ranking for batch and (batch, program) cohorts.
+    
+    Ranks use competition ranking (equal CGPAs share a rank; the next rank
+    skips). Percentile is the share of the cohort with a CGPA at or below
+    the student's.
+    """
+    
+    def __init__(self, resolution: int = 100, max_cgpa: float = 10.0):
+        self.resolution = resolution
+        self.max_cgpa = max_cgpa
+        self.size = int(round(max_cgpa * resolution)) + 1
+        self._cohorts: Dict[tuple, _Cohort] = {}
+        self._students: Dict[str, tuple] = {}  # hall ticket -> (bucket, cohort keys)
+        self._lock = threading.Lock()
+        self.updates = 0
+    
+    def _bucket(self, cgpa: float) -> int:
+        return max(0, min(self.size - 1, int(round(cgpa * self.resolution))))
+    
+    @staticmethod
+    def _keys(batch, program) -> tuple:
+        return (('batch', batch), ('program', batch, program))
+    
+    def update(self, hall_ticket: str, batch, program, cgpa: Optional[float], name: Optional[str] = None):
+        """Insert or move a student; a missing CGPA removes them"""
+        hall_ticket = hall_ticket.upper()
+        with self._lock:
+            self.updates += 1
+            previous = self._students.pop(hall_ticket, None)
+            if previous:
+                bucket, keys = previous
+                for key in keys:
+                    self._cohorts[key].remove(bucket, hall_ticket)
+            if cgpa is None:
+                return
+            
+            bucket = self._bucket(cgpa)
+            keys = self._keys(batch, program)
+            entry = {'hallTicket': hall_ticket, 'name': name, 'cgpa': cgpa}
+            for key in keys:
+                cohort = self._cohorts.get(key)
+                if cohort is None:
+                    cohort = self._cohorts[key] = _Cohort(self.size)
+                cohort.add(bucket, hall_ticket, entry)
+            self._students[hall_ticket] = (bucket, keys)
+    
+    def remove(self, hall_ticket: str):
+        self.update(hall_ticket, None, None, None)
+    
+    def _position(self, cohort: _Cohort, bucket: int) -> Dict:
+        tree = cohort.tree
+        at_or_below = tree.prefix_sum(bucket)
+        return {
+            'rank': tree.total - at_or_below + 1,
+            'outOf': tree.total,
+            'percentile': round(at_or_below / tree.total * 100, 1)
+        }
+    
+    def rank(self, hall_ticket: str) -> Optional[Dict]:
+        """Rank and percentile in the student's batch and program, or None if unranked"""
+        with self._lock:
+            student = self._students.get(hall_ticket.upper())
+            if not student:
+                return None
+            bucket, (batch_key, program_key) = student
+            return {
+                'batch': {'name': batch_key[1], **self._position(self._cohorts[batch_key], bucket)},
+                'program': {'name': program_key[2], **self._position(self._cohorts[program_key], bucket)}
+            }
+    
+    def top(self, batch, program=None, k: int = 10) -> List[Dict]:
+        """Top k students of a batch (or batch + program), best first"""
+        key = ('batch', batch) if program is None else ('program', batch, program)
+        with self._lock:
+            cohort = self._cohorts.get(key)
+            if cohort is None:
+                return []
+            results = []
+            for bucket in sorted(cohort.buckets, reverse=True):
+                rank = len(results) + 1
+                for entry in sorted(cohort.buckets[bucket].values(), key=lambda e: e['hallTicket']):
+                    if len(results) >= k:
+                        return results
+                    results.append({**entry, 'rank': rank})
+            return results
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'students': len(self._students),
+                'cohorts': len(self._cohorts),
+                'updates': self.updates
+            }
+
+
+def ranking_cgpa(results_data: Dict) -> Optional[float]:
+    """CGPA used for ranking: the API value, else the computed GPA"""
+    cgpa = results_data.get('semesterInfo', {}).get('cgpa') or results_data.get('analytics', {}).get('gpa')
+    try:
+        return float(cgpa) if cgpa else None
+    except (ValueError, TypeError):
+        return None
+
+
+_shared_index = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_ranking_index() -> RankingIndex:
+    """Process-wide ranking index fed by every fetched result"""
+    global _shared_index
+    if _shared_index is None:
+        with _shared_lock:
+            if _shared_index is None:
+                _shared_index = RankingIndex(resolution=Config.RANKING_RESOLUTION)
+    return _shared_index
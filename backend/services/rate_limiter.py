@@ -0,0 +1,170 @@
+"""
+Adaptive Rate Limiter
+Per-tenant token buckets whose rate follows AIMD (additive increase,
+multiplicative decrease) based on upstream responses
+"""
+
+import sys
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+# Path hack for sibling imports if run directly
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from core.config import Config
+from core.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """
+    Parse a Retry-After header (delta-seconds or HTTP date)
+    Returns: Seconds to wait, or None if missing/unparseable
+    """
+    if not value or not isinstance(value, str):
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class _Bucket:
+    """Token bucket state for one tenant"""
+    
+    __slots__ = ('rate', 'tokens', 'updated', 'last_decrease', 'throttled', 'granted')
+    
+    def __init__(self, rate, tokens, now):
+        self.rate = rate
+        self.tokens = tokens
+        self.updated = now
+        self.last_decrease = 0.0
+        self.throttled = 0
+        self.granted = 0
+
+
+class AdaptiveRateLimiter:
+    """
+    Token-bucket limiter keyed by tenant.
+    
+    Healthy responses grow the rate by `increase` req/s for every second of
+    traffic; 429, 503 and timeouts multiply it by `decrease` (at most once
+    per cooldown window, so a burst of errors counts as one signal).
+    Retry-After pauses the bucket until the upstream says it is ready.
+    """
+    
+    def __init__(self, initial_rate=None, min_rate=None, max_rate=None,
+                 increase=None, decrease=None, burst=None, cooldown=1.0):
+        self.initial_rate = initial_rate or Config.RATE_LIMIT_INITIAL
+        self.min_rate = min_rate or Config.RATE_LIMIT_MIN
+        self.max_rate = max_rate or Config.RATE_LIMIT_MAX
+        self.increase = increase if increase is not None else Config.RATE_LIMIT_INCREASE
+        self.decrease = decrease if decrease is not None else Config.RATE_LIMIT_DECREASE
+        self.burst = burst or Config.RATE_LIMIT_BURST
+        self.cooldown = cooldown
+        self._buckets: Dict[str, _Bucket] = {}
+        self._lock = threading.Lock()
+    
+    def _bucket(self, key, now) -> _Bucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = _Bucket(self.initial_rate, self.burst, now)
+            self._buckets[key] = bucket
+        return bucket
+    
+    def _refill(self, bucket, now):
+        # `updated` may be in the future while a Retry-After pause is active
+        if now > bucket.updated:
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * bucket.rate)
+            bucket.updated = now
+    
+    def acquire(self, key, timeout=None) -> bool:
+        """
+        Reserve one request slot for `key`, sleeping until it is available.
+        Returns False (without consuming a slot) if the wait would exceed `timeout`.
+        """
+        with self._lock:
+            now = time.monotonic()
+            bucket = self._bucket(key, now)
+            self._refill(bucket, now)
+            
+            bucket.tokens -= 1
+            wait = max(0.0, bucket.updated - now) + max(0.0, -bucket.tokens / bucket.rate)
+            if timeout is not None and wait > timeout:
+                bucket.tokens += 1
+                return False
+            bucket.granted += 1
+        
+        if wait > 0:
+            time.sleep(wait)
+        return True
+    
+    def on_success(self, key):
+        """Additive increase after a healthy upstream response"""
+        with self._lock:
+            bucket = self._bucket(key, time.monotonic())
+            bucket.rate = min(self.max_rate, bucket.rate + self.increase / bucket.rate)
+    
+    def on_throttle(self, key, retry_after: Optional[float] = None):
+        """Multiplicative decrease after a 429, 503 or timeout"""
+        with self._lock:
+            now = time.monotonic()
+            bucket = self._bucket(key, now)
+            bucket.throttled += 1
+            
+            if now - bucket.last_decrease >= self.cooldown:
+                bucket.rate = max(self.min_rate, bucket.rate * self.decrease)
+                bucket.last_decrease = now
+                logger.warning(f"Upstream throttling for tenant {key}; rate cut to {bucket.rate:.2f} req/s")
+            
+            if retry_after:
+                # Drain the bucket and hold refills until the Retry-After deadline
+                self._refill(bucket, now)
+                bucket.tokens = min(bucket.tokens, 0.0)
+                bucket.updated = max(bucket.updated, now + retry_after)
+    
+    def get_rate(self, key) -> float:
+        with self._lock:
+            return self._bucket(key, time.monotonic()).rate
+    
+    def stats(self) -> Dict:
+        """Current rate and counters per tenant"""
+        with self._lock:
+            return {
+                key: {
+                    'rate': round(bucket.rate, 2),
+                    'granted': bucket.granted,
+                    'throttled': bucket.throttled
+                }
+                for key, bucket in self._buckets.items()
+            }
+
+
+_shared_limiter = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_rate_limiter() -> AdaptiveRateLimiter:
+    """Process-wide limiter shared by every CampXScraper instance"""
+    global _shared_limiter
+    if _shared_limiter is None:
+        with _shared_lock:
+            if _shared_limiter is None:
+                _shared_limiter = AdaptiveRateLimiter()
+    return _shared_limiter
@@ -0,0 +1,217 @@
+"""
+Archive Reprocessor
+Re-runs ResultsParser + AnalyticsEngine over archived raw responses in
+parallel, writing results chunk by chunk so an interrupted run can resume
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, List
+
+# Path hack for sibling imports if run directly
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from core.logger import setup_logger
+from services.parser import ResultsParser
+from services.analytics import AnalyticsEngine
+from services.response_archive import ResponseArchive
+from services.subject_stats import SubjectStatsAggregator
+from services.quantile_sketch import QuantileSketches
+
+logger = setup_logger(__name__)
+
+# Per-worker-process state, set up once by _init_worker
+_worker = {}
+
+
+def _init_worker(archive_root):
+    _worker['archive'] = ResponseArchive(archive_root)
+    _worker['parser'] = ResultsParser()
+    _worker['analytics'] = AnalyticsEngine()
+
+
+def _process_chunk(chunk_id: int, entries: List[dict]):
+    """
+    Parse and analyse one chunk of archive entries (runs in a worker process)
+    Returns: (chunk_id, JSONL text, record count, error count, cohort stats dict)
+    """
+    archive = _worker['archive']
+    parser = _worker['parser']
+    analytics = _worker['analytics']
+    subject_stats = SubjectStatsAggregator()
+    sketches = QuantileSketches()
+    lines = []
+    errors = 0
+    
+    for entry in entries:
+        record = {
+            'hallTicket': entry['hallTicket'],
+            'examType': entry['examType'],
+            'fetchedAt': entry['fetchedAt'],
+            'sha256': entry['sha256']
+        }
+        try:
+            results_data = parser.parse_api_response(archive.get(entry['sha256']))
+            if results_data:
+                record['results'] = {**results_data, 'analytics': analytics.calculate_analytics(results_data)}
+                # One contribution per student (their latest general fetch), as in the live aggregates
+                if entry.get('cohort'):
+                    subject_stats.ingest(results_data, entry['hallTicket'])
+                    sketches.ingest(record['results'], entry['hallTicket'])
+            else:
+                record['error'] = 'Unable to parse results from response.'
+        except Exception as e:
+            record['error'] = str(e)
+        if 'error' in record:
+            errors += 1
+        lines.append(json.dumps(record, separators=(',', ':')))
+    
+    cohort_stats = {'subjectStats': subject_stats.to_dict(), 'quantiles': sketches.to_dict()}
+    return chunk_id, '\n'.join(lines) + '\n' if lines else '', len(entries), errors, cohort_stats
+
+
+class ArchiveReprocessor:
+    """
+    Output layout under `output_dir`:
+        manifest.json             chunk size and a digest of the work plan
+        chunk-00000.jsonl         one JSON record per archived response
+        chunk-00000.stats.json    per-subject statistics and quantile sketches for that chunk
+        subject_stats.json        all chunk subject statistics merged (written last)
+        quantiles.json            all chunk quantile sketches merged (QUANTILE_SKETCH_PATH seed)
+    
+    A chunk file exists only once it is complete (written to a temp file and
+    renamed, after its stats file), so resuming simply skips chunks that are
+    already on disk. The manifest guards against resuming with a different
+    plan or chunk size.
+    """
+    
+    def __init__(self, archive_root: str, output_dir: str, chunk_size: int = 500,
+                 workers: int = None, latest_only: bool = True):
+        self.archive_root = archive_root
+        self.archive = ResponseArchive(archive_root)
+        self.output_dir = output_dir
+        self.chunk_size = max(1, chunk_size)
+        self.workers = workers or os.cpu_count() or 1
+        self.latest_only = latest_only
+    
+    def plan(self) -> List[List[dict]]:
+        """Deterministic list of chunks of index entries to process"""
+        entries = self.archive.latest_entries() if self.latest_only else list(self.archive.iter_index())
+        entries.sort(key=lambda e: (e['hallTicket'], e['examType'], e['fetchedAt'], e['sha256']))
+        # Only each student's latest general fetch feeds the cohort statistics, so
+        # students split across chunks (or fetched repeatedly) count once
+        latest_general = {e['hallTicket']: e for e in entries if e['examType'] == 'general'}
+        for entry in entries:
+            entry['cohort'] = latest_general.get(entry['hallTicket']) is entry
+        return [entries[i:i + self.chunk_size] for i in range(0, len(entries), self.chunk_size)]
+    
+    def _chunk_path(self, chunk_id: int) -> str:
+        return os.path.join(self.output_dir, f"chunk-{chunk_id:05d}.jsonl")
+    
+    def _check_manifest(self, chunks):
+        digest = hashlib.sha256()
+        for chunk in chunks:
+            for entry in chunk:
+                digest.update(f"{entry['hallTicket']}|{entry['examType']}|{entry['fetchedAt']}|{entry['sha256']}\n".encode('utf-8'))
+        manifest = {
+            'chunkSize': self.chunk_size,
+            'latestOnly': self.latest_only,
+            'chunks': len(chunks),
+            'planDigest': digest.hexdigest()
+        }
+        
+        manifest_path = os.path.join(self.output_dir, 'manifest.json')
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                existing = json.load(f)
+            if existing != manifest:
+                raise ValueError(
+                    f"Output directory {self.output_dir} holds a run with a different plan; "
+                    "use a new output directory to reprocess"
+                )
+            return
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+    
+    def _stats_path(self, chunk_id: int) -> str:
+        return os.path.join(self.output_dir, f"chunk-{chunk_id:05d}.stats.json")
+    
+    @staticmethod
+    def _write_atomic(path: str, text: str):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    
+    def _write_chunk(self, chunk_id: int, text: str, cohort_stats: Dict):
+        self._write_atomic(self._stats_path(chunk_id), json.dumps(cohort_stats, separators=(',', ':')))
+        self._write_atomic(self._chunk_path(chunk_id), text)
+    
+    def _merge_cohort_stats(self, chunk_count: int) -> Dict:
+        """
+        Combine every chunk's statistics (resumed chunks included) into
+        subject_stats.json and quantiles.json
+        """
+        subject_stats = SubjectStatsAggregator()
+        sketches = QuantileSketches()
+        for chunk_id in range(chunk_count):
+            with open(self._stats_path(chunk_id), 'r', encoding='utf-8') as f:
+                cohort_stats = json.load(f)
+            subject_stats.merge(SubjectStatsAggregator.from_dict(cohort_stats['subjectStats']))
+            sketches.merge(QuantileSketches.from_dict(cohort_stats['quantiles']))
+        self._write_atomic(os.path.join(self.output_dir, 'subject_stats.json'), json.dumps(subject_stats.to_dict()))
+        sketches.save(os.path.join(self.output_dir, 'quantiles.json'))
+        return {'subjects': subject_stats.stats()['subjects'], 'sketches': sketches.stats()['sketches']}
+    
+    def run(self) -> Dict:
+        """Process every pending chunk across a process pool; returns run statistics"""
+        start = time.perf_counter()
+        os.makedirs(self.output_dir, exist_ok=True)
+        chunks = self.plan()
+        self._check_manifest(chunks)
+        
+        pending = [i for i in range(len(chunks))
+                   if not (os.path.exists(self._chunk_path(i)) and os.path.exists(self._stats_path(i)))]
+        stats = {
+            'chunks': len(chunks),
+            'resumedChunks': len(chunks) - len(pending),
+            'processedChunks': 0,
+            'records': 0,
+            'errors': 0
+        }
+        logger.info(f"Reprocessing {len(pending)} of {len(chunks)} chunks with {self.workers} workers")
+        
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(self.archive_root,)) as executor:
+            queue = iter(pending)
+            in_flight = set()
+            # Keep a couple of chunks queued per worker rather than submitting the whole plan
+            for chunk_id in queue:
+                in_flight.add(executor.submit(_process_chunk, chunk_id, chunks[chunk_id]))
+                if len(in_flight) >= self.workers * 2:
+                    break
+            
+            while in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk_id, text, count, errors, cohort_stats = future.result()
+                    self._write_chunk(chunk_id, text, cohort_stats)
+                    stats['processedChunks'] += 1
+                    stats['records'] += count
+                    stats['errors'] += errors
+                    next_id = next(queue, None)
+                    if next_id is not None:
+                        in_flight.add(executor.submit(_process_chunk, next_id, chunks[next_id]))
+        
+        stats.update(self._merge_cohort_stats(len(chunks)))
+        stats['elapsedSeconds'] = round(time.perf_counter() - start, 2)
+        stats['recordsPerSecond'] = round(stats['records'] / stats['elapsedSeconds'], 1) if stats['elapsedSeconds'] else None
+        logger.info(f"Reprocessing finished: {stats}")
+        return stats
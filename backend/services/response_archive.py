@@ -0,0 +1,137 @@
+"""
+Response Archive Service
+Append-only, compressed, content-addressed store of raw CampX responses,
+used to record live traffic and replay it without calling the portal
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+# Path hack for sibling imports if run directly
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from core.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def canonical_json(data) -> bytes:
+    """Stable byte encoding of a JSON value (sorted keys, no whitespace)"""
+    return json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+class ResponseArchive:
+    """
+    Layout under `root`:
+        objects/ab/abcdef....json.gz   gzip blob named by sha256 of the canonical JSON
+        index.jsonl                    one line per fetch: hallTicket, examType, fetchedAt, sha256
+    
+    Identical responses are stored once; the index records every fetch.
+    Blobs are written atomically and index lines with a single append, so
+    several worker processes can record into the same archive.
+    """
+    
+    def __init__(self, root: str):
+        self.root = root
+        self.objects_dir = os.path.join(root, 'objects')
+        self.index_path = os.path.join(root, 'index.jsonl')
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._latest: Dict[tuple, dict] = {}   # (HALLTICKET, examtype) -> newest index entry
+        self._index_offset = 0
+    
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.json.gz")
+    
+    def put(self, data) -> str:
+        """Store a JSON value and return its sha256 (no-op if already present)"""
+        payload = canonical_json(data)
+        digest = hashlib.sha256(payload).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                # mtime=0 keeps the compressed bytes reproducible
+                f.write(gzip.compress(payload, mtime=0))
+            os.replace(tmp_path, path)
+        return digest
+    
+    def get(self, digest: str):
+        """Load a stored JSON value by sha256"""
+        with open(self._object_path(digest), 'rb') as f:
+            return json.loads(gzip.decompress(f.read()))
+    
+    def record(self, hall_ticket: str, exam_type: str, data, fetched_at: Optional[str] = None) -> str:
+        """Archive one raw response and append its index entry"""
+        digest = self.put(data)
+        entry = {
+            'hallTicket': str(hall_ticket).upper(),
+            'examType': (exam_type or 'general').lower(),
+            'fetchedAt': fetched_at or datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'sha256': digest
+        }
+        line = json.dumps(entry, separators=(',', ':')) + '\n'
+        with self._lock:
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(line)
+        return digest
+    
+    def iter_index(self) -> Iterator[dict]:
+        """Stream every index entry in append order"""
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    logger.warning("Skipping corrupt archive index line")
+    
+    def latest_entries(self) -> List[dict]:
+        """Newest index entry per (hallTicket, examType)"""
+        with self._lock:
+            self._refresh_index()
+            return list(self._latest.values())
+    
+    def _refresh_index(self):
+        """Fold index lines appended since the last read into the latest-entry map (lock held)"""
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, 'rb') as f:
+            f.seek(self._index_offset)
+            for line in f:
+                # A line without its newline is still being written by another process
+                if not line.endswith(b'\n'):
+                    break
+                self._index_offset += len(line)
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                key = (entry['hallTicket'], entry['examType'])
+                current = self._latest.get(key)
+                if current is None or entry['fetchedAt'] >= current['fetchedAt']:
+                    self._latest[key] = entry
+    
+    def latest(self, hall_ticket: str, exam_type: str = 'general'):
+        """Most recently archived response for a lookup, or None"""
+        key = (str(hall_ticket).upper(), (exam_type or 'general').lower())
+        with self._lock:
+            self._refresh_index()
+            entry = self._latest.get(key)
+        if entry is None:
+            return None
+        return self.get(entry['sha256'])
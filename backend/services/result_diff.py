@@ -0,0 +1,115 @@
+"""
+Result Diff
+Structural change set between two versions of a student's parsed results:
+subject attempts added / removed / changed (matched by semester, subject
+code and exam month), backlogs cleared or added, and SGPA / CGPA deltas.
+Every step is a dict lookup, so a diff is linear in the number of subjects.
+"""
+
+import os
+import sys
+from typing import Dict, List, Optional
+
+# Path hack for sibling imports if run directly
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from services.content_hash import stable_hash
+
+# Subject fields compared between matching attempts (name -> getter)
+SUBJECT_FIELDS = {
+    'grade': lambda sub: sub.get('grade'),
+    'gradePoints': lambda sub: sub.get('gradePoints'),
+    'marks': lambda sub: sub.get('marks'),
+    'credits': lambda sub: sub.get('credits'),
+    'passed': lambda sub: bool(sub.get('status', {}).get('passed'))
+}
+
+
+def result_version(results_data: Dict) -> str:
+    """
+    Content version of a parsed result. The flat subject list repeats the
+    semesters' subjects, so only studentInfo, semesterInfo and summary are hashed.
+    """
+    return stable_hash([
+        results_data.get('studentInfo'),
+        results_data.get('semesterInfo'),
+        results_data.get('summary')
+    ])
+
+
+def _subject_ref(sub: Dict) -> Dict:
+    return {
+        'semester': sub.get('semester'),
+        'code': sub.get('code'),
+        'name': sub.get('name'),
+        'examMonth': sub.get('examMonth'),
+        'grade': sub.get('grade'),
+        'passed': bool(sub.get('status', {}).get('passed'))
+    }
+
+
+def _delta(old, new) -> Optional[Dict]:
+    """{'from', 'to', 'delta'} when the value changed, else None"""
+    if old == new:
+        return None
+    try:
+        delta = round(float(new) - float(old), 2)
+    except (ValueError, TypeError):
+        delta = None
+    return {'from': old, 'to': new, 'delta': delta}
+
+
+def diff_results(old: Dict, new: Dict) -> Dict:
+    """
+    Change set from old to new (parse_api_response / merge_parsed_results
+    outputs). A supplementary pass shows up as an added attempt, and the
+    attempt it replaced as removed, plus an entry in clearedBacklogs.
+    """
+    old_subjects = {(s.get('semester'), s.get('code'), s.get('examMonth')): s for s in old.get('subjects', [])}
+    new_subjects = {(s.get('semester'), s.get('code'), s.get('examMonth')): s for s in new.get('subjects', [])}
+    
+    added, changed = [], []
+    for key, sub in new_subjects.items():
+        previous = old_subjects.get(key)
+        if previous is None:
+            added.append(_subject_ref(sub))
+            continue
+        changes = {}
+        for name, getter in SUBJECT_FIELDS.items():
+            before, after = getter(previous), getter(sub)
+            if before != after:
+                changes[name] = {'from': before, 'to': after}
+        if changes:
+            changed.append({**_subject_ref(sub), 'changes': changes})
+    removed = [_subject_ref(sub) for key, sub in old_subjects.items() if key not in new_subjects]
+    
+    # Backlogs by (semester, code), whichever attempt is current
+    old_failed = {key[:2] for key, sub in old_subjects.items() if not sub.get('status', {}).get('passed')}
+    new_failed = {key[:2] for key, sub in new_subjects.items() if not sub.get('status', {}).get('passed')}
+    cleared, backlogs = [], []
+    for key, sub in new_subjects.items():
+        subject_key = key[:2]
+        if subject_key in old_failed and subject_key not in new_failed:
+            cleared.append(_subject_ref(sub))
+        elif subject_key in new_failed and subject_key not in old_failed:
+            backlogs.append(_subject_ref(sub))
+    
+    old_sgpa = {sem.get('semester'): sem.get('sgpa') for sem in old.get('semesterInfo', {}).get('semesters', [])}
+    sgpa: List[Dict] = []
+    for sem in new.get('semesterInfo', {}).get('semesters', []):
+        change = _delta(old_sgpa.get(sem.get('semester')), sem.get('sgpa'))
+        if change:
+            sgpa.append({'semester': sem.get('semester'), **change})
+    cgpa = _delta(old.get('semesterInfo', {}).get('cgpa'), new.get('semesterInfo', {}).get('cgpa'))
+    
+    return {
+        'changed': bool(added or removed or changed or sgpa or cgpa),
+        'subjects': {'added': added, 'removed': removed, 'changed': changed},
+        'clearedBacklogs': cleared,
+        'newBacklogs': backlogs,
+        'sgpa': sgpa,
+        'cgpa': cgpa
+    }
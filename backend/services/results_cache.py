@@ -0,0 +1,345 @@
+"""
+Results Cache Service
+Two-tier cache for processed results: a bounded in-process LRU in front of
+a SQLite (WAL mode) store shared by every worker process
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# Path hack for sibling imports if run directly
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from core.config import Config
+from core.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU with per-entry TTL. Bounded by entry count and,
+    when `max_bytes` is given, by the total of the sizes passed to set()
+    (values have no intrinsic size, so callers supply one, e.g. a serialised length).
+    """
+    
+    def __init__(self, max_entries: int, default_ttl: Optional[float] = None, max_bytes: Optional[int] = None):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict = OrderedDict()  # key -> (value, expires_at, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at, size = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key, value, ttl: Optional[float] = None, size: int = 0):
+        ttl = ttl if ttl is not None else self.default_ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[2]
+            if self.max_bytes is not None and size > self.max_bytes:
+                # Would evict everything else and still not fit
+                return
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+    
+    def delete(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[2]
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = {
+                'entries': len(self._entries),
+                'maxEntries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+            if self.max_bytes is not None:
+                stats['bytes'] = self._bytes
+                stats['maxBytes'] = self.max_bytes
+            return stats
+
+
+class SQLiteResultStore:
+    """
+    Disk tier backed by SQLite in WAL mode so all gunicorn workers share it.
+    Entries carry an absolute expiry and are kept for a further `stale_ttl`
+    so they can still be served (marked stale) when the upstream is down.
+    The total payload size is kept under `max_bytes` by evicting least
+    recently read entries.
+    
+    Reads never write: a hit is noted in memory and its accessed_at is
+    written with this worker's next set() or evict(), in the same
+    transaction. Eviction order therefore reflects reads up to each worker's
+    last write; at most PENDING_TOUCHES_MAX recent reads are held.
+    """
+    
+    EVICT_CHECK_INTERVAL = 50  # Writes between size checks
+    PENDING_TOUCHES_MAX = 10000
+    
+    def __init__(self, db_path: str, max_bytes: int, stale_ttl: float = 0):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.stale_ttl = stale_ttl
+        self._local = threading.local()
+        self._counter_lock = threading.Lock()
+        self._touched: OrderedDict = OrderedDict()  # key -> last read time, not yet written
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+        
+        conn = self._conn()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS results_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_results_cache_accessed ON results_cache(accessed_at)")
+        conn.commit()
+    
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections are not shareable across threads; keep one per thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+    
+    def get(self, key):
+        """Returns: (value, expires_at) or None"""
+        entry = self.get_sized(key)
+        return entry[:2] if entry is not None else None
+    
+    def get_sized(self, key):
+        """Returns: (value, expires_at, payload size) or None"""
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT value, expires_at FROM results_cache WHERE key = ?", (key,)
+        ).fetchone()
+        now = time.time()
+        
+        if row is None or row[1] <= now:
+            with self._counter_lock:
+                self.misses += 1
+                if row is not None:
+                    self.expirations += 1
+            return None
+        
+        with self._counter_lock:
+            self.hits += 1
+            self._touched[key] = now
+            self._touched.move_to_end(key)
+            if len(self._touched) > self.PENDING_TOUCHES_MAX:
+                self._touched.popitem(last=False)
+        return json.loads(row[0]), row[1], len(row[0])
+    
+    def get_stale(self, key):
+        """Returns: value even if expired (within the stale window), or None"""
+        row = self._conn().execute(
+            "SELECT value FROM results_cache WHERE key = ? AND expires_at > ?",
+            (key, time.time() - self.stale_ttl)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def _write_touches(self, conn: sqlite3.Connection):
+        """Record pending read times in the caller's transaction"""
+        with self._counter_lock:
+            touches = [(accessed_at, key) for key, accessed_at in self._touched.items()]
+            self._touched.clear()
+        if touches:
+            conn.executemany(
+                "UPDATE results_cache SET accessed_at = MAX(accessed_at, ?) WHERE key = ?", touches
+            )
+    
+    def set(self, key, value, ttl: float, payload: Optional[str] = None):
+        """payload: value already serialised by the caller, if at hand"""
+        payload = payload if payload is not None else json.dumps(value, separators=(',', ':'))
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO results_cache (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+            (key, payload, len(payload), now + ttl, now)
+        )
+        self._write_touches(conn)
+        conn.commit()
+        
+        with self._counter_lock:
+            self._writes += 1
+            check = self._writes % self.EVICT_CHECK_INTERVAL == 1
+        if check:
+            self.evict()
+    
+    def delete(self, key):
+        conn = self._conn()
+        conn.execute("DELETE FROM results_cache WHERE key = ?", (key,))
+        conn.commit()
+    
+    def evict(self):
+        """Drop entries past their stale window, then least recently read ones until under max_bytes"""
+        conn = self._conn()
+        self._write_touches(conn)
+        expired = conn.execute(
+            "DELETE FROM results_cache WHERE expires_at <= ?", (time.time() - self.stale_ttl,)
+        ).rowcount
+        
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results_cache").fetchone()[0]
+        evicted = 0
+        if total > self.max_bytes:
+            excess = total - self.max_bytes
+            victims = []
+            for key, size in conn.execute("SELECT key, size FROM results_cache ORDER BY accessed_at"):
+                victims.append((key,))
+                excess -= size
+                if excess <= 0:
+                    break
+            conn.executemany("DELETE FROM results_cache WHERE key = ?", victims)
+            evicted = len(victims)
+        conn.commit()
+        
+        with self._counter_lock:
+            self.expirations += expired
+            self.evictions += evicted
+        if evicted:
+            logger.info(f"Evicted {evicted} cached results to stay under {self.max_bytes} bytes")
+    
+    def stats(self) -> Dict:
+        row = self._conn().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results_cache").fetchone()
+        with self._counter_lock:
+            return {
+                'entries': row[0],
+                'bytes': row[1],
+                'maxBytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+
+class ResultsCache:
+    """
+    Memory tier -> disk tier lookup for processed results.
+    Disk hits are promoted into memory for the entry's remaining lifetime.
+    Cached values are shared between callers and must be treated as read-only.
+    """
+    
+    def __init__(self, cache_dir: str = None, ttl: int = None, memory_entries: int = None,
+                 max_bytes: int = None, stale_ttl: int = None, memory_max_bytes: int = None):
+        self.ttl = ttl if ttl is not None else Config.CACHE_TTL
+        # Memory entries are sized by their serialised (disk payload) length
+        self.memory = LRUCache(memory_entries or Config.CACHE_MEMORY_ENTRIES, default_ttl=self.ttl,
+                               max_bytes=memory_max_bytes or Config.CACHE_MEMORY_MAX_BYTES)
+        self.disk = SQLiteResultStore(
+            os.path.join(cache_dir or Config.CACHE_DIR, 'results.db'),
+            max_bytes or Config.CACHE_MAX_BYTES,
+            stale_ttl=stale_ttl if stale_ttl is not None else Config.CACHE_STALE_TTL
+        )
+    
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        
+        try:
+            entry = self.disk.get_sized(key)
+        except sqlite3.Error as e:
+            logger.error(f"Results cache read failed: {str(e)}")
+            return None
+        if entry is None:
+            return None
+        
+        value, expires_at, size = entry
+        self.memory.set(key, value, ttl=max(0.0, expires_at - time.time()), size=size)
+        return value
+    
+    def get_stale(self, key: str) -> Optional[Any]:
+        """Last known value for `key`, fresh or expired; used when a refresh is not possible"""
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        try:
+            return self.disk.get_stale(key)
+        except sqlite3.Error as e:
+            logger.error(f"Results cache read failed: {str(e)}")
+            return None
+    
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        ttl = ttl if ttl is not None else self.ttl
+        payload = json.dumps(value, separators=(',', ':'))
+        self.memory.set(key, value, ttl=ttl, size=len(payload))
+        try:
+            self.disk.set(key, value, ttl, payload)
+        except sqlite3.Error as e:
+            logger.error(f"Results cache write failed: {str(e)}")
+    
+    def delete(self, key: str):
+        self.memory.delete(key)
+        self.disk.delete(key)
+    
+    def stats(self) -> Dict:
+        return {
+            'memory': self.memory.stats(),
+            'disk': self.disk.stats()
+        }
@@ -0,0 +1,522 @@
+"""
+Results Store
+Persistent, normalised SQLite (WAL mode) store of the latest processed
+result per student, written at ingest time and shared by every worker.
+Indexed for cohort queries (batch, program, subject code, grade, exam
+month) so they are index lookups instead of re-scrapes. Cohort aggregates
+(CGPA distribution, pass rate, backlogs, subject difficulty) are kept as
+materialized tables, updated in the same transaction as each write.
+"""
+
+import math
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+# Path hack for sibling imports if run directly
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from core.config import Config
+from core.logger import setup_logger
+from services.ranking import ranking_cgpa
+from services.subject_stats import marks_value
+
+logger = setup_logger(__name__)
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS students (
+        hall_ticket TEXT PRIMARY KEY,
+        name TEXT,
+        batch TEXT,
+        program TEXT,
+        cgpa REAL,
+        backlogs INTEGER,
+        version TEXT,
+        exam_types TEXT,
+        updated_at REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS semesters (
+        hall_ticket TEXT NOT NULL REFERENCES students(hall_ticket),
+        semester INTEGER NOT NULL,
+        sgpa REAL,
+        PRIMARY KEY (hall_ticket, semester)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS subject_results (
+        hall_ticket TEXT NOT NULL REFERENCES students(hall_ticket),
+        semester INTEGER,
+        code TEXT NOT NULL,
+        name TEXT,
+        credits REAL,
+        grade TEXT,
+        grade_points REAL,
+        marks REAL,
+        exam_month TEXT,
+        passed INTEGER NOT NULL,
+        absent INTEGER NOT NULL,
+        malpractice INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS cohort_stats (
+        batch TEXT NOT NULL,
+        program TEXT NOT NULL,
+        students INTEGER NOT NULL,
+        cgpa_count INTEGER NOT NULL,
+        cgpa_sum REAL NOT NULL,
+        cgpa_sq_sum REAL NOT NULL,
+        all_clear INTEGER NOT NULL,
+        with_backlogs INTEGER NOT NULL,
+        backlogs INTEGER NOT NULL,
+        PRIMARY KEY (batch, program)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS cohort_cgpa_buckets (
+        batch TEXT NOT NULL,
+        program TEXT NOT NULL,
+        bucket INTEGER NOT NULL,
+        students INTEGER NOT NULL,
+        PRIMARY KEY (batch, program, bucket)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS subject_difficulty (
+        batch TEXT NOT NULL,
+        program TEXT NOT NULL,
+        code TEXT NOT NULL,
+        name TEXT,
+        attempts INTEGER NOT NULL,
+        failed INTEGER NOT NULL,
+        marks_count INTEGER NOT NULL,
+        marks_sum REAL NOT NULL,
+        fail_rate REAL,
+        PRIMARY KEY (batch, program, code)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_students_batch_program ON students(batch, program)",
+    "CREATE INDEX IF NOT EXISTS idx_students_program ON students(program)",
+    "CREATE INDEX IF NOT EXISTS idx_subject_results_hall_ticket ON subject_results(hall_ticket)",
+    "CREATE INDEX IF NOT EXISTS idx_subject_results_code_grade ON subject_results(code, grade)",
+    "CREATE INDEX IF NOT EXISTS idx_subject_results_exam_month ON subject_results(exam_month)",
+    "CREATE INDEX IF NOT EXISTS idx_subject_difficulty_rank ON subject_difficulty(batch, program, fail_rate, attempts)",
+)
+
+ALL = '*'
+CGPA_BUCKET_WIDTH = 0.5
+CGPA_BUCKETS = 20  # 0-10 in steps of CGPA_BUCKET_WIDTH; a perfect 10 joins the top bucket
+
+SUBJECT_COLUMNS = ('semester', 'code', 'name', 'credits', 'grade', 'grade_points', 'marks',
+                   'exam_month', 'passed', 'absent', 'malpractice')
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        return float(value) if value not in (None, '') else None
+    except (ValueError, TypeError):
+        return None
+
+
+def _subject_dict(row) -> Dict:
+    """subject_results row (SUBJECT_COLUMNS order) in the API's field names"""
+    semester, code, name, credits, grade, grade_points, marks, exam_month, passed, absent, malpractice = row
+    return {
+        'semester': semester,
+        'code': code,
+        'name': name,
+        'credits': credits,
+        'grade': grade,
+        'gradePoints': grade_points,
+        'marks': marks,
+        'examMonth': exam_month,
+        'status': {'passed': bool(passed), 'absent': bool(absent), 'malpractice': bool(malpractice)}
+    }
+
+
+def _cohorts(batch, program) -> tuple:
+    """Aggregate levels a student counts towards; repeats dropped when batch / program are unknown"""
+    batch, program = batch or ALL, program or ALL
+    return tuple(dict.fromkeys(((ALL, ALL), (batch, ALL), (ALL, program), (batch, program))))
+
+
+def _cgpa_bucket(cgpa: float) -> int:
+    return min(max(int(cgpa / CGPA_BUCKET_WIDTH), 0), CGPA_BUCKETS - 1)
+
+
+class ResultsStore:
+    """
+    Tables:
+        students(hall_ticket PK, name, batch, program, cgpa, version, exam_types, updated_at)
+        semesters(hall_ticket, semester, sgpa)
+        subject_results(hall_ticket, semester, code, name, credits, grade,
+                        grade_points, marks, exam_month, passed, absent, malpractice)
+    
+    Materialized aggregates, per cohort (batch|*, program|*):
+        cohort_stats(students, CGPA count / sum / sum of squares, all clear,
+                     students with backlogs, backlogs)
+        cohort_cgpa_buckets(bucket, students)
+        subject_difficulty(code, attempts, failed, marks count / sum, fail_rate)
+    
+    A student's rows are replaced as a whole in one transaction whenever a
+    result with a new version is written; the same transaction subtracts
+    their previous contribution from the aggregates and adds the new one,
+    so dashboard reads never scan students. cgpa is the ranking CGPA (API
+    value, else the computed GPA); backlogs is the analytics' active
+    backlog count.
+    """
+    
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or Config.RESULTS_STORE_PATH
+        self._local = threading.local()
+        self._counter_lock = threading.Lock()
+        self.writes = 0
+        self.unchanged = 0
+        
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+        
+        conn = self._conn()
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(students)")}
+        if columns and 'backlogs' not in columns:
+            # Stores created before the aggregates existed
+            conn.execute("ALTER TABLE students ADD COLUMN backlogs INTEGER")
+        for statement in SCHEMA:
+            conn.execute(statement)
+        conn.commit()
+        if not conn.execute("SELECT 1 FROM cohort_stats LIMIT 1").fetchone() and \
+                conn.execute("SELECT 1 FROM students LIMIT 1").fetchone():
+            self.rebuild_aggregates()
+    
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections are not shareable across threads; keep one per thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+    
+    def upsert(self, response: Dict, exam_types=('general',)) -> bool:
+        """
+        Write one processed result (parsed data + 'analytics', optionally
+        'version'). Returns False when nothing was written: no hall ticket,
+        the stored version is identical, or the write failed.
+        """
+        student_info = response.get('studentInfo', {})
+        hall_ticket = (student_info.get('hallTicket') or '').upper()
+        if not hall_ticket:
+            return False
+        version = response.get('version')
+        
+        semester_rows = [
+            (hall_ticket, sem.get('semester'), _to_float(sem.get('sgpa')))
+            for sem in response.get('semesterInfo', {}).get('semesters', [])
+            if sem.get('semester') is not None
+        ]
+        subject_rows = []
+        for sub in response.get('subjects', []):
+            if not sub.get('code'):
+                continue
+            status = sub.get('status', {})
+            subject_rows.append((
+                hall_ticket, sub.get('semester'), sub['code'], sub.get('name'), _to_float(sub.get('credits')),
+                sub.get('grade'), _to_float(sub.get('gradePoints')), marks_value(sub.get('marks')),
+                sub.get('examMonth'), int(bool(status.get('passed'))), int(bool(status.get('absent'))),
+                int(bool(status.get('malpractice')))
+            ))
+        
+        try:
+            backlogs = int(response.get('analytics', {}).get('passFailStatus', {}).get('failed') or 0)
+        except (ValueError, TypeError):
+            backlogs = len({(row[1], row[2]) for row in subject_rows if not row[9]})
+        cgpa = ranking_cgpa(response)
+        
+        try:
+            conn = self._conn()
+            with conn:
+                # Take the write lock before reading the previous contribution
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute(
+                    "SELECT version, batch, program, cgpa, backlogs FROM students WHERE hall_ticket = ?", (hall_ticket,)
+                ).fetchone()
+                if version and row and row[0] == version:
+                    with self._counter_lock:
+                        self.unchanged += 1
+                    return False
+                if row:
+                    self._apply_aggregates(conn, *row[1:], self._subject_contribution(conn, hall_ticket), -1)
+                
+                conn.execute(
+                    "INSERT OR REPLACE INTO students "
+                    "(hall_ticket, name, batch, program, cgpa, backlogs, version, exam_types, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (hall_ticket, student_info.get('name'), student_info.get('batch'), student_info.get('program'),
+                     cgpa, backlogs, version, '+'.join(exam_types), time.time())
+                )
+                conn.execute("DELETE FROM semesters WHERE hall_ticket = ?", (hall_ticket,))
+                conn.execute("DELETE FROM subject_results WHERE hall_ticket = ?", (hall_ticket,))
+                conn.executemany("INSERT OR REPLACE INTO semesters (hall_ticket, semester, sgpa) VALUES (?, ?, ?)",
+                                 semester_rows)
+                conn.executemany(
+                    f"INSERT INTO subject_results (hall_ticket, {', '.join(SUBJECT_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * (len(SUBJECT_COLUMNS) + 1))})",
+                    subject_rows
+                )
+                self._apply_aggregates(
+                    conn, student_info.get('batch'), student_info.get('program'), cgpa, backlogs,
+                    [(row[2], row[3], row[7], row[9]) for row in subject_rows], 1
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Results store write failed for {hall_ticket}: {str(e)}")
+            return False
+        
+        with self._counter_lock:
+            self.writes += 1
+        return True
+    
+    @staticmethod
+    def _subject_contribution(conn: sqlite3.Connection, hall_ticket: str) -> List[tuple]:
+        """Stored (code, name, marks, passed) rows of one student"""
+        return conn.execute(
+            "SELECT code, name, marks, passed FROM subject_results WHERE hall_ticket = ?", (hall_ticket,)
+        ).fetchall()
+    
+    @staticmethod
+    def _apply_aggregates(conn: sqlite3.Connection, batch, program, cgpa, backlogs, subjects: List[tuple], sign: int):
+        """Add (sign=1) or subtract (sign=-1) one student's contribution to every cohort they belong to"""
+        backlogs = backlogs or 0
+        has_cgpa = cgpa is not None
+        cgpa = cgpa if has_cgpa else 0.0
+        for cohort in _cohorts(batch, program):
+            conn.execute(
+                "INSERT INTO cohort_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(batch, program) DO UPDATE SET "
+                "students = students + excluded.students, cgpa_count = cgpa_count + excluded.cgpa_count, "
+                "cgpa_sum = cgpa_sum + excluded.cgpa_sum, cgpa_sq_sum = cgpa_sq_sum + excluded.cgpa_sq_sum, "
+                "all_clear = all_clear + excluded.all_clear, with_backlogs = with_backlogs + excluded.with_backlogs, "
+                "backlogs = backlogs + excluded.backlogs",
+                (*cohort, sign, sign * has_cgpa, sign * cgpa, sign * cgpa * cgpa,
+                 sign * (backlogs == 0), sign * (backlogs > 0), sign * backlogs)
+            )
+            if has_cgpa:
+                conn.execute(
+                    "INSERT INTO cohort_cgpa_buckets VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(batch, program, bucket) DO UPDATE SET students = students + excluded.students",
+                    (*cohort, _cgpa_bucket(cgpa), sign)
+                )
+            conn.executemany(
+                "INSERT INTO subject_difficulty VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(batch, program, code) DO UPDATE SET "
+                "name = COALESCE(excluded.name, name), attempts = attempts + excluded.attempts, "
+                "failed = failed + excluded.failed, marks_count = marks_count + excluded.marks_count, "
+                "marks_sum = marks_sum + excluded.marks_sum, "
+                "fail_rate = CAST(failed + excluded.failed AS REAL) / NULLIF(attempts + excluded.attempts, 0)",
+                [
+                    (*cohort, code, name, sign, sign * (not passed), sign * (marks is not None),
+                     sign * (marks or 0.0), float(not passed))
+                    for code, name, marks, passed in subjects
+                ]
+            )
+            if sign < 0:
+                conn.execute("DELETE FROM cohort_stats WHERE batch = ? AND program = ? AND students <= 0", cohort)
+                conn.execute("DELETE FROM cohort_cgpa_buckets WHERE batch = ? AND program = ? AND students <= 0", cohort)
+                conn.execute("DELETE FROM subject_difficulty WHERE batch = ? AND program = ? AND attempts <= 0", cohort)
+    
+    def rebuild_aggregates(self):
+        """Recompute every aggregate from the stored rows (full scan; only needed for stores that predate them)"""
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for table in ('cohort_stats', 'cohort_cgpa_buckets', 'subject_difficulty'):
+                conn.execute(f"DELETE FROM {table}")
+            students = conn.execute("SELECT hall_ticket, batch, program, cgpa, backlogs FROM students").fetchall()
+            for hall_ticket, batch, program, cgpa, backlogs in students:
+                subjects = self._subject_contribution(conn, hall_ticket)
+                if backlogs is None:
+                    backlogs = len({code for code, _, _, passed in subjects if not passed})
+                    conn.execute("UPDATE students SET backlogs = ? WHERE hall_ticket = ?", (backlogs, hall_ticket))
+                self._apply_aggregates(conn, batch, program, cgpa, backlogs, subjects, 1)
+        logger.info(f"Rebuilt results store aggregates for {len(students)} students")
+    
+    def cohort_summary(self, batch=None, program=None) -> Optional[Dict]:
+        """
+        CGPA distribution, pass rate and backlog counts for a cohort (batch
+        and / or program; neither for the whole store). One primary-key read
+        plus at most CGPA_BUCKETS bucket rows; None for an unknown cohort.
+        """
+        cohort = (batch or ALL, program or ALL)
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT students, cgpa_count, cgpa_sum, cgpa_sq_sum, all_clear, with_backlogs, backlogs "
+            "FROM cohort_stats WHERE batch = ? AND program = ?", cohort
+        ).fetchone()
+        if row is None:
+            return None
+        students, cgpa_count, cgpa_sum, cgpa_sq_sum, all_clear, with_backlogs, backlogs = row
+        buckets = conn.execute(
+            "SELECT bucket, students FROM cohort_cgpa_buckets WHERE batch = ? AND program = ? ORDER BY bucket", cohort
+        ).fetchall()
+        mean = cgpa_sum / cgpa_count if cgpa_count else None
+        return {
+            'batch': batch,
+            'program': program,
+            'students': students,
+            'cgpa': {
+                'count': cgpa_count,
+                'mean': round(mean, 2) if mean is not None else None,
+                'stdDev': round(math.sqrt(max(0.0, cgpa_sq_sum / cgpa_count - mean * mean)), 2) if cgpa_count else None,
+                'distribution': [
+                    {'from': bucket * CGPA_BUCKET_WIDTH, 'to': (bucket + 1) * CGPA_BUCKET_WIDTH, 'students': count}
+                    for bucket, count in buckets
+                ]
+            },
+            'passRate': round(all_clear / students, 4) if students else None,
+            'allClear': all_clear,
+            'studentsWithBacklogs': with_backlogs,
+            'backlogs': backlogs
+        }
+    
+    def subject_difficulty(self, batch=None, program=None, limit: int = 10, min_attempts: int = 1,
+                           easiest: bool = False) -> List[Dict]:
+        """
+        Subjects of a cohort ranked by fail rate (hardest first, or easiest
+        first), ties broken by attempts. Read in order from
+        idx_subject_difficulty_rank.
+        """
+        direction = 'ASC' if easiest else 'DESC'
+        rows = self._conn().execute(
+            "SELECT code, name, attempts, failed, marks_count, marks_sum, fail_rate FROM subject_difficulty "
+            "WHERE batch = ? AND program = ? AND attempts >= ? "
+            f"ORDER BY fail_rate {direction}, attempts {direction} LIMIT ?",
+            (batch or ALL, program or ALL, min_attempts, limit)
+        ).fetchall()
+        return [
+            {
+                'rank': rank,
+                'code': code,
+                'name': name,
+                'attempts': attempts,
+                'failed': failed,
+                'failRate': round(fail_rate, 4),
+                'marks': {'count': marks_count, 'mean': round(marks_sum / marks_count, 2) if marks_count else None}
+            }
+            for rank, (code, name, attempts, failed, marks_count, marks_sum, fail_rate) in enumerate(rows, 1)
+        ]
+    
+    def get_student(self, hall_ticket: str) -> Optional[Dict]:
+        """Stored student with semesters and subject results, or None"""
+        hall_ticket = hall_ticket.upper()
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT hall_ticket, name, batch, program, cgpa, version, exam_types, updated_at FROM students WHERE hall_ticket = ?",
+            (hall_ticket,)
+        ).fetchone()
+        if row is None:
+            return None
+        semesters = conn.execute(
+            "SELECT semester, sgpa FROM semesters WHERE hall_ticket = ? ORDER BY semester", (hall_ticket,)
+        ).fetchall()
+        subjects = conn.execute(
+            f"SELECT {', '.join(SUBJECT_COLUMNS)} FROM subject_results WHERE hall_ticket = ? ORDER BY rowid",
+            (hall_ticket,)
+        ).fetchall()
+        return {
+            'hallTicket': row[0], 'name': row[1], 'batch': row[2], 'program': row[3], 'cgpa': row[4],
+            'version': row[5], 'examTypes': row[6].split('+') if row[6] else [], 'updatedAt': row[7],
+            'semesters': [{'semester': semester, 'sgpa': sgpa} for semester, sgpa in semesters],
+            'subjects': [_subject_dict(subject) for subject in subjects]
+        }
+    
+    def subject_results(self, code: str, batch=None, program=None, grade=None, exam_month=None,
+                        limit: int = 100, offset: int = 0) -> List[Dict]:
+        """
+        Attempts of one subject across stored students, e.g. every F in a
+        subject for batch 2022. Served from idx_subject_results_code_grade.
+        """
+        clauses = ["r.code = ?"]
+        params = [code]
+        for column, value in (('s.batch', batch), ('s.program', program), ('r.grade', grade), ('r.exam_month', exam_month)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        rows = self._conn().execute(
+            f"SELECT s.hall_ticket, s.name, s.batch, s.program, {', '.join('r.' + c for c in SUBJECT_COLUMNS)} "
+            f"FROM subject_results r JOIN students s ON s.hall_ticket = r.hall_ticket "
+            f"WHERE {' AND '.join(clauses)} ORDER BY s.hall_ticket, r.semester LIMIT ? OFFSET ?",
+            (*params, limit, offset)
+        ).fetchall()
+        return [
+            {'hallTicket': row[0], 'studentName': row[1], 'batch': row[2], 'program': row[3], **_subject_dict(row[4:])}
+            for row in rows
+        ]
+    
+    def iter_students(self, batch=None, program=None) -> Iterator[Dict]:
+        """Student rows (no subjects), optionally for one batch / program"""
+        clauses, params = [], []
+        for column, value in (('batch', batch), ('program', program)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        for row in self._conn().execute(
+            f"SELECT hall_ticket, name, batch, program, cgpa FROM students {where} ORDER BY hall_ticket", params
+        ):
+            yield {'hallTicket': row[0], 'name': row[1], 'batch': row[2], 'program': row[3], 'cgpa': row[4]}
+    
+    def iter_subject_rows(self, batch=None, program=None) -> Iterator[Dict]:
+        """
+        Every stored subject attempt with its student, optionally for one
+        batch / program, streamed from the cursor (no sort, so memory stays
+        constant). Keys match ResultsExporter.COHORT_COLUMNS; a student's
+        attempts are consecutive.
+        """
+        clauses, params = [], []
+        for column, value in (('s.batch', batch), ('s.program', program)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        for row in self._conn().execute(
+            "SELECT s.hall_ticket, s.name, s.batch, s.program, r.semester, r.code, r.name, r.credits, r.grade, "
+            f"r.marks, r.exam_month, r.passed FROM students s JOIN subject_results r ON r.hall_ticket = s.hall_ticket {where}",
+            params
+        ):
+            yield {
+                'hallTicket': row[0], 'studentName': row[1], 'batch': row[2], 'program': row[3],
+                'semester': row[4], 'code': row[5], 'name': row[6], 'credits': row[7], 'grade': row[8],
+                'marks': row[9], 'examMonth': row[10], 'passed': bool(row[11])
+            }
+    
+    def seed_ranking(self, index) -> int:
+        """Load every stored student into a RankingIndex; returns the number loaded"""
+        count = 0
+        for student in self.iter_students():
+            index.update(student['hallTicket'], student['batch'], student['program'], student['cgpa'], student['name'])
+            count += 1
+        return count
+    
+    def stats(self) -> Dict:
+        conn = self._conn()
+        students = conn.execute("SELECT COUNT(*) FROM students").fetchone()[0]
+        subjects = conn.execute("SELECT COUNT(*) FROM subject_results").fetchone()[0]
+        cohorts = conn.execute("SELECT COUNT(*) FROM cohort_stats").fetchone()[0]
+        with self._counter_lock:
+            return {
+                'students': students,
+                'subjectResults': subjects,
+                'cohorts': cohorts,
+                'writes': self.writes,
+                'unchanged': self.unchanged
+            }
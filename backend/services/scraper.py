@@ -4,9 +4,12 @@ Handles direct API communication to fetch results
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import sys
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # Add parent directory to path
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -16,12 +19,23 @@ if backend_dir not in sys.path:
 
 from core.config import Config
 from core.logger import setup_logger
+from services.rate_limiter import get_shared_rate_limiter, parse_retry_after
+from services.negative_cache import get_shared_negative_cache
+from services.circuit_breaker import get_shared_circuit_breaker
+from services.hedging import get_shared_hedger
+from services.response_archive import ResponseArchive
 
 logger = setup_logger(__name__)
 
 class CampXScraper:
     """API Client for CampX results"""
     
+    # One pooled keep-alive session per process, shared by every scraper
+    # instance and every request thread so warm connections get reused
+    _session = None
+    _session_pid = None
+    _session_lock = threading.Lock()
+    
     def __init__(self):
         # Use API URL from config
         self.api_url = Config.CAMPX_API_URL
@@ -43,6 +57,53 @@ class CampXScraper:
             "x-institution-code": Config.CAMPX_INSTITUTION_CODE,
             "x-tenant-id": Config.CAMPX_TENANT_ID
         }
+        self.timeout = Config.CAMPX_TIMEOUT
+        
+        # Limiter is process-wide so parallel scrapers share one budget per tenant
+        self.tenant_key = Config.CAMPX_TENANT_ID or 'default'
+        self.rate_limiter = get_shared_rate_limiter() if Config.RATE_LIMIT_ENABLED else None
+        # Hall tickets recently reported as not found are answered locally
+        self.negative_cache = get_shared_negative_cache() if Config.NEGATIVE_CACHE_ENABLED else None
+        self.circuit_breaker = get_shared_circuit_breaker()
+        self.hedger = get_shared_hedger() if Config.HEDGE_ENABLED else None
+        
+        # Optional raw response capture ('record') or offline serving ('replay')
+        self.archive_mode = Config.ARCHIVE_MODE
+        self.archive = ResponseArchive(Config.ARCHIVE_DIR) if self.archive_mode in ('record', 'replay') else None
+    
+    @classmethod
+    def get_session(cls):
+        """
+        Return the process-wide pooled session, creating it on first use.
+        A new session is built after fork so gunicorn workers never share sockets.
+        """
+        pid = os.getpid()
+        if cls._session is not None and cls._session_pid == pid:
+            return cls._session
+        
+        with cls._session_lock:
+            if cls._session is None or cls._session_pid != pid:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=Config.CAMPX_POOL_HOSTS,
+                    pool_maxsize=Config.CAMPX_POOL_SIZE,
+                    pool_block=False
+                )
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                cls._session = session
+                cls._session_pid = pid
+                logger.info(f"Created pooled upstream session (pool size {Config.CAMPX_POOL_SIZE})")
+        return cls._session
+    
+    @classmethod
+    def close_session(cls):
+        """Close the shared session and drop its pooled connections"""
+        with cls._session_lock:
+            if cls._session is not None:
+                cls._session.close()
+            cls._session = None
+            cls._session_pid = None
     
     def fetch_results(self, hall_ticket, exam_type='general', view_type='All Semesters'):
         """
@@ -55,20 +116,80 @@ class CampXScraper:
                 'rollNo': hall_ticket
             }
             
+            if self.archive_mode == 'replay':
+                logger.info(f"Replaying archived results for {hall_ticket}")
+                return self.archive.latest(hall_ticket, params['examType'])
+            
+            negative_key = f"{str(hall_ticket).upper()}:{params['examType']}"
+            if self.negative_cache and self.negative_cache.contains(negative_key):
+                logger.info(f"Skipping fetch for {hall_ticket}: recently reported as not found")
+                return None
+            
+            # Fail fast while the circuit is open instead of waiting out the timeout.
+            # Checked before the limiter so refused calls spend no token.
+            if not self.circuit_breaker.allow_request():
+                logger.warning(f"Upstream circuit open, skipping fetch for {hall_ticket}")
+                return None
+            
             logger.info(f"Fetching results from API for {hall_ticket}")
             
-            response = requests.get(
-                self.api_url, 
-                params=params, 
-                headers=self.headers, 
-                timeout=10
-            )
+            def send():
+                return self.get_session().get(
+                    self.api_url, 
+                    params=params, 
+                    headers=self.headers, 
+                    timeout=self.timeout
+                )
+            
+            try:
+                if self.rate_limiter and not self.rate_limiter.acquire(self.tenant_key, timeout=self.timeout):
+                    self.circuit_breaker.release()
+                    logger.warning(f"Upstream rate limit wait exceeds timeout, skipping fetch for {hall_ticket}")
+                    return None
+                if self.hedger:
+                    # A hedge only goes out if the limiter has a token to spare right now
+                    can_hedge = (lambda: self.rate_limiter.acquire(self.tenant_key, timeout=0)) if self.rate_limiter else None
+                    response = self.hedger.run(send, can_hedge)
+                else:
+                    response = send()
+            except requests.RequestException as e:
+                self.circuit_breaker.record_failure()
+                if isinstance(e, requests.Timeout) and self.rate_limiter:
+                    self.rate_limiter.on_throttle(self.tenant_key)
+                raise
+            except Exception:
+                # Not an upstream failure, but a half-open probe slot must not leak
+                self.circuit_breaker.release()
+                raise
+            
+            if response.status_code >= 500:
+                self.circuit_breaker.record_failure()
+            else:
+                self.circuit_breaker.record_success()
+            
+            if response.status_code in (429, 503):
+                if self.rate_limiter:
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    self.rate_limiter.on_throttle(self.tenant_key, retry_after)
+                logger.warning(f"Upstream throttled request with status {response.status_code}")
+                return None
+            
+            if self.rate_limiter and response.status_code in (200, 404):
+                self.rate_limiter.on_success(self.tenant_key)
             
             if response.status_code == 200:
                 logger.info("API request successful")
-                return response.json()
+                data = response.json()
+                if self.archive_mode == 'record':
+                    try:
+                        self.archive.record(hall_ticket, params['examType'], data)
+                    except (OSError, TypeError, ValueError) as e:
+                        logger.error(f"Failed to archive response: {str(e)}")
+                return data
             elif response.status_code == 404:
                 logger.warning(f"No results found for {hall_ticket}")
+                if self.negative_cache:
+                    self.negative_cache.add(negative_key)
                 return None
             else:
                 logger.error(f"API request failed with status {response.status_code}: {response.text}")
@@ -80,3 +201,19 @@ class CampXScraper:
         except Exception as e:
             logger.error(f"Error fetching results: {str(e)}")
             return None
+    
+    def fetch_results_multi(self, hall_ticket, exam_types, view_type='All Semesters'):
+        """
+        Fetch several exam types concurrently (one upstream round trip of wall-clock time)
+        Returns: Dict mapping exam type -> JSON response or None, in the order given
+        """
+        exam_types = list(dict.fromkeys((t or 'general').lower() for t in exam_types))
+        if not exam_types:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=len(exam_types), thread_name_prefix='exam-type') as executor:
+            futures = {
+                exam_type: executor.submit(self.fetch_results, hall_ticket, exam_type, view_type)
+                for exam_type in exam_types
+            }
+            return {exam_type: future.result() for exam_type, future in futures.items()}
@@ -0,0 +1,87 @@
+"""
+Single-Flight Request Coalescing
+Ensures only one in-flight computation runs per key; concurrent callers
+for the same key wait for it and share its result
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class _Call:
+    """An in-flight computation and the callers waiting on it"""
+    
+    __slots__ = ('done', 'result', 'error', 'waiters')
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key.
+    
+    The first caller (the leader) runs the function; callers arriving while
+    it is running block until it finishes and receive the same result (or
+    the same exception). Nothing is remembered once the call completes.
+    """
+    
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self._executed = 0
+        self._coalesced = 0
+    
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Tuple[Any, bool]:
+        """
+        Run `fn(*args, **kwargs)` once per concurrent burst of `key`
+        Returns: (result, shared) where shared is True for coalesced callers
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._executed += 1
+                leader = True
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        
+        try:
+            call.result = fn(*args, **kwargs)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        
+        return call.result, False
+    
+    def in_flight(self, key: Hashable) -> bool:
+        """Check whether a computation for `key` is currently running"""
+        with self._lock:
+            return key in self._calls
+    
+    def stats(self) -> Dict:
+        """Counters for executed vs coalesced calls"""
+        with self._lock:
+            total = self._executed + self._coalesced
+            return {
+                'executed': self._executed,
+                'coalesced': self._coalesced,
+                'inFlight': len(self._calls),
+                'coalescedRatio': round(self._coalesced / total, 4) if total else 0.0
+            }
@@ -0,0 +1,273 @@
+"""
+Subject Statistics
+Streaming per-subject cohort statistics keyed by (batch, subject code):
+running marks moments (Welford), pass rate and grade histogram. Updated as
+results are ingested; re-ingesting a student replaces their contribution.
+Aggregators serialise to plain dicts and merge (Chan et al.), so worker
+processes can combine their partial statistics.
+"""
+
+import math
+import os
+import sys
+import threading
+from typing import Dict, List, Optional
+
+# Path hack for sibling imports if run directly
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from core.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def marks_value(marks) -> Optional[float]:
+    """Numeric marks as analytics reads them; None for absent / non-numeric"""
+    text = str(marks if marks is not None else '')
+    try:
+        return float(text) if text.replace('.', '').isdigit() else None
+    except ValueError:
+        # e.g. '1.2.3' or superscript digits pass isdigit() but not float()
+        return None
+
+
+class RunningMoments:
+    """Count, mean and sum of squared deviations, updated one value at a time"""
+    
+    __slots__ = ('count', 'mean', 'm2')
+    
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+    
+    def add(self, x: float):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+    
+    def remove(self, x: float):
+        """Undo a previous add(x)"""
+        if self.count <= 1:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        previous_mean = (self.count * self.mean - x) / (self.count - 1)
+        self.m2 = max(0.0, self.m2 - (x - previous_mean) * (x - self.mean))
+        self.mean = previous_mean
+        self.count -= 1
+    
+    def merge(self, other: 'RunningMoments'):
+        """Combine with moments over a disjoint set of values"""
+        if not other.count:
+            return
+        if not self.count:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+    
+    @property
+    def std_dev(self) -> float:
+        """Population standard deviation"""
+        return math.sqrt(self.m2 / self.count) if self.count else 0.0
+    
+    def to_list(self) -> List:
+        return [self.count, self.mean, self.m2]
+    
+    @classmethod
+    def from_list(cls, values: List) -> 'RunningMoments':
+        return cls(*values)
+
+
+class SubjectStats:
+    """Aggregates for one subject within one batch"""
+    
+    __slots__ = ('name', 'attempts', 'passed', 'marks', 'grades')
+    
+    def __init__(self, name: Optional[str] = None):
+        self.name = name
+        self.attempts = 0
+        self.passed = 0
+        self.marks = RunningMoments()
+        self.grades: Dict[str, int] = {}
+    
+    def add(self, marks: Optional[float], grade, passed: bool, sign: int = 1):
+        self.attempts += sign
+        self.passed += sign if passed else 0
+        if marks is not None:
+            if sign > 0:
+                self.marks.add(marks)
+            else:
+                self.marks.remove(marks)
+        grade = grade or 'N/A'
+        count = self.grades.get(grade, 0) + sign
+        if count:
+            self.grades[grade] = count
+        else:
+            self.grades.pop(grade, None)
+    
+    def merge(self, other: 'SubjectStats'):
+        self.name = self.name or other.name
+        self.attempts += other.attempts
+        self.passed += other.passed
+        self.marks.merge(other.marks)
+        for grade, count in other.grades.items():
+            self.grades[grade] = self.grades.get(grade, 0) + count
+    
+    def summary(self) -> Dict:
+        return {
+            'name': self.name,
+            'attempts': self.attempts,
+            'passRate': round(self.passed / self.attempts, 4) if self.attempts else None,
+            'marks': {
+                'count': self.marks.count,
+                'mean': round(self.marks.mean, 2) if self.marks.count else None,
+                'stdDev': round(self.marks.std_dev, 2) if self.marks.count else None
+            },
+            'gradeHistogram': dict(sorted(self.grades.items()))
+        }
+    
+    def to_dict(self) -> Dict:
+        return {
+            'name': self.name,
+            'attempts': self.attempts,
+            'passed': self.passed,
+            'marks': self.marks.to_list(),
+            'grades': self.grades
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SubjectStats':
+        stats = cls(data.get('name'))
+        stats.attempts = data['attempts']
+        stats.passed = data['passed']
+        stats.marks = RunningMoments.from_list(data['marks'])
+        stats.grades = dict(data['grades'])
+        return stats
+
+
+class SubjectStatsAggregator:
+    """
+    Thread-safe (batch, subject code) -> SubjectStats map.
+    
+    Each ingested student's contribution is remembered so that a re-fetch
+    replaces it instead of counting the student twice. Merged or loaded
+    statistics carry no per-student contributions, so merge only
+    aggregators built from disjoint sets of students.
+    """
+    
+    def __init__(self):
+        self._subjects: Dict[tuple, SubjectStats] = {}
+        self._contributions: Dict[str, List[tuple]] = {}  # student key -> [(stats key, name, marks, grade, passed)]
+        self._lock = threading.Lock()
+        self.ingested = 0
+    
+    def _apply(self, rows: List[tuple], sign: int):
+        for key, name, marks, grade, passed in rows:
+            stats = self._subjects.get(key)
+            if stats is None:
+                stats = self._subjects[key] = SubjectStats(name)
+            stats.add(marks, grade, passed, sign)
+            if not stats.attempts:
+                del self._subjects[key]
+    
+    def ingest(self, results_data: Dict, student_key: Optional[str] = None):
+        """
+        Add one parsed result (parse_api_response / merge_parsed_results
+        output). student_key defaults to the hall ticket.
+        """
+        student_info = results_data.get('studentInfo', {})
+        student_key = student_key or student_info.get('hallTicket')
+        if not student_key:
+            return
+        batch = student_info.get('batch')
+        rows = [
+            ((batch, sub.get('code')), sub.get('name'), marks_value(sub.get('marks')),
+             sub.get('grade'), bool(sub.get('status', {}).get('passed')))
+            for sub in results_data.get('subjects', [])
+            if sub.get('code')
+        ]
+        
+        with self._lock:
+            previous = self._contributions.pop(student_key, None)
+            if previous:
+                self._apply(previous, -1)
+            self._apply(rows, 1)
+            self._contributions[student_key] = rows
+            self.ingested += 1
+    
+    def has_student(self, student_key: str) -> bool:
+        return student_key in self._contributions
+    
+    def get(self, batch, code) -> Optional[Dict]:
+        """Statistics for one subject in one batch"""
+        with self._lock:
+            stats = self._subjects.get((batch, code))
+            return {'batch': batch, 'code': code, **stats.summary()} if stats else None
+    
+    def batch_subjects(self, batch) -> List[Dict]:
+        """Statistics for every subject seen in a batch, by subject code"""
+        with self._lock:
+            return [
+                {'batch': batch, 'code': code, **stats.summary()}
+                for (stats_batch, code), stats in sorted(self._subjects.items(), key=lambda item: str(item[0][1]))
+                if stats_batch == batch
+            ]
+    
+    def merge(self, other: 'SubjectStatsAggregator'):
+        """Fold in another aggregator's statistics (disjoint students)"""
+        with self._lock:
+            for key, stats in other._subjects.items():
+                current = self._subjects.get(key)
+                if current is None:
+                    current = self._subjects[key] = SubjectStats(stats.name)
+                current.merge(stats)
+            self.ingested += other.ingested
+    
+    def to_dict(self) -> Dict:
+        """Aggregates only (no per-student contributions), JSON-serialisable"""
+        with self._lock:
+            return {
+                'ingested': self.ingested,
+                'subjects': [
+                    {'batch': batch, 'code': code, **stats.to_dict()}
+                    for (batch, code), stats in self._subjects.items()
+                ]
+            }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SubjectStatsAggregator':
+        aggregator = cls()
+        aggregator.ingested = data.get('ingested', 0)
+        for item in data.get('subjects', []):
+            aggregator._subjects[(item['batch'], item['code'])] = SubjectStats.from_dict(item)
+        return aggregator
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'subjects': len(self._subjects),
+                'students': len(self._contributions),
+                'ingested': self.ingested
+            }
+
+
+_shared_aggregator = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_subject_stats() -> SubjectStatsAggregator:
+    """Process-wide subject statistics fed by every fetched result"""
+    global _shared_aggregator
+    if _shared_aggregator is None:
+        with _shared_lock:
+            if _shared_aggregator is None:
+                _shared_aggregator = SubjectStatsAggregator()
+    return _shared_aggregator
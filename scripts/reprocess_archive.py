@@ -0,0 +1,51 @@
+"""
+Reprocess archived CampX responses with the current parser and analytics
+
+Usage (from project root):
+    python scripts/reprocess_archive.py --archive ./archive --output ./generated/reprocessed
+    python scripts/reprocess_archive.py --archive ./archive --output ./generated/reprocessed --workers 8 --chunk-size 1000
+
+Re-running with the same arguments resumes an interrupted run. Per-subject
+cohort statistics for the whole run are written to <output>/subject_stats.json,
+and CGPA / SGPA / marks quantile sketches to <output>/quantiles.json (point
+QUANTILE_SKETCH_PATH at it to seed the API's percentiles).
+"""
+
+import argparse
+import json
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.services.reprocessor import ArchiveReprocessor
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--archive', required=True, help='Archive directory (ARCHIVE_DIR)')
+    arg_parser.add_argument('--output', required=True, help='Directory for chunk-*.jsonl output')
+    arg_parser.add_argument('--chunk-size', type=int, default=500, help='Responses per work unit')
+    arg_parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    arg_parser.add_argument('--all-fetches', action='store_true',
+                            help='Process every archived fetch, not just the latest per hall ticket and exam type')
+    args = arg_parser.parse_args()
+    
+    reprocessor = ArchiveReprocessor(
+        args.archive,
+        args.output,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        latest_only=not args.all_fetches
+    )
+    try:
+        stats = reprocessor.run()
+    except ValueError as e:
+        print(f"❌ {str(e)}")
+        sys.exit(1)
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -12,11 +12,15 @@ echo ""
 # Check Python version
 echo "Step 1: Checking Python..."
 if ! command -v python3 &> /dev/null; then
-    echo "❌ Python 3 not found. Please install Python 3.8+."
+    echo "❌ Python 3 not found. Please install Python 3.10+."
     exit 1
 fi
 
 PYTHON_VERSION=$(python3 --version | cut -d' ' -f2)
+if ! python3 -c 'import sys; sys.exit(sys.version_info < (3, 10))'; then
+    echo "❌ Python $PYTHON_VERSION found. Please install Python 3.10+."
+    exit 1
+fi
 echo "✓ Found Python $PYTHON_VERSION"
 
 # Create virtual environment
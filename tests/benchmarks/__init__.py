@@ -0,0 +1,3 @@
+"""
+Benchmark scripts and the local CampX stand-in server
+"""
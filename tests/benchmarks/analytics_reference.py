@@ -0,0 +1,139 @@
+"""
+Reference analytics: calculate_analytics as it was before the fused
+single-pass kernel, one pass over the subjects per aspect.
+
+AnalyticsEngine._scan_subjects must stay equal to these passes; the unit
+tests compare the two and benchmark_analytics_kernel.py times them.
+"""
+
+from typing import Dict, List, Optional
+
+from backend.services.analytics import AnalyticsEngine
+
+GRADE_POINTS = AnalyticsEngine.GRADE_POINTS
+
+
+def calculate_gpa(subjects: List[Dict]) -> Optional[float]:
+    """Credit-weighted GPA over subjects with a known grade"""
+    total_points = 0
+    total_credits = 0
+    for sub in subjects:
+        grade = sub.get('grade', '').upper()
+        credits_str = sub.get('credits', '0')
+        try:
+            credits = float(credits_str) if credits_str else 0
+        except (ValueError, TypeError):
+            credits = 0
+        if grade in GRADE_POINTS:
+            total_points += GRADE_POINTS[grade] * credits
+            total_credits += credits
+
+    if total_credits == 0:
+        return None
+    return round(total_points / total_credits, 2)
+
+
+def grade_distribution(subjects: List[Dict]) -> Dict:
+    distribution = {}
+    for sub in subjects:
+        grade = sub.get('grade', 'N/A')
+        distribution[grade] = distribution.get(grade, 0) + 1
+    return distribution
+
+
+def pass_fail_status(subjects: List[Dict], backlog_summary: Dict = None) -> Dict:
+    """Counts from the subject list; the failed count prefers the API's backlog summary"""
+    failed_subjects = []
+    passed = 0
+    failed = 0
+    for subject in subjects:
+        is_passed = subject.get('status', {}).get('passed')
+        grade = subject.get('grade', '').upper()
+        if is_passed is None:
+            is_failed = grade in ['F', 'AB', 'I', 'ABSENT', 'MALPRACTICE']
+        else:
+            is_failed = not is_passed
+
+        if is_failed:
+            failed += 1
+            failed_subjects.append({
+                'name': subject.get('name', 'Unknown Subject'),
+                'code': subject.get('code', ''),
+                'grade': grade,
+                'semester': subject.get('semester')
+            })
+        else:
+            passed += 1
+
+    official_failed_count = backlog_summary.get('due', failed) if backlog_summary else failed
+    return {
+        'passed': passed,
+        'failed': official_failed_count,
+        'failedSubjects': failed_subjects,
+        'overallStatus': 'All Clear' if official_failed_count == 0 else f'{official_failed_count} Active Backlog(s)'
+    }
+
+
+def credits_summary(subjects: List[Dict], credits_summary_data: Dict = None) -> Dict:
+    if credits_summary_data:
+        return {
+            'total': credits_summary_data.get('total', 0),
+            'earned': credits_summary_data.get('obtained', 0)
+        }
+
+    total_credits = 0
+    earned_credits = 0
+    for sub in subjects:
+        credits_str = sub.get('credits', '0')
+        try:
+            credits = float(credits_str) if credits_str else 0
+        except (ValueError, TypeError):
+            credits = 0
+        total_credits += credits
+        if sub.get('status', {}).get('passed'):
+            earned_credits += credits
+    return {
+        'total': round(total_credits, 1),
+        'earned': round(earned_credits, 1)
+    }
+
+
+def marks_summary(subjects: List[Dict]) -> Dict:
+    total_obtained = 0
+    total_max = 0
+    for sub in subjects:
+        max_marks = sub.get('maxMarks', {})
+        int_max = float(max_marks.get('internal') or 0)
+        ext_max = float(max_marks.get('external') or 0)
+        marks_str = str(sub.get('marks', ''))
+        try:
+            obtained = float(marks_str) if marks_str.replace('.', '').isdigit() else 0
+        except ValueError:
+            obtained = 0
+        subject_total = int_max + ext_max
+        if subject_total > 0:
+            total_max += subject_total
+            total_obtained += obtained
+    return {'obtained': int(total_obtained), 'total': int(total_max)}
+
+
+def multi_pass(data: Dict, engine: Optional[AnalyticsEngine] = None) -> Dict:
+    """calculate_analytics from the per-aspect passes (fills in marks / SGPA on data, like the engine)"""
+    engine = engine or AnalyticsEngine()
+    subjects, summary = data['subjects'], data['summary']
+    marks = summary.get('marks', {})
+    if not marks or marks.get('total', 0) == 0:
+        marks = marks_summary(subjects)
+        summary.setdefault('marks', {}).update(marks)
+    gpa = calculate_gpa(subjects)
+    return {
+        'totalSubjects': len(subjects),
+        'gpa': gpa,
+        'gradeDistribution': grade_distribution(subjects),
+        'passFailStatus': pass_fail_status(subjects, summary.get('backlogs')),
+        'creditsSummary': credits_summary(subjects, summary.get('credits')),
+        'performanceLevel': engine._get_performance_level(gpa) if gpa else None,
+        'trends': engine._calculate_trends(data['semesterInfo']),
+        'overallPercentage': round(marks['obtained'] / marks['total'] * 100, 2) if marks.get('total', 0) > 0 else 0.0,
+        'rawSummary': summary
+    }
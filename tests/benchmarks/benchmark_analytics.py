@@ -0,0 +1,70 @@
+"""
+Benchmark: per-student AnalyticsEngine.calculate_analytics vs calculate_batch
+
+Parses synthesized CampX responses once, then times the per-student loop
+against building a CohortTable and running the vectorized batch, and checks
+that both produce the same output.
+
+Run from project root:
+    python tests/benchmarks/benchmark_analytics.py
+    python tests/benchmarks/benchmark_analytics.py --students 20000 --semesters 8
+"""
+
+import argparse
+import copy
+import json
+import logging
+import os
+import sys
+import time
+
+# Add project root to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.services.analytics import AnalyticsEngine
+from backend.services.cohort_table import CohortTable
+from backend.services.parser import ResultsParser
+from tests.benchmarks.mock_campx_server import synthesize_response
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--students', type=int, default=5000)
+    arg_parser.add_argument('--semesters', type=int, default=8)
+    args = arg_parser.parse_args()
+    
+    logging.disable(logging.WARNING)
+    parser = ResultsParser()
+    engine = AnalyticsEngine()
+    parsed = [parser.parse_api_response(synthesize_response(f"22BENCH{i:05d}", 'general', args.semesters))
+              for i in range(args.students)]
+    # calculate_analytics fills in SGPA / marks on its input, so give it copies
+    copies = copy.deepcopy(parsed)
+    
+    start = time.perf_counter()
+    expected = [engine.calculate_analytics(data) for data in copies]
+    per_student = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    table = CohortTable.from_results(parsed)
+    build = time.perf_counter() - start
+    start = time.perf_counter()
+    batch = engine.calculate_batch(table)
+    vectorized = time.perf_counter() - start
+    
+    for analytics in expected:
+        analytics.pop('rawSummary')
+    mismatches = sum(1 for a, b in zip(expected, batch) if json.dumps(a) != json.dumps(b))
+    
+    print(f"{args.students} students, {table.n_rows} subject rows")
+    print(f"per-student     {per_student * 1000:9.1f} ms")
+    print(f"table build     {build * 1000:9.1f} ms")
+    print(f"batch           {vectorized * 1000:9.1f} ms   ({per_student / vectorized:.1f}x vs per-student)")
+    print(f"mismatches      {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
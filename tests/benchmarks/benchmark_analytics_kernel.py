@@ -0,0 +1,62 @@
+"""
+Micro-benchmark: per-request CPU of calculate_analytics, fused single pass
+vs the previous one-pass-per-aspect composition
+
+Run from project root:
+    python tests/benchmarks/benchmark_analytics_kernel.py
+    python tests/benchmarks/benchmark_analytics_kernel.py --semesters 8 --repeat 2000
+"""
+
+import argparse
+import copy
+import logging
+import os
+import sys
+import time
+
+# Add project root to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.services.analytics import AnalyticsEngine
+from backend.services.parser import ResultsParser
+from tests.benchmarks.analytics_reference import multi_pass
+from tests.benchmarks.mock_campx_server import synthesize_response
+
+
+def time_per_call(fn, payloads):
+    # Copies are made up front; both paths fill in SGPA / marks on their input
+    inputs = copy.deepcopy(payloads)
+    start = time.process_time()
+    for data in inputs:
+        fn(data)
+    return (time.process_time() - start) / len(inputs) * 1e6
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--semesters', type=int, default=8)
+    arg_parser.add_argument('--repeat', type=int, default=2000)
+    arg_parser.add_argument('--strip-summary', action='store_true',
+                            help='Drop the API summary so marks / credits fallbacks run too')
+    args = arg_parser.parse_args()
+    
+    logging.disable(logging.WARNING)
+    engine = AnalyticsEngine()
+    parsed = ResultsParser().parse_api_response(synthesize_response('22KERNEL01', 'general', args.semesters))
+    if args.strip_summary:
+        parsed['summary'] = {}
+    payloads = [parsed] * args.repeat
+    
+    fused = time_per_call(engine.calculate_analytics, payloads)
+    multi = time_per_call(lambda data: multi_pass(data, engine), payloads)
+    
+    print(f"{len(parsed['subjects'])} subjects, {args.repeat} calls (CPU time per request)")
+    print(f"multi-pass  {multi:8.1f} us")
+    print(f"fused       {fused:8.1f} us   ({(1 - fused / multi):.0%} less CPU)")
+
+
+if __name__ == '__main__':
+    main()
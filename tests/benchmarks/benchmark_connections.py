@@ -0,0 +1,78 @@
+"""
+Benchmark: cold vs warm upstream connections
+Compares a fresh connection per lookup (module-level requests.get) against the
+pooled keep-alive session used by CampXScraper.
+
+Run from project root:
+    python tests/benchmarks/benchmark_connections.py
+    python tests/benchmarks/benchmark_connections.py --url https://api.example.edu/results --requests 50
+
+Without --url (and without CAMPX_API_URL) the local mock CampX server is
+started, which measures TCP connect cost only; point it at the real portal
+to include TLS.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import requests
+
+# Add project root to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.services.scraper import CampXScraper
+from tests.benchmarks.mock_campx_server import start_server
+
+
+def time_requests(get, url, count):
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        get(url, params={'rollNo': 'BENCH00001'}, timeout=10)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(label, latencies):
+    ordered = sorted(latencies)
+    p95 = ordered[max(0, int(len(ordered) * 0.95) - 1)]
+    print(f"{label:<28} mean {statistics.mean(latencies):8.2f} ms   "
+          f"median {statistics.median(latencies):8.2f} ms   p95 {p95:8.2f} ms")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--url', default=os.getenv('CAMPX_API_URL'), help='Upstream URL to benchmark')
+    arg_parser.add_argument('--requests', type=int, default=200, help='Requests per mode')
+    args = arg_parser.parse_args()
+
+    server = None
+    url = args.url
+    if not url:
+        server = start_server()
+        url = server.url
+
+    print(f"Benchmarking {args.requests} requests against {url}\n")
+
+    cold = time_requests(requests.get, url, args.requests)
+
+    session = CampXScraper.get_session()
+    session.get(url, timeout=10)  # Prime the pool
+    warm = time_requests(session.get, url, args.requests)
+
+    report('Cold (new connection)', cold)
+    report('Warm (pooled session)', warm)
+    print(f"\nSpeedup (median): {statistics.median(cold) / statistics.median(warm):.2f}x")
+
+    if server:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
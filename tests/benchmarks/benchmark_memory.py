@@ -0,0 +1,66 @@
+"""
+Benchmark: memory held by parsed results, dicts vs the compact model
+
+Parses synthesized CampX responses and measures the retained heap with
+tracemalloc, once keeping parse_api_response dicts and once keeping
+parse_compact records.
+
+Run from project root:
+    python tests/benchmarks/benchmark_memory.py
+    python tests/benchmarks/benchmark_memory.py --students 5000 --semesters 8
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+# Add project root to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.services.parser import ResultsParser
+from tests.benchmarks.mock_campx_server import synthesize_response
+
+
+def measure(label, parse, payloads):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    kept = [parse(payload) for payload in payloads]
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    per_1k = current / len(kept) * 1000 / (1024 * 1024)
+    print(f"{label:<8} {len(kept):6d} students  retained {current / (1024 * 1024):8.2f} MiB  "
+          f"({per_1k:6.2f} MiB / 1k)   peak {peak / (1024 * 1024):8.2f} MiB   parse {elapsed:6.2f} s")
+    return current
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--students', type=int, default=1000)
+    arg_parser.add_argument('--semesters', type=int, default=8)
+    args = arg_parser.parse_args()
+    
+    logging.disable(logging.WARNING)
+    # Round-trip through JSON so payloads hold fresh strings, as a real response would
+    payloads = [json.loads(json.dumps(synthesize_response(f"22BENCH{i:05d}", 'general', args.semesters)))
+                for i in range(args.students)]
+    
+    parser = ResultsParser()
+    as_dicts = measure('dicts', parser.parse_api_response, payloads)
+    as_compact = measure('compact', parser.parse_compact, payloads)
+    print(f"compact model retains {as_compact / as_dicts:.0%} of the dict representation")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: /api/fetch-results end to end against the mock CampX server
+
+Phases:
+    cold      - every lookup is a distinct hall ticket (upstream + parse + analytics)
+    warm      - the same tickets again (served from the results cache)
+    hot-key   - all threads ask for one ticket at once (single-flight coalescing)
+
+Run from project root:
+    python tests/benchmarks/benchmark_pipeline.py
+    python tests/benchmarks/benchmark_pipeline.py --students 500 --threads 32 --latency lognormal:150:0.5 --throttle-rate 0.02
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add project root to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from tests.benchmarks.mock_campx_server import start_server
+
+
+def percentile(ordered, p):
+    return ordered[max(0, int(round(p / 100 * len(ordered))) - 1)]
+
+
+def run_phase(label, app, tickets, threads):
+    def lookup(ticket):
+        client = app.test_client()
+        start = time.perf_counter()
+        response = client.post('/api/fetch-results', json={'hallTicket': ticket})
+        return (time.perf_counter() - start) * 1000, response.status_code
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(lookup, tickets))
+    elapsed = time.perf_counter() - start
+    
+    latencies = sorted(ms for ms, _ in results)
+    ok = sum(1 for _, status in results if status == 200)
+    print(f"{label:<9} {len(tickets):6d} req  {len(tickets) / elapsed:8.1f} req/s   "
+          f"p50 {percentile(latencies, 50):8.2f} ms   p99 {percentile(latencies, 99):8.2f} ms   "
+          f"mean {statistics.mean(latencies):8.2f} ms   ok {ok}/{len(tickets)}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--students', type=int, default=200)
+    arg_parser.add_argument('--threads', type=int, default=16)
+    arg_parser.add_argument('--latency', default='lognormal:80:0.5', help='Mock upstream latency spec')
+    arg_parser.add_argument('--error-rate', type=float, default=0.0)
+    arg_parser.add_argument('--throttle-rate', type=float, default=0.0)
+    args = arg_parser.parse_args()
+    
+    server = start_server(latency=args.latency, error_rate=args.error_rate, throttle_rate=args.throttle_rate, seed=1)
+    
+    # Config is read at import time, so point it at the mock server first
+    cache_dir = tempfile.mkdtemp(prefix='cypher-bench-')
+    os.environ.update({
+        'CAMPX_API_URL': server.url,
+        'CAMPX_BASE_URL': server.url.rsplit('/', 2)[0] + '/',
+        'CACHE_DIR': cache_dir,
+        'FLASK_DEBUG': 'False',
+    })
+    sys.path.insert(0, os.path.join(project_root, 'backend'))
+    import logging
+    from app import create_app
+    logging.disable(logging.WARNING)
+    
+    app = create_app()
+    tickets = [f"22BENCH{i:05d}" for i in range(args.students)]
+    
+    print(f"Mock upstream: {server.url}  latency={args.latency}  threads={args.threads}\n")
+    run_phase('cold', app, tickets, args.threads)
+    run_phase('warm', app, tickets, args.threads)
+    run_phase('hot-key', app, ['22HOTKEY0001'] * args.students, args.threads)
+    
+    print(f"\nUpstream requests served by mock: {server.counts['requests']}")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
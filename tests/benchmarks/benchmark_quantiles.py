@@ -0,0 +1,77 @@
+"""
+Benchmark: KLL percentile sketches vs exact sorted percentiles
+
+Feeds synthetic CGPAs for a whole university (several batches and
+programs) into QuantileSketches and reports sketch size, worst observed
+rank error against exact ranks, and per-query latency.
+
+Run from project root:
+    python tests/benchmarks/benchmark_quantiles.py
+    python tests/benchmarks/benchmark_quantiles.py --students 200000 --error 0.005
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from bisect import bisect_right
+
+# Add project root to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.services.quantile_sketch import QuantileSketches, error_for_k, k_for_error
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--students', type=int, default=100000)
+    arg_parser.add_argument('--error', type=float, default=0.01, help='Target rank error (fraction)')
+    arg_parser.add_argument('--queries', type=int, default=10000)
+    args = arg_parser.parse_args()
+    
+    rng = random.Random(1)
+    batches = ['2021', '2022', '2023', '2024']
+    programs = ['CSE', 'ECE', 'EEE', 'MECH', 'CIVIL', 'IT']
+    sketches = QuantileSketches(k=k_for_error(args.error))
+    exact = {}
+    
+    start = time.perf_counter()
+    for i in range(args.students):
+        batch, program = rng.choice(batches), rng.choice(programs)
+        cgpa = round(min(10.0, max(0.0, rng.gauss(7.2, 1.1))), 2)
+        sketches.ingest({
+            'studentInfo': {'hallTicket': f"B{i:07d}", 'batch': batch, 'program': program},
+            'semesterInfo': {'cgpa': cgpa, 'semesters': []},
+            'subjects': []
+        })
+        for key in (('*', '*'), (batch, '*'), (batch, program)):
+            exact.setdefault(key, []).append(cgpa)
+    ingest = time.perf_counter() - start
+    
+    stored = sum(sum(len(items) for items in sketch.compactors) for sketch in sketches._sketches.values())
+    print(f"{args.students} students, {sketches.stats()['sketches']} sketches, k={sketches.k}, "
+          f"{stored} stored values (exact would keep {sum(len(v) for v in exact.values())})")
+    print(f"ingest         {ingest / args.students * 1e6:8.2f} us / student")
+    
+    worst = 0.0
+    for (batch, program), values in exact.items():
+        values.sort()
+        for probe in (5.0, 6.0, 7.0, 7.5, 8.0, 8.4, 9.0, 9.5):
+            estimate = sketches.percentile('cgpa', probe, batch, program)['percentile'] / 100
+            worst = max(worst, abs(estimate - bisect_right(values, probe) / len(values)))
+    print(f"rank error     {worst:8.4f} worst observed (bound {error_for_k(sketches.k):.4f})")
+    
+    probes = [(rng.choice(batches), rng.choice(programs), rng.uniform(4, 10)) for _ in range(args.queries)]
+    start = time.perf_counter()
+    for batch, program, value in probes:
+        sketches.percentile('cgpa', value, batch, program)
+    query = time.perf_counter() - start
+    print(f"query          {query / args.queries * 1e6:8.2f} us  (\"what percentile is 8.4 in 2022 CSE\")")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,338 @@
+"""
+Local CampX stand-in server for load and latency testing
+
+Serves responses in the shape ResultsParser.parse_api_response expects.
+Raw responses saved in tests/generated/*.json (by the integration test)
+are replayed for their hall ticket and exam type; every other lookup gets
+a deterministic synthesised record. A file named NAME.EXAMTYPE.json (e.g.
+real_results_raw.supplementary.json) replays for that exam type, any
+other name for 'general'. Latency, 5xx errors, 429 throttling and 404s can be
+injected to mimic results-day conditions.
+
+Run from project root:
+    python tests/benchmarks/mock_campx_server.py --port 8081 --latency lognormal:120:0.6 --error-rate 0.01 --throttle-rate 0.05
+
+Then point the backend at it:
+    CAMPX_API_URL=http://127.0.0.1:8081/student-results/external
+    CAMPX_BASE_URL=http://127.0.0.1:8081/
+
+Latency specs (milliseconds):
+    none | constant:MS | uniform:LOW:HIGH | exponential:MEAN | lognormal:MEDIAN:SIGMA
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+GENERATED_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'generated')
+
+# (min marks, grade, grade points) - checked top down
+GRADE_BANDS = [
+    (90, 'O', 10), (80, 'A+', 9), (70, 'A', 8), (60, 'B+', 7),
+    (50, 'B', 6), (45, 'C', 5), (40, 'P', 4), (0, 'F', 0)
+]
+SUBJECT_PREFIXES = ['MA', 'PH', 'CH', 'CS', 'EC', 'EE', 'ME', 'EN', 'HS']
+EXAM_MONTHS = ['Dec', 'May']
+PROGRAMS = [
+    ('CSE', 'B TECH in COMPUTER SCIENCE'),
+    ('ECE', 'B TECH in ELECTRONICS AND COMMUNICATION'),
+    ('EEE', 'B TECH in ELECTRICAL AND ELECTRONICS'),
+    ('MECH', 'B TECH in MECHANICAL ENGINEERING'),
+]
+
+
+def parse_latency_spec(spec):
+    """
+    Build a sampler returning a delay in seconds from a latency spec string
+    """
+    parts = (spec or 'none').split(':')
+    kind, args = parts[0].lower(), [float(p) for p in parts[1:]]
+    if kind == 'none':
+        return lambda rng: 0.0
+    if kind == 'constant':
+        return lambda rng: args[0] / 1000
+    if kind == 'uniform':
+        return lambda rng: rng.uniform(args[0], args[1]) / 1000
+    if kind == 'exponential':
+        return lambda rng: rng.expovariate(1 / args[0]) / 1000
+    if kind == 'lognormal':
+        mu, sigma = math.log(args[0]), args[1]
+        return lambda rng: rng.lognormvariate(mu, sigma) / 1000
+    raise ValueError(f"Unknown latency spec: {spec}")
+
+
+def _ticket_rng(hall_ticket, salt=''):
+    digest = hashlib.sha256(f"{hall_ticket}:{salt}".encode('utf-8')).digest()
+    return random.Random(int.from_bytes(digest[:8], 'big'))
+
+
+def _grade_for(marks):
+    for threshold, grade, points in GRADE_BANDS:
+        if marks >= threshold:
+            return grade, points
+    return 'F', 0
+
+
+def _subject_result(code, name, credits, marks, month_year, absent=False):
+    grade, points = ('AB', 0) if absent else _grade_for(marks)
+    return {
+        'subject': {
+            'subjectCode': code,
+            'name': name,
+            'total': None if absent else marks,
+            'subjectTypeId': 1,
+            'intMax': 40,
+            'extMax': 60
+        },
+        'consideredGrade': {
+            'credits': f"{credits:.2f}",
+            'grade': grade,
+            'gradePoints': points,
+            'monthYear': month_year,
+            'passed': points > 0,
+            'isAbsent': absent,
+            'isMalPracticed': False
+        }
+    }
+
+
+def synthesize_response(hall_ticket, exam_type='general', semesters=None):
+    """
+    Deterministic CampX-shaped response for any hall ticket.
+    The same ticket always yields the same record; 'supplementary' returns
+    passed re-attempts of the subjects failed in the regular attempt.
+    """
+    rng = _ticket_rng(hall_ticket)
+    digits = ''.join(ch for ch in hall_ticket if ch.isdigit())
+    batch = f"20{digits[:2]}" if len(digits) >= 2 else '2022'
+    branch, branch_display = PROGRAMS[rng.randrange(len(PROGRAMS))]
+    ability = rng.gauss(68, 12)
+    sem_count = semesters or rng.randint(2, 8)
+    start_year = int(batch)
+    
+    results = []
+    supplementary = []
+    total_points = total_credits = 0.0
+    marks_obtained = marks_total = 0
+    credits_earned = 0.0
+    due = 0
+    
+    for sem_no in range(1, sem_count + 1):
+        month_year = f"{EXAM_MONTHS[(sem_no - 1) % 2]}-{start_year + sem_no // 2}"
+        sem_points = sem_credits = 0.0
+        subjects_results = []
+        sem_supply = []
+        for index in range(rng.randint(5, 8)):
+            prefix = SUBJECT_PREFIXES[rng.randrange(len(SUBJECT_PREFIXES))]
+            code = f"{prefix}{sem_no}{index:02d}"
+            credits = rng.choice([1.5, 2.0, 3.0, 3.0, 4.0])
+            absent = rng.random() < 0.01
+            marks = max(0, min(100, int(rng.gauss(ability, 10))))
+            entry = _subject_result(code, f"{prefix} Course {sem_no}.{index + 1}", credits, marks, month_year, absent)
+            subjects_results.append(entry)
+            
+            points = entry['consideredGrade']['gradePoints']
+            sem_points += points * credits
+            sem_credits += credits
+            marks_total += 100
+            marks_obtained += 0 if absent else marks
+            if points > 0:
+                credits_earned += credits
+            else:
+                due += 1
+                retry = _subject_result(
+                    code, entry['subject']['name'], credits, rng.randint(40, 60),
+                    f"{EXAM_MONTHS[sem_no % 2]}-{start_year + (sem_no + 1) // 2}"
+                )
+                sem_supply.append(retry)
+        
+        total_points += sem_points
+        total_credits += sem_credits
+        results.append({
+            'semNo': sem_no,
+            'sgpa': round(sem_points / sem_credits, 2) if sem_credits else 0,
+            'subjectsResults': subjects_results
+        })
+        if sem_supply:
+            supplementary.append({'semNo': sem_no, 'sgpa': 0, 'subjectsResults': sem_supply})
+    
+    if (exam_type or 'general').lower() == 'supplementary':
+        results = supplementary
+    
+    return {
+        'student': {
+            'rollNo': hall_ticket,
+            'fullName': f"STUDENT {hall_ticket[-4:]}",
+            'photo': None,
+            'batch': batch
+        },
+        'program': {'branchDisplay': branch_display, 'branchName': branch},
+        'cgpa': round(total_points / total_credits, 2) if total_credits else 0,
+        'results': results,
+        'summary': {
+            'marksObtained': {'obtained': marks_obtained, 'total': marks_total},
+            'creditsObtained': {'total': round(total_credits, 1), 'obtained': round(credits_earned, 1)},
+            'subjectDue': {'due': due}
+        }
+    }
+
+
+def _replay_exam_type(path):
+    """Exam type encoded in a replay file name, 'general' when there is none"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    name, _, exam_type = stem.rpartition('.')
+    return exam_type.lower() if name and exam_type else 'general'
+
+
+def load_replay_responses(directory=GENERATED_DIR):
+    """Raw CampX responses saved under tests/generated, keyed by (upper-case roll number, exam type)"""
+    responses = {}
+    for path in sorted(glob.glob(os.path.join(directory, '*.json'))):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        # Parsed outputs are saved alongside raw ones; only raw responses have 'student'
+        if isinstance(data, dict) and 'student' in data and 'results' in data:
+            roll_no = str(data['student'].get('rollNo') or '').upper()
+            if roll_no:
+                responses[(roll_no, _replay_exam_type(path))] = data
+    return responses
+
+
+class MockCampXServer(ThreadingHTTPServer):
+    """HTTP server holding the injection settings and counters"""
+    
+    daemon_threads = True
+    
+    def __init__(self, address, latency='none', error_rate=0.0, throttle_rate=0.0,
+                 not_found_rate=0.0, retry_after=1, replay_dir=GENERATED_DIR, seed=None):
+        super().__init__(address, MockCampXHandler)
+        self.sample_latency = parse_latency_spec(latency)
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.not_found_rate = not_found_rate
+        self.retry_after = retry_after
+        self.replay = load_replay_responses(replay_dir) if replay_dir else {}
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.counts = {'requests': 0, '200': 0, '404': 0, '429': 0, '500': 0}
+    
+    def draw(self):
+        """Returns: (delay seconds, uniform sample) from the shared RNG"""
+        with self.rng_lock:
+            return self.sample_latency(self.rng), self.rng.random()
+    
+    def count(self, key):
+        with self.rng_lock:
+            self.counts[key] += 1
+    
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/student-results/external"
+
+
+class MockCampXHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        if url.path == '/__stats':
+            return self._send_json(200, server.counts)
+        
+        server.count('requests')
+        query = parse_qs(url.query)
+        hall_ticket = (query.get('rollNo') or [''])[0].strip().upper()
+        exam_type = (query.get('examType') or ['general'])[0].strip().lower() or 'general'
+        
+        delay, roll = server.draw()
+        if delay:
+            time.sleep(delay)
+        
+        if roll < server.throttle_rate:
+            server.count('429')
+            return self._send_json(429, {'message': 'Too Many Requests'}, {'Retry-After': str(server.retry_after)})
+        if roll < server.throttle_rate + server.error_rate:
+            server.count('500')
+            return self._send_json(500, {'message': 'Internal Server Error'})
+        
+        # Not-found is decided per ticket so repeat lookups agree
+        if not hall_ticket or _ticket_rng(hall_ticket, 'missing').random() < server.not_found_rate:
+            server.count('404')
+            return self._send_json(404, {'message': 'Student not found'})
+        
+        payload = server.replay.get((hall_ticket, exam_type)) or synthesize_response(hall_ticket, exam_type)
+        server.count('200')
+        return self._send_json(200, payload)
+
+
+def start_server(host='127.0.0.1', port=0, **options):
+    """
+    Start the mock server on a background thread
+    Returns: MockCampXServer (use .url, .counts, .shutdown())
+    """
+    server = MockCampXServer((host, port), **options)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--host', default='127.0.0.1')
+    arg_parser.add_argument('--port', type=int, default=8081)
+    arg_parser.add_argument('--latency', default='none', help='Latency spec, e.g. lognormal:120:0.6')
+    arg_parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 500')
+    arg_parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of requests answered with 429')
+    arg_parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with 429')
+    arg_parser.add_argument('--not-found-rate', type=float, default=0.0, help='Fraction of hall tickets that 404')
+    arg_parser.add_argument('--replay-dir', default=GENERATED_DIR, help='Directory of raw responses to replay')
+    arg_parser.add_argument('--seed', type=int, default=None)
+    args = arg_parser.parse_args()
+    
+    server = MockCampXServer(
+        (args.host, args.port),
+        latency=args.latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        not_found_rate=args.not_found_rate,
+        retry_after=args.retry_after,
+        replay_dir=args.replay_dir,
+        seed=args.seed
+    )
+    print(f"Mock CampX API listening on {server.url} ({len(server.replay)} replayed records)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
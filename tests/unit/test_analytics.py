@@ -0,0 +1,161 @@
+"""
+Unit tests for AnalyticsEngine batch, fused and incremental modes
+"""
+
+import copy
+import json
+import os
+
+import pytest
+from backend.services.analytics import AnalyticsEngine
+from backend.services.cohort_table import CohortTable
+from backend.services.parser import ResultsParser
+from tests.benchmarks.analytics_reference import multi_pass
+from tests.benchmarks.mock_campx_server import synthesize_response
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'fixtures')
+
+
+@pytest.fixture
+def api_data():
+    with open(os.path.join(FIXTURES_DIR, 'mock_api_response.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def per_student(parsed):
+    """Reference output from the per-student path (which mutates its input)"""
+    analytics = AnalyticsEngine().calculate_analytics(copy.deepcopy(parsed))
+    analytics.pop('rawSummary')
+    return analytics
+
+
+class TestCalculateBatch:
+    
+    def test_matches_per_student_path(self, api_data):
+        """Test that batch output is identical, key order included"""
+        parser = ResultsParser()
+        no_summary = copy.deepcopy(api_data)
+        no_summary['summary'] = {}
+        unknown = copy.deepcopy(api_data)
+        unknown['results'][0]['subjectsResults'][0]['consideredGrade'].update({'grade': 'W', 'passed': None})
+        odd_marks = copy.deepcopy(no_summary)
+        odd_marks['results'][0]['subjectsResults'][0]['subject']['total'] = '1.2.3'
+        odd_marks['results'][0]['subjectsResults'][1]['subject']['total'] = '\u00b2'
+        parsed = [parser.parse_api_response(data) for data in (api_data, no_summary, unknown, odd_marks)]
+        parsed += [parser.parse_api_response(synthesize_response(f"22BATCH{i:03d}", 'general', 8)) for i in range(50)]
+        
+        batch = AnalyticsEngine().calculate_batch(CohortTable.from_results(parsed))
+        
+        assert len(batch) == len(parsed)
+        for result, expected in zip(batch, map(per_student, parsed)):
+            assert json.dumps(result) == json.dumps(expected)
+    
+    def test_sgpa_fallback(self, api_data):
+        """Test that a zero API SGPA is recomputed from grade points"""
+        parsed = ResultsParser().parse_api_response(api_data)
+        
+        result = AnalyticsEngine().calculate_batch(CohortTable.from_results([parsed]))[0]
+        
+        assert result['trends'] == per_student(parsed)['trends']
+        assert result['trends']['labels'] == ['Sem 1', 'Sem 2']
+        assert parsed['semesterInfo']['semesters'][1]['sgpa'] == 0
+    
+    def test_empty_table(self):
+        """Test that an empty cohort yields no results"""
+        assert AnalyticsEngine().calculate_batch(CohortTable.from_results([])) == []
+
+
+class TestFusedKernel:
+    
+    @pytest.mark.parametrize('variant', ['fixture', 'no-summary', 'unknown-grade', 'odd-marks', 'synthesized'])
+    def test_matches_multi_pass(self, api_data, variant):
+        """Test that the fused single pass keeps the output and input mutations"""
+        if variant == 'no-summary':
+            api_data['summary'] = {}
+        elif variant == 'unknown-grade':
+            api_data['results'][1]['subjectsResults'][0]['consideredGrade'].update(
+                {'grade': 'W', 'passed': None, 'gradePoints': None})
+        elif variant == 'odd-marks':
+            # Pass isdigit() but not float(); counted as 0 like any non-numeric marks
+            api_data['summary'] = {}
+            api_data['results'][0]['subjectsResults'][0]['subject']['total'] = '1.2.3'
+            api_data['results'][0]['subjectsResults'][1]['subject']['total'] = '\u00b2'
+        elif variant == 'synthesized':
+            api_data = synthesize_response('22FUSED001', 'general', 8)
+        parsed = ResultsParser().parse_api_response(api_data)
+        expected_input = copy.deepcopy(parsed)
+        expected = multi_pass(expected_input)
+        
+        result = AnalyticsEngine().calculate_analytics(parsed)
+        
+        assert json.dumps(result) == json.dumps(expected)
+        assert json.dumps(parsed) == json.dumps(expected_input)
+
+
+class TestIncremental:
+    
+    @pytest.mark.parametrize('variant', ['fixture', 'no-summary', 'synthesized'])
+    def test_matches_full_calculation(self, api_data, variant):
+        """Test that folding per-semester partials gives the full output and input mutations"""
+        if variant == 'no-summary':
+            api_data['summary'] = {}
+            api_data['results'][0]['sgpa'] = None
+        elif variant == 'synthesized':
+            api_data = synthesize_response('22INCR0001', 'general', 8)
+        parsed = ResultsParser().parse_api_response(api_data)
+        expected_input = copy.deepcopy(parsed)
+        expected = AnalyticsEngine().calculate_analytics(expected_input)
+        
+        result, snapshot = AnalyticsEngine().calculate_incremental(parsed)
+        
+        assert json.dumps(result) == json.dumps(expected)
+        assert json.dumps(parsed) == json.dumps(expected_input)
+        assert snapshot['recomputed'] == len(parsed['semesterInfo']['semesters'])
+    
+    def test_only_changed_semesters_are_recomputed(self, api_data):
+        """Test a revaluation in semester 2 against the previous snapshot"""
+        engine = AnalyticsEngine()
+        parser = ResultsParser()
+        _, snapshot = engine.calculate_incremental(parser.parse_api_response(api_data))
+        
+        api_data['results'][1]['subjectsResults'][0]['consideredGrade'].update(
+            {'grade': 'C', 'gradePoints': 5, 'passed': True})
+        revalued = parser.parse_api_response(api_data)
+        expected = engine.calculate_analytics(copy.deepcopy(revalued))
+        result, new_snapshot = engine.calculate_incremental(revalued, snapshot)
+        
+        assert new_snapshot['recomputed'] == 1
+        assert new_snapshot['semesters'][1] is snapshot['semesters'][1]
+        assert json.dumps(result) == json.dumps(expected)
+        
+        # Unchanged data reuses every partial
+        _, unchanged = engine.calculate_incremental(parser.parse_api_response(api_data), new_snapshot)
+        assert unchanged['recomputed'] == 0
+    
+    def test_semester_keys_detect_changes(self, api_data):
+        """Test change detection by the parser's semester content keys"""
+        engine = AnalyticsEngine()
+        parser = ResultsParser(memo_entries=4)
+        compact = parser.parse_compact(api_data)
+        _, snapshot = engine.calculate_incremental(compact.to_dict(), None, parser.semester_keys([compact]))
+        
+        api_data['results'][1]['subjectsResults'][0]['consideredGrade'].update(
+            {'grade': 'C', 'gradePoints': 5, 'passed': True})
+        compact = parser.parse_compact(api_data)
+        revalued = compact.to_dict()
+        expected = engine.calculate_analytics(copy.deepcopy(revalued))
+        result, snapshot = engine.calculate_incremental(revalued, snapshot, parser.semester_keys([compact]))
+        
+        assert snapshot['recomputed'] == 1
+        assert json.dumps(result) == json.dumps(expected)
+        assert ResultsParser.semester_keys([ResultsParser().parse_compact(api_data)]) is None
+    
+    def test_repeated_semesters_fall_back(self, api_data):
+        parsed = ResultsParser().parse_api_response(api_data)
+        parsed['semesterInfo']['semesters'][1]['semester'] = parsed['semesterInfo']['semesters'][0]['semester']
+        expected = AnalyticsEngine().calculate_analytics(copy.deepcopy(parsed))
+        
+        result, snapshot = AnalyticsEngine().calculate_incremental(parsed)
+        
+        assert snapshot is None
+        assert json.dumps(result) == json.dumps(expected)
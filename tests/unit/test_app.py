@@ -0,0 +1,553 @@
+"""
+Unit tests for the Flask API against the local CampX stand-in server
+"""
+
+import csv
+import io
+import sys
+import threading
+import time
+
+import pytest
+from backend.app import create_app
+from tests.benchmarks import mock_campx_server
+from tests.benchmarks.mock_campx_server import start_server, synthesize_response
+
+
+def ticket_with_backlogs(prefix):
+    """A synthesised 2022 hall ticket that has supplementary results"""
+    for i in range(1000):
+        hall_ticket = f"22XX1A{prefix}{i:03d}"
+        if synthesize_response(hall_ticket, 'supplementary')['results']:
+            return hall_ticket
+    raise AssertionError('no synthesised ticket with backlogs')
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, 'timed out waiting for the app'
+        time.sleep(0.01)
+
+
+def hold_fetches(monkeypatch):
+    """
+    Make the scraper block until the returned event is set
+    Returns: (release event, list of hall tickets fetched)
+    """
+    scraper_class = sys.modules['services.scraper'].CampXScraper
+    fetch_results = scraper_class.fetch_results
+    release, calls = threading.Event(), []
+    
+    def held(self, hall_ticket, *args, **kwargs):
+        calls.append(hall_ticket)
+        release.wait(5)
+        return fetch_results(self, hall_ticket, *args, **kwargs)
+    
+    monkeypatch.setattr(scraper_class, 'fetch_results', held)
+    return release, calls
+
+
+def in_background(app, hall_ticket):
+    """Start a lookup on another thread; join the thread, then read the reply list"""
+    replies = []
+    thread = threading.Thread(target=lambda: replies.append(fetch(app.test_client(), hall_ticket)))
+    thread.start()
+    return thread, replies
+
+
+@pytest.fixture
+def upstream(tmp_path):
+    server = start_server(replay_dir=str(tmp_path))
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def build_app(upstream, tmp_path, monkeypatch):
+    """Returns a factory for apps wired to the mock upstream, with Config overrides"""
+    # Patch the Config class the app imported (backend/ is on sys.path)
+    config = sys.modules['core.config'].Config
+    monkeypatch.setattr(config, 'CAMPX_API_URL', upstream.url)
+    monkeypatch.setattr(config, 'CACHE_ENABLED', False)
+    monkeypatch.setattr(config, 'CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(config, 'NEGATIVE_CACHE_ENABLED', False)
+    monkeypatch.setattr(config, 'RESULTS_STORE_PATH', str(tmp_path / 'results_store.db'))
+    # Fresh process-wide indexes and breaker for every test
+    for module, name in (('services.ranking', '_shared_index'), ('services.subject_stats', '_shared_aggregator'),
+                         ('services.quantile_sketch', '_shared_sketches'),
+                         ('services.circuit_breaker', '_shared_breaker')):
+        monkeypatch.setattr(sys.modules[module], name, None)
+    
+    def build(**overrides):
+        for name, value in overrides.items():
+            monkeypatch.setattr(config, name, value)
+        return create_app()
+    return build
+
+
+@pytest.fixture
+def client(build_app):
+    return build_app().test_client()
+
+
+def fetch(client, hall_ticket, exam_type='general', exam_types=None, since_version=None):
+    body = {'hallTicket': hall_ticket, 'examType': exam_type}
+    if exam_types:
+        body['examTypes'] = exam_types
+    if since_version:
+        body['sinceVersion'] = since_version
+    response = client.post('/api/fetch-results', json=body)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+class TestSupplementaryLookups:
+    
+    def test_subject_stats_keep_general_results(self, client):
+        """Test that a supplementary lookup does not replace the student's subject statistics"""
+        hall_ticket = ticket_with_backlogs('1')
+        code = fetch(client, hall_ticket)['subjects'][0]['code']
+        before = client.get(f'/api/stats/subjects?batch=2022&code={code}').get_json()
+        
+        fetch(client, hall_ticket, 'supplementary')
+        after = client.get(f'/api/stats/subjects?batch=2022&code={code}')
+        
+        assert after.status_code == 200
+        assert after.get_json() == before
+    
+    def test_ranking_keeps_general_cgpa(self, client, monkeypatch):
+        """Test that a supplementary lookup neither moves nor unranks the student"""
+        def without_cgpa(hall_ticket, exam_type='general', *args):
+            # The ranking CGPA then falls back to the GPA of the re-attempts alone
+            data = synthesize_response(hall_ticket, exam_type, *args)
+            if exam_type == 'supplementary':
+                del data['cgpa']
+            return data
+        
+        monkeypatch.setattr(mock_campx_server, 'synthesize_response', without_cgpa)
+        hall_ticket = ticket_with_backlogs('2')
+        ranked = fetch(client, hall_ticket)['ranking']
+        
+        supplementary = fetch(client, hall_ticket, 'supplementary')
+        
+        assert ranked is not None
+        assert supplementary['ranking'] == ranked
+    
+    def test_quantiles_wait_for_general_results(self, client):
+        """Test that a supplementary-first lookup leaves the student out of the sketches"""
+        sketches = sys.modules['services.quantile_sketch'].get_shared_quantile_sketches()
+        hall_ticket = ticket_with_backlogs('3')
+        
+        fetch(client, hall_ticket, 'supplementary')
+        assert not sketches.has_student(hall_ticket)
+        
+        fetch(client, hall_ticket)
+        assert sketches.has_student(hall_ticket)
+    
+    def test_merged_lookups_leave_cohort_alone(self, client):
+        """Test that merged lookups, in either order, keep the general-only cohort entries"""
+        hall_ticket = ticket_with_backlogs('4')
+        general = fetch(client, hall_ticket)
+        # A failed subject, which the merged result replaces with its later attempt
+        code = general['analytics']['passFailStatus']['failedSubjects'][0]['code']
+        
+        def cohort():
+            return (client.get(f'/api/cohort/subject-results?batch=2022&code={code}').get_json(),
+                    client.get(f'/api/stats/subjects?batch=2022&code={code}').get_json())
+        
+        before = cohort()
+        for exam_types in (['general', 'supplementary'], ['supplementary', 'general']):
+            merged = fetch(client, hall_ticket, exam_types=exam_types)
+            assert merged['ranking'] == general['ranking']
+            assert cohort() == before
+
+
+class TestRankingRoute:
+    
+    def test_top_students(self, client):
+        """Test that the top list is ordered by CGPA and narrowed by program"""
+        lookups = [fetch(client, f"22XX1A05{i:02d}") for i in range(6)]
+        
+        response = client.get('/api/ranking/top?batch=2022&k=3')
+        assert response.status_code == 200
+        body = response.get_json()
+        assert body['batch'] == '2022' and body['program'] is None
+        cgpas = [student['cgpa'] for student in body['students']]
+        assert len(cgpas) == 3
+        assert cgpas == sorted(cgpas, reverse=True)
+        assert cgpas[0] == max(lookup['semesterInfo']['cgpa'] for lookup in lookups)
+        
+        program = lookups[0]['studentInfo']['program']
+        narrowed = client.get('/api/ranking/top', query_string={'batch': '2022', 'program': program}).get_json()
+        expected = sum(lookup['studentInfo']['program'] == program for lookup in lookups)
+        assert len(narrowed['students']) == expected
+    
+    @pytest.mark.parametrize('query', ['', 'batch=2022&k=x', 'batch=2022&k=0', 'batch=2022&k=101'])
+    def test_bad_arguments(self, client, query):
+        """Test that a missing batch or an out-of-range k is rejected"""
+        response = client.get(f'/api/ranking/top?{query}')
+        assert response.status_code == 400
+        assert 'error' in response.get_json()
+    
+    def test_disabled(self, build_app):
+        """Test that the route answers 404 when ranking is off"""
+        client = build_app(RANKING_ENABLED=False).test_client()
+        assert client.get('/api/ranking/top?batch=2022').status_code == 404
+
+
+
+class TestSubjectStatsRoute:
+    
+    def test_subject_and_batch_listing(self, client):
+        """Test that one subject and the batch listing report the lookup's attempts"""
+        results = fetch(client, '22XX1A0601')
+        subject = results['subjects'][0]
+        
+        response = client.get(f"/api/stats/subjects?batch=2022&code={subject['code'].lower()}")
+        assert response.status_code == 200
+        stats = response.get_json()
+        assert stats['code'] == subject['code'] and stats['batch'] == '2022'
+        assert stats['attempts'] == 1
+        assert stats['gradeHistogram'] == {subject['grade']: 1}
+        
+        listing = client.get('/api/stats/subjects?batch=2022').get_json()
+        assert listing['batch'] == '2022'
+        assert {entry['code'] for entry in listing['subjects']} == {sub['code'] for sub in results['subjects']}
+    
+    def test_errors(self, client):
+        """Test the 400 for a missing batch and the 404 for an unseen subject"""
+        fetch(client, '22XX1A0602')
+        assert client.get('/api/stats/subjects?code=CS101').status_code == 400
+        assert client.get('/api/stats/subjects?batch=2022&code=ZZ999').status_code == 404
+        assert client.get('/api/stats/subjects?batch=1999').get_json()['subjects'] == []
+    
+    def test_disabled(self, build_app):
+        """Test that the route answers 404 when subject statistics are off"""
+        client = build_app(SUBJECT_STATS_ENABLED=False).test_client()
+        assert client.get('/api/stats/subjects?batch=2022').status_code == 404
+
+
+class TestPercentileRoute:
+    
+    def test_percentile_and_quantile(self, client):
+        """Test value -> percentile and q -> value for each metric while the cohort is exact"""
+        lookups = [fetch(client, f"22XX1A07{i:02d}") for i in range(4)]
+        cgpas = sorted(float(lookup['semesterInfo']['cgpa']) for lookup in lookups)
+        
+        top = client.get(f'/api/stats/percentile?batch=2022&value={cgpas[-1]}')
+        assert top.status_code == 200
+        body = top.get_json()
+        assert body['metric'] == 'cgpa' and body['batch'] == '2022'
+        assert body['percentile'] == 100.0 and body['count'] == 4 and body['errorBound'] == 0
+        
+        lowest = client.get('/api/stats/percentile?batch=2022&q=0').get_json()
+        assert lowest['value'] == cgpas[0]
+        
+        sgpa = client.get('/api/stats/percentile?metric=sgpa&semester=1&batch=2022&value=10')
+        assert sgpa.status_code == 200 and sgpa.get_json()['percentile'] == 100.0
+        
+        code = lookups[0]['subjects'][0]['code']
+        marks = client.get(f'/api/stats/percentile?metric=marks&code={code.lower()}&batch=2022&value=100')
+        assert marks.status_code == 200 and marks.get_json()['percentile'] == 100.0
+    
+    @pytest.mark.parametrize('query', [
+        'metric=gpa&value=8', 'metric=sgpa&value=8', 'metric=sgpa&semester=one&value=8',
+        'metric=marks&value=80', 'batch=2022', 'value=high', 'q=1.5'
+    ])
+    def test_bad_arguments(self, client, query):
+        """Test that an unknown metric or a missing / invalid parameter is rejected"""
+        fetch(client, '22XX1A0710')
+        response = client.get(f'/api/stats/percentile?{query}')
+        assert response.status_code == 400
+        assert 'error' in response.get_json()
+    
+    def test_unseen_cohort(self, client):
+        """Test the 404 for a cohort with no results"""
+        fetch(client, '22XX1A0711')
+        assert client.get('/api/stats/percentile?batch=1999&value=8').status_code == 404
+    
+    def test_disabled(self, build_app):
+        """Test that the route answers 404 when the sketches are off"""
+        client = build_app(QUANTILE_SKETCH_ENABLED=False).test_client()
+        assert client.get('/api/stats/percentile?value=8').status_code == 404
+
+
+class TestSinceVersion:
+    
+    def test_unchanged_and_diff(self, client, monkeypatch):
+        """Test the unchanged reply, then a diff after a revaluation"""
+        revalued = []
+        
+        def revaluation(hall_ticket, exam_type='general', *args):
+            data = synthesize_response(hall_ticket, exam_type, *args)
+            if revalued:
+                grade = data['results'][0]['subjectsResults'][0]['consideredGrade']
+                grade['grade'] = 'A+' if grade['grade'] == 'O' else 'O'
+            return data
+        
+        monkeypatch.setattr(mock_campx_server, 'synthesize_response', revaluation)
+        first = fetch(client, '22XX1A0801')
+        version = first['version']
+        
+        assert fetch(client, '22XX1A0801', since_version=version) == {'version': version, 'unchanged': True}
+        
+        revalued.append(True)
+        reply = fetch(client, '22XX1A0801', since_version=version)
+        assert reply['sinceVersion'] == version and reply['version'] != version
+        assert 'subjects' not in reply and 'ranking' in reply
+        changed = reply['diff']['subjects']['changed']
+        assert [entry['code'] for entry in changed] == [first['subjects'][0]['code']]
+        assert set(changed[0]['changes']) >= {'grade'}
+    
+    def test_unknown_version_gets_full_result(self, client):
+        """Test that a version the worker does not hold is answered in full"""
+        reply = fetch(client, '22XX1A0802', since_version='0' * 32)
+        assert reply['studentInfo']['hallTicket'] == '22XX1A0802'
+        assert 'diff' not in reply
+    
+    @pytest.mark.parametrize('since_version', [123, 'x' * 65])
+    def test_bad_since_version(self, client, since_version):
+        """Test that a non-string or over-long sinceVersion is rejected"""
+        response = client.post('/api/fetch-results', json={'hallTicket': '22XX1A0803', 'sinceVersion': since_version})
+        assert response.status_code == 400
+
+
+
+class TestCohortSubjectResultsRoute:
+    
+    def test_filters(self, client):
+        """Test that stored attempts are found by code, batch and grade, and paged"""
+        hall_ticket = ticket_with_backlogs('5')
+        results = fetch(client, hall_ticket)
+        failed = next(sub for sub in results['subjects'] if not sub['status']['passed'])
+        query = {'code': failed['code'].lower(), 'batch': '2022', 'grade': failed['grade'].lower()}
+        
+        response = client.get('/api/cohort/subject-results', query_string=query)
+        assert response.status_code == 200
+        body = response.get_json()
+        assert (body['code'], body['grade'], body['offset'], body['count']) == (failed['code'], failed['grade'], 0, 1)
+        attempt = body['results'][0]
+        assert attempt['hallTicket'] == hall_ticket
+        assert attempt['status']['passed'] is False
+        
+        paged = client.get('/api/cohort/subject-results', query_string={**query, 'offset': 1}).get_json()
+        assert paged['count'] == 0 and paged['results'] == []
+        other_batch = client.get('/api/cohort/subject-results', query_string={**query, 'batch': '1999'}).get_json()
+        assert other_batch['count'] == 0
+    
+    @pytest.mark.parametrize('query', ['batch=2022', 'code=CS101&limit=x', 'code=CS101&offset=-'])
+    def test_bad_arguments(self, client, query):
+        """Test that a missing code or a non-integer page is rejected"""
+        assert client.get(f'/api/cohort/subject-results?{query}').status_code == 400
+    
+    def test_disabled(self, build_app):
+        """Test that the route answers 404 when the results store is off"""
+        client = build_app(RESULTS_STORE_ENABLED=False).test_client()
+        assert client.get('/api/cohort/subject-results?code=CS101').status_code == 404
+
+
+class TestCohortAggregateRoutes:
+    
+    def test_summary(self, client):
+        """Test that the summary counts the stored students of a batch and a program"""
+        lookups = [fetch(client, ticket_with_backlogs('6'))] + [fetch(client, f"22XX1A09{i:02d}") for i in range(3)]
+        with_backlogs = sum(bool(lookup['analytics']['passFailStatus']['failed']) for lookup in lookups)
+        
+        response = client.get('/api/cohort/summary?batch=2022')
+        assert response.status_code == 200
+        summary = response.get_json()
+        assert (summary['batch'], summary['program'], summary['students']) == ('2022', None, 4)
+        assert summary['studentsWithBacklogs'] == with_backlogs >= 1
+        assert summary['allClear'] == 4 - with_backlogs
+        assert summary['cgpa']['count'] == sum(bucket['students'] for bucket in summary['cgpa']['distribution']) == 4
+        
+        program = lookups[0]['studentInfo']['program']
+        narrowed = client.get('/api/cohort/summary', query_string={'batch': '2022', 'program': program}).get_json()
+        assert narrowed['students'] == sum(lookup['studentInfo']['program'] == program for lookup in lookups)
+        
+        assert client.get('/api/cohort/summary?batch=1999').status_code == 404
+    
+    def test_subject_difficulty(self, client):
+        """Test hardest / easiest ordering, the limit and the minAttempts filter"""
+        for i in range(3):
+            fetch(client, f"22XX1A10{i:02d}")
+        
+        hardest = client.get('/api/cohort/subject-difficulty?batch=2022&limit=5')
+        assert hardest.status_code == 200
+        body = hardest.get_json()
+        assert (body['batch'], body['order']) == ('2022', 'hardest')
+        rates = [subject['failRate'] for subject in body['subjects']]
+        assert len(rates) == 5 and rates == sorted(rates, reverse=True)
+        assert [subject['rank'] for subject in body['subjects']] == [1, 2, 3, 4, 5]
+        
+        easiest = client.get('/api/cohort/subject-difficulty?batch=2022&limit=5&order=easiest').get_json()
+        rates = [subject['failRate'] for subject in easiest['subjects']]
+        assert rates == sorted(rates)
+        
+        crowded = client.get('/api/cohort/subject-difficulty?batch=2022&minAttempts=1000').get_json()
+        assert crowded['subjects'] == []
+    
+    @pytest.mark.parametrize('query', ['limit=x', 'minAttempts=many', 'order=middle'])
+    def test_subject_difficulty_bad_arguments(self, client, query):
+        """Test that a bad limit, minAttempts or order is rejected"""
+        assert client.get(f'/api/cohort/subject-difficulty?{query}').status_code == 400
+    
+    def test_disabled(self, build_app):
+        """Test that both routes answer 404 when the results store is off"""
+        client = build_app(RESULTS_STORE_ENABLED=False).test_client()
+        assert client.get('/api/cohort/summary').status_code == 404
+        assert client.get('/api/cohort/subject-difficulty').status_code == 404
+
+
+class TestCsvExportRoutes:
+    
+    def test_student_export_is_streamed(self, build_app, tmp_path):
+        """Test that a student's CSV is streamed without writing an export file"""
+        export_dir = tmp_path / 'exports'
+        client = build_app(EXPORT_DIR=str(export_dir)).test_client()
+        results = fetch(client, '22XX1A1101')
+        
+        response = client.post('/api/export', json={'data': results, 'format': 'csv'})
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert response.mimetype == 'text/csv'
+        assert 'Content-Length' not in response.headers
+        assert 'filename="results_22XX1A1101_' in response.headers['Content-Disposition']
+        body = response.get_data(as_text=True)
+        assert all(sub['code'] in body for sub in results['subjects'])
+        assert list(export_dir.iterdir()) == []
+    
+    def test_student_export_without_data(self, client):
+        """Test the 400 for an export request without results"""
+        assert client.post('/api/export', json={'format': 'csv'}).status_code == 400
+    
+    def test_cohort_export_is_streamed(self, client):
+        """Test that the cohort CSV streams one row per stored subject attempt"""
+        lookups = [fetch(client, f"22XX1A12{i:02d}") for i in range(2)]
+        
+        response = client.get('/api/cohort/export?batch=2022')
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert response.mimetype == 'text/csv'
+        assert 'filename="cohort_2022_' in response.headers['Content-Disposition']
+        rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+        assert rows[0][:2] == ['Hall Ticket', 'Name']
+        assert len(rows) - 1 == sum(len(lookup['subjects']) for lookup in lookups)
+        assert {row[0] for row in rows[1:]} == {'22XX1A1200', '22XX1A1201'}
+        
+        empty = client.get('/api/cohort/export?batch=1999')
+        assert list(csv.reader(io.StringIO(empty.get_data(as_text=True)))) == rows[:1]
+    
+    def test_cohort_export_disabled(self, build_app):
+        """Test that the cohort export answers 404 when the results store is off"""
+        client = build_app(RESULTS_STORE_ENABLED=False).test_client()
+        assert client.get('/api/cohort/export').status_code == 404
+
+
+class TestCoalescedLookups:
+    
+    def test_concurrent_lookups_share_one_fetch(self, build_app, upstream, monkeypatch):
+        """Test that two concurrent lookups of one hall ticket make one upstream request"""
+        app = build_app()
+        release, calls = hold_fetches(monkeypatch)
+        metrics = app.test_client()
+        
+        first, first_reply = in_background(app, '22XX1A1301')
+        wait_for(lambda: calls)
+        second, second_reply = in_background(app, '22XX1A1301')
+        wait_for(lambda: metrics.get('/api/metrics').get_json()['singleFlight']['coalesced'] == 1)
+        release.set()
+        first.join(5)
+        second.join(5)
+        
+        assert calls == ['22XX1A1301']
+        assert upstream.counts['requests'] == 1
+        assert first_reply[0]['version'] == second_reply[0]['version']
+        assert first_reply[0]['studentInfo']['hallTicket'] == '22XX1A1301'
+
+
+
+class TestCachedLookups:
+    
+    def test_cache_hit_skips_scraper(self, build_app, upstream):
+        """Test that a repeat lookup, also from a second worker, is served from the cache"""
+        client = build_app(CACHE_ENABLED=True).test_client()
+        first = fetch(client, '22XX1A1401')
+        assert fetch(client, '22XX1A1401') == first
+        
+        # Another worker reads the shared disk tier
+        other_worker = build_app(CACHE_ENABLED=True).test_client()
+        assert fetch(other_worker, '22XX1A1401') == first
+        
+        assert upstream.counts['requests'] == 1
+        stats = client.get('/api/metrics').get_json()['resultsCache']
+        assert stats['memory']['hits'] == 1
+    
+    def test_exam_types_are_cached_apart(self, build_app, upstream):
+        """Test that a supplementary lookup is not answered from the general entry"""
+        client = build_app(CACHE_ENABLED=True).test_client()
+        hall_ticket = ticket_with_backlogs('7')
+        general = fetch(client, hall_ticket)
+        
+        assert fetch(client, hall_ticket, 'supplementary') != general
+        assert upstream.counts['requests'] == 2
+
+
+class TestStaleServing:
+    
+    @staticmethod
+    def open_circuit():
+        breaker = sys.modules['services.circuit_breaker'].get_shared_circuit_breaker()
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        assert breaker.is_open
+    
+    def test_stale_copy_while_circuit_open(self, build_app, upstream):
+        """Test that an expired entry is served, without an upstream call, while the circuit is open"""
+        client = build_app(CACHE_ENABLED=True, CACHE_TTL=0).test_client()
+        first = fetch(client, '22XX1A1501')
+        self.open_circuit()
+        
+        reply = fetch(client, '22XX1A1501')
+        assert reply['stale'] is True and reply['staleReason'] == 'upstream-unavailable'
+        assert reply['version'] == first['version']
+        assert upstream.counts['requests'] == 1
+    
+    def test_stale_copy_while_refreshing(self, build_app, monkeypatch):
+        """Test that a lookup arriving during a refresh gets the expired entry instead of waiting"""
+        app = build_app(CACHE_ENABLED=True, CACHE_TTL=0)
+        client = app.test_client()
+        first = fetch(client, '22XX1A1502')
+        release, calls = hold_fetches(monkeypatch)
+        
+        refresh, refreshed = in_background(app, '22XX1A1502')
+        wait_for(lambda: calls)
+        reply = fetch(client, '22XX1A1502')
+        release.set()
+        refresh.join(5)
+        
+        assert reply['stale'] is True and reply['staleReason'] == 'refreshing'
+        assert reply['version'] == first['version']
+        assert 'stale' not in refreshed[0]
+    
+    def test_stale_copy_when_refresh_fails(self, build_app, monkeypatch):
+        """Test that an expired entry is served when the refresh finds nothing"""
+        client = build_app(CACHE_ENABLED=True, CACHE_TTL=0).test_client()
+        fetch(client, '22XX1A1503')
+        monkeypatch.setattr(sys.modules['services.scraper'].CampXScraper, 'fetch_results', lambda self, *args: None)
+        
+        reply = fetch(client, '22XX1A1503')
+        assert reply['stale'] is True and reply['staleReason'] == 'refresh-failed'
+    
+    @pytest.mark.parametrize('cache_enabled', [True, False])
+    def test_unavailable_without_stale_copy(self, build_app, upstream, cache_enabled):
+        """Test the 503 when the circuit is open and nothing is cached"""
+        client = build_app(CACHE_ENABLED=cache_enabled).test_client()
+        self.open_circuit()
+        
+        response = client.post('/api/fetch-results', json={'hallTicket': '22XX1A1504'})
+        assert response.status_code == 503
+        assert 'error' in response.get_json()
+        assert upstream.counts['requests'] == 0
@@ -0,0 +1,84 @@
+"""
+Unit tests for AsyncBatchFetcher
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from unittest.mock import Mock
+
+from backend.services.batch_fetcher import AsyncBatchFetcher
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'fixtures')
+
+
+def load_api_fixture():
+    with open(os.path.join(FIXTURES_DIR, 'mock_api_response.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class TestAsyncBatchFetcher:
+    
+    def test_fetches_and_parses_every_ticket(self):
+        """Test that every hall ticket is fetched and parsed"""
+        api_data = load_api_fixture()
+        scraper = Mock()
+        scraper.fetch_results.side_effect = lambda ticket, exam_type: api_data if ticket != 'MISSING01' else None
+        
+        fetcher = AsyncBatchFetcher(scraper=scraper, concurrency=3)
+        results = fetcher.run(['TICKET001', 'TICKET002', 'MISSING01'])
+        
+        assert set(results) == {'TICKET001', 'TICKET002', 'MISSING01'}
+        assert results['MISSING01'] is None
+        assert results['TICKET001']['studentInfo']['hallTicket'] == 'XXENG001X01'
+        assert len(results['TICKET002']['subjects']) == 7
+    
+    def test_concurrency_is_bounded(self):
+        """Test that no more than `concurrency` lookups run at once"""
+        lock = threading.Lock()
+        state = {'active': 0, 'peak': 0}
+        
+        def slow_fetch(ticket, exam_type):
+            with lock:
+                state['active'] += 1
+                state['peak'] = max(state['peak'], state['active'])
+            time.sleep(0.02)
+            with lock:
+                state['active'] -= 1
+            return None
+        
+        scraper = Mock()
+        scraper.fetch_results.side_effect = slow_fetch
+        
+        fetcher = AsyncBatchFetcher(scraper=scraper, concurrency=4)
+        results = fetcher.run(f"TICKET{i:03d}" for i in range(20))
+        
+        assert len(results) == 20
+        assert state['peak'] <= 4
+    
+    def test_results_yielded_in_completion_order(self):
+        """Test that fast lookups are yielded before slow ones"""
+        def fetch(ticket, exam_type):
+            time.sleep(0.1 if ticket == 'SLOW00001' else 0)
+            return None
+        
+        scraper = Mock()
+        scraper.fetch_results.side_effect = fetch
+        fetcher = AsyncBatchFetcher(scraper=scraper, concurrency=2)
+        
+        async def collect():
+            return [ticket async for ticket, _ in fetcher.iter_results(['SLOW00001', 'FAST00001'])]
+        
+        assert asyncio.run(collect()) == ['FAST00001', 'SLOW00001']
+    
+    def test_scraper_errors_become_none(self):
+        """Test that an exception for one ticket does not abort the batch"""
+        scraper = Mock()
+        scraper.fetch_results.side_effect = RuntimeError("boom")
+        
+        fetcher = AsyncBatchFetcher(scraper=scraper, concurrency=2)
+        results = fetcher.run(['TICKET001', 'TICKET002'])
+        
+        assert results == {'TICKET001': None, 'TICKET002': None}
@@ -0,0 +1,151 @@
+"""
+Unit tests for the upstream CircuitBreaker
+"""
+
+import time
+from unittest.mock import Mock, patch
+
+import requests
+from backend.services.circuit_breaker import CircuitBreaker
+from backend.services.scraper import CampXScraper
+
+
+class TestCircuitBreaker:
+    
+    def test_opens_after_threshold_failures(self):
+        """Test that consecutive failures open the circuit"""
+        breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=60, half_open_max_calls=1)
+        for _ in range(2):
+            breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+        
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.is_open
+        assert breaker.allow_request() is False
+    
+    def test_success_resets_failure_count(self):
+        """Test that failures must be consecutive"""
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60, half_open_max_calls=1)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+    
+    def test_half_open_allows_limited_probes(self):
+        """Test that only the configured number of probes pass after the timeout"""
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.01, half_open_max_calls=1)
+        breaker.record_failure()
+        time.sleep(0.02)
+        
+        assert not breaker.is_open
+        assert breaker.allow_request() is True
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow_request() is False
+    
+    def test_probe_success_closes_circuit(self):
+        """Test recovery after a successful probe"""
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.01, half_open_max_calls=1)
+        breaker.record_failure()
+        time.sleep(0.02)
+        breaker.allow_request()
+        breaker.record_success()
+        
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.allow_request() is True
+    
+    def test_probe_failure_reopens_circuit(self):
+        """Test that a failed probe re-opens the circuit"""
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.01, half_open_max_calls=1)
+        breaker.record_failure()
+        time.sleep(0.02)
+        breaker.allow_request()
+        breaker.record_failure()
+        
+        assert breaker.is_open
+        assert breaker.stats()['timesOpened'] == 2
+    
+    def test_release_returns_probe(self):
+        """Test that a released probe can be reserved again"""
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.01, half_open_max_calls=1)
+        breaker.record_failure()
+        time.sleep(0.02)
+        assert breaker.allow_request() is True
+        breaker.release()
+        
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow_request() is True
+
+
+class TestScraperCircuitBreaker:
+    
+    @patch('backend.services.scraper.requests.Session.get')
+    def test_open_circuit_skips_upstream(self, mock_get):
+        """Test that timeouts open the circuit and later calls fail fast"""
+        mock_get.side_effect = requests.Timeout("timed out")
+        
+        scraper = CampXScraper()
+        scraper.rate_limiter = None
+        scraper.circuit_breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60, half_open_max_calls=1)
+        
+        for _ in range(4):
+            assert scraper.fetch_results('12345') is None
+        
+        assert mock_get.call_count == 2
+        assert scraper.circuit_breaker.is_open
+    
+    @patch('backend.services.scraper.requests.Session.get')
+    def test_server_errors_count_as_failures(self, mock_get):
+        """Test that 5xx responses are recorded as failures"""
+        mock_response = Mock()
+        mock_response.status_code = 502
+        mock_get.return_value = mock_response
+        
+        scraper = CampXScraper()
+        scraper.circuit_breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60, half_open_max_calls=1)
+        
+        assert scraper.fetch_results('12345') is None
+        assert scraper.circuit_breaker.is_open
+    
+    @patch('backend.services.scraper.requests.Session.get')
+    def test_open_circuit_spends_no_tokens(self, mock_get):
+        """Test that refused calls do not draw from the rate limiter"""
+        scraper = CampXScraper()
+        scraper.rate_limiter = Mock()
+        scraper.circuit_breaker = Mock(is_open=False)
+        scraper.circuit_breaker.allow_request.return_value = False
+        
+        assert scraper.fetch_results('12345') is None
+        scraper.rate_limiter.acquire.assert_not_called()
+        mock_get.assert_not_called()
+    
+    @patch('backend.services.scraper.requests.Session.get')
+    def test_rate_limited_probe_is_released(self, mock_get):
+        """Test that a probe refused by the limiter does not hold the half-open slot"""
+        scraper = CampXScraper()
+        scraper.rate_limiter = Mock()
+        scraper.rate_limiter.acquire.return_value = False
+        scraper.circuit_breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.01, half_open_max_calls=1)
+        scraper.circuit_breaker.record_failure()
+        time.sleep(0.02)
+        
+        assert scraper.fetch_results('12345') is None
+        mock_get.assert_not_called()
+        assert scraper.circuit_breaker.allow_request() is True
+    
+    @patch('backend.services.scraper.requests.Session.get')
+    def test_unexpected_error_releases_probe(self, mock_get):
+        """Test that a non-network error during a probe does not hold the half-open slot"""
+        mock_get.side_effect = RuntimeError("boom")
+        
+        scraper = CampXScraper()
+        scraper.rate_limiter = None
+        scraper.hedger = None
+        scraper.circuit_breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.01, half_open_max_calls=1)
+        scraper.circuit_breaker.record_failure()
+        time.sleep(0.02)
+        
+        assert scraper.fetch_results('12345') is None
+        assert scraper.circuit_breaker.state == CircuitBreaker.HALF_OPEN
+        assert scraper.circuit_breaker.allow_request() is True
+
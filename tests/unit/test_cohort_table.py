@@ -0,0 +1,96 @@
+"""
+Unit tests for the columnar CohortTable
+"""
+
+import copy
+import csv
+import json
+import os
+
+import numpy as np
+import pytest
+from backend.services.cohort_table import CohortTable
+from backend.services.exporter import ResultsExporter
+from backend.services.parser import ResultsParser
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'fixtures')
+
+
+@pytest.fixture
+def api_data():
+    with open(os.path.join(FIXTURES_DIR, 'mock_api_response.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def cohort(api_data):
+    """Fixture student plus a second student without summary or SGPA"""
+    other = copy.deepcopy(api_data)
+    other['student']['rollNo'] = 'XXENG001X02'
+    other['summary'] = {}
+    other['results'] = other['results'][:1]
+    other['results'][0]['sgpa'] = 0
+    parser = ResultsParser()
+    return CohortTable.from_results([parser.parse_api_response(api_data), None, parser.parse_compact(other)])
+
+
+class TestCohortTable:
+    
+    def test_offsets(self, cohort):
+        """Test that each student's rows are contiguous"""
+        assert len(cohort) == 2
+        assert cohort.n_rows == 11
+        assert cohort.offsets.tolist() == [0, 7, 11]
+        assert (cohort.student[cohort.student_rows(1)] == 1).all()
+        assert cohort.student_index('XXENG001X02') == 1
+        assert cohort.student_index('missing') is None
+    
+    def test_dictionary_encoding(self, cohort):
+        """Test that repeated codes share one dictionary entry"""
+        assert len(cohort.code_labels) == 7
+        assert cohort.decode('code', cohort.student_rows(1)) == cohort.decode('code', slice(0, 4))
+        assert cohort.code.dtype == np.int32
+    
+    def test_numeric_columns(self, cohort):
+        """Test that credits and grade points are parsed once into arrays"""
+        assert cohort.credits.dtype == np.float64
+        assert cohort.credits[:7].sum() == pytest.approx(20.5)
+        assert 'F' in cohort.decode('grade', cohort.student_rows(0))
+        assert (cohort.passed[:7] == 0).sum() == 1
+    
+    def test_semesters(self, cohort):
+        """Test the per-semester index and API SGPA"""
+        assert cohort.sem_offsets.tolist() == [0, 2, 3]
+        assert cohort.sem_number.tolist() == [1, 2, 1]
+        assert cohort.sem_sgpa[0] == pytest.approx(8.21)
+        assert cohort.sem_sgpa[1:].tolist() == [0.0, 0.0]
+        assert cohort.sem_row.tolist() == [0] * 4 + [1] * 3 + [2] * 4
+    
+    def test_summary_columns(self, cohort):
+        """Test per-student summary fields and presence flags"""
+        assert cohort.summary_backlogs_due[0] == 1
+        assert cohort.has_credits_summary.tolist() == [True, False]
+        assert np.isnan(cohort.summary_marks_total[1])
+    
+    def test_to_frame(self, cohort):
+        """Test the decoded per-subject frame"""
+        frame = cohort.to_frame()
+        
+        assert len(frame) == 11
+        assert frame['hallTicket'].tolist()[-1] == 'XXENG001X02'
+        assert frame.loc[frame['grade'] == 'F', 'code'].tolist() == ['MA102']
+
+
+class TestExportCohort:
+    
+    def test_csv(self, cohort, tmp_path):
+        """Test that a cohort exports one CSV row per subject"""
+        exporter = ResultsExporter()
+        exporter.export_dir = str(tmp_path)
+        path = exporter.export_cohort(cohort)
+        
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == 11
+        assert rows[0]['Hall Ticket'] == 'XXENG001X01'
+        assert set(rows[0]) >= {'Subject Code', 'Grade', 'Credits', 'Exam Month'}
@@ -0,0 +1,88 @@
+"""
+Unit tests for the results exporter
+"""
+
+import csv
+import io
+import json
+import os
+
+import pytest
+from backend.services.analytics import AnalyticsEngine
+from backend.services.exporter import ResultsExporter
+from backend.services.parser import ResultsParser
+from backend.services.results_store import ResultsStore
+from tests.benchmarks.mock_campx_server import synthesize_response
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'fixtures')
+
+
+def processed(api_data):
+    results_data = ResultsParser().parse_api_response(api_data)
+    return {**results_data, 'analytics': AnalyticsEngine().calculate_analytics(results_data)}
+
+
+@pytest.fixture
+def results_data():
+    with open(os.path.join(FIXTURES_DIR, 'mock_api_response.json'), 'r', encoding='utf-8') as f:
+        return processed(json.load(f))
+
+
+@pytest.fixture
+def exporter(tmp_path):
+    exporter = ResultsExporter()
+    exporter.export_dir = str(tmp_path)
+    return exporter
+
+
+class TestStreamingExport:
+    
+    def test_stream_matches_file_export(self, exporter, results_data, tmp_path):
+        """Test that the streamed CSV is byte-for-byte the exported file"""
+        path = exporter.export(results_data, 'csv')
+        with open(path, newline='', encoding='utf-8') as f:
+            written = f.read()
+        
+        assert ''.join(exporter.stream_csv(results_data)) == written
+        assert 'MA102' in written
+    
+    def test_stream_writes_no_files(self, exporter, results_data, tmp_path):
+        list(exporter.stream_csv(results_data))
+        assert os.listdir(tmp_path) == []
+    
+    def test_chunks(self):
+        """Test that rows are grouped into chunks of about the requested size"""
+        rows = [['row', i, 'x' * 20] for i in range(200)]
+        chunks = list(ResultsExporter.iter_csv(iter(rows), chunk_size=256))
+        
+        assert len(chunks) > 10
+        assert all(len(chunk) < 256 + 64 for chunk in chunks)
+        assert list(csv.reader(io.StringIO(''.join(chunks)))) == [[str(v) for v in row] for row in rows]
+    
+    def test_is_lazy(self):
+        """Test that rows are pulled from the source only as chunks are consumed"""
+        pulled = []
+        
+        def rows():
+            for i in range(1000):
+                pulled.append(i)
+                yield [i]
+        
+        chunks = ResultsExporter.iter_csv(rows(), chunk_size=100)
+        next(chunks)
+        assert len(pulled) < 100
+    
+    def test_cohort_from_store(self, exporter, tmp_path):
+        """Test a cohort CSV streamed from the results store"""
+        store = ResultsStore(str(tmp_path / 'store.db'))
+        for i in range(20):
+            store.upsert(processed(synthesize_response(f"22XX1A{i:04d}", 'general', 4)))
+        store.upsert(processed(synthesize_response('21XX1A0001', 'general', 4)))
+        
+        text = ''.join(exporter.stream_cohort_csv(store.iter_subject_rows(batch='2022')))
+        rows = list(csv.DictReader(io.StringIO(text)))
+        
+        assert list(rows[0]) == list(ResultsExporter.COHORT_COLUMNS.values())
+        assert len(rows) == sum(len(store.get_student(f"22XX1A{i:04d}")['subjects']) for i in range(20))
+        assert {row['Batch'] for row in rows} == {'2022'}
+        assert {row['Passed'] for row in rows} <= {'True', 'False'}
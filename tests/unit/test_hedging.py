@@ -0,0 +1,147 @@
+"""
+Unit tests for hedged upstream requests
+"""
+
+import threading
+import time
+
+import pytest
+from backend.services.hedging import Hedger, LatencyTracker, RetryBudget
+
+
+def warm_hedger(hedger, latency=0.01, samples=20):
+    for _ in range(samples):
+        hedger.latency.record(latency)
+
+
+class TestLatencyTracker:
+    
+    def test_percentile_needs_min_samples(self):
+        """Test that no percentile is reported before enough samples"""
+        tracker = LatencyTracker(min_samples=5)
+        for value in (0.1, 0.2):
+            tracker.record(value)
+        assert tracker.percentile(95) is None
+    
+    def test_nearest_rank_percentile(self):
+        """Test nearest-rank percentile over the window"""
+        tracker = LatencyTracker(min_samples=1)
+        for value in range(1, 101):
+            tracker.record(value / 1000)
+        assert tracker.percentile(95) == 0.095
+        assert tracker.percentile(50) == 0.05
+
+
+class TestRetryBudget:
+    
+    def test_budget_caps_hedges_at_ratio(self):
+        """Test that one hedge is allowed per 1/ratio requests"""
+        budget = RetryBudget(ratio=0.1)
+        spent = 0
+        for _ in range(100):
+            budget.deposit()
+            spent += budget.try_spend()
+        assert spent == 10
+
+
+class TestHedger:
+    
+    def test_fast_request_is_not_hedged(self):
+        """Test that requests faster than the threshold are sent once"""
+        hedger = Hedger(percentile=95, budget_ratio=1.0, min_samples=20, max_workers=4)
+        warm_hedger(hedger, latency=0.5)
+        calls = []
+        
+        assert hedger.run(lambda: calls.append(1) or 'ok') == 'ok'
+        assert len(calls) == 1
+        assert hedger.stats()['hedged'] == 0
+    
+    def test_slow_request_is_hedged_and_fastest_wins(self):
+        """Test that a slow first attempt is raced by a hedge"""
+        hedger = Hedger(percentile=95, budget_ratio=1.0, min_samples=20, max_workers=4)
+        warm_hedger(hedger, latency=0.01)
+        attempts = []
+        lock = threading.Lock()
+        
+        def request():
+            with lock:
+                attempts.append(1)
+                attempt = len(attempts)
+            time.sleep(0.5 if attempt == 1 else 0.01)
+            return f"attempt-{attempt}"
+        
+        start = time.monotonic()
+        assert hedger.run(request) == 'attempt-2'
+        assert time.monotonic() - start < 0.4
+        assert hedger.stats()['hedgeWins'] == 1
+    
+    def test_budget_exhausted_skips_hedge(self):
+        """Test that no hedge is sent without budget"""
+        hedger = Hedger(percentile=95, budget_ratio=0.0, min_samples=20, max_workers=4)
+        warm_hedger(hedger, latency=0.001)
+        calls = []
+        
+        def request():
+            calls.append(1)
+            time.sleep(0.05)
+            return 'ok'
+        
+        assert hedger.run(request) == 'ok'
+        assert len(calls) == 1
+    
+    def test_can_hedge_veto(self):
+        """Test that the can_hedge callback can refuse a hedge"""
+        hedger = Hedger(percentile=95, budget_ratio=1.0, min_samples=20, max_workers=4)
+        warm_hedger(hedger, latency=0.001)
+        calls = []
+        
+        def request():
+            calls.append(1)
+            time.sleep(0.05)
+            return 'ok'
+        
+        assert hedger.run(request, can_hedge=lambda: False) == 'ok'
+        assert len(calls) == 1
+    
+    def test_error_in_one_attempt_uses_the_other(self):
+        """Test that a failing attempt does not hide a successful one"""
+        hedger = Hedger(percentile=95, budget_ratio=1.0, min_samples=20, max_workers=4)
+        warm_hedger(hedger, latency=0.001)
+        attempts = []
+        lock = threading.Lock()
+        
+        def request():
+            with lock:
+                attempts.append(1)
+                attempt = len(attempts)
+            if attempt == 1:
+                time.sleep(0.05)
+                raise ConnectionError("reset")
+            time.sleep(0.1)
+            return 'ok'
+        
+        assert hedger.run(request) == 'ok'
+    
+    def test_all_attempts_failing_raises(self):
+        """Test that the error surfaces when every attempt fails"""
+        hedger = Hedger(percentile=95, budget_ratio=1.0, min_samples=20, max_workers=4)
+        warm_hedger(hedger, latency=0.001)
+        
+        def request():
+            time.sleep(0.02)
+            raise ConnectionError("reset")
+        
+        with pytest.raises(ConnectionError):
+            hedger.run(request)
+    
+    def test_saturated_pool_is_not_hedged(self):
+        """Test that queue time is timed and a still-queued request is not hedged"""
+        hedger = Hedger(percentile=95, budget_ratio=1.0, min_samples=20, max_workers=1)
+        warm_hedger(hedger, latency=0.001)
+        hedger._executor.submit(time.sleep, 0.1)
+        calls = []
+        
+        assert hedger.run(lambda: calls.append(1) or 'ok') == 'ok'
+        assert len(calls) == 1
+        assert hedger.stats()['hedged'] == 0
+        assert hedger.latency.percentile(100) >= 0.09
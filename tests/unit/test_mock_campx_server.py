@@ -0,0 +1,113 @@
+"""
+Unit tests for the local CampX stand-in server
+"""
+
+import json
+
+import pytest
+import requests
+from backend.services.parser import ResultsParser
+from backend.services.analytics import AnalyticsEngine
+from tests.benchmarks.mock_campx_server import parse_latency_spec, start_server, synthesize_response
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = start_server(replay_dir=str(tmp_path))
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestSynthesizedResponses:
+    
+    def test_shape_matches_parser(self):
+        """Test that synthesised records parse and analyse cleanly"""
+        raw = synthesize_response('22ENG0001', semesters=4)
+        parsed = ResultsParser().parse_api_response(raw)
+        analytics = AnalyticsEngine().calculate_analytics(parsed)
+        
+        assert parsed['studentInfo']['hallTicket'] == '22ENG0001'
+        assert parsed['studentInfo']['batch'] == '2022'
+        assert len(parsed['semesterInfo']['semesters']) == 4
+        assert analytics['gpa'] is not None
+    
+    def test_deterministic_per_ticket(self):
+        """Test that the same ticket always gets the same record"""
+        assert synthesize_response('22ENG0001') == synthesize_response('22ENG0001')
+        assert synthesize_response('22ENG0001') != synthesize_response('22ENG0002')
+    
+    def test_latency_specs(self):
+        """Test latency spec parsing"""
+        import random
+        rng = random.Random(1)
+        assert parse_latency_spec('none')(rng) == 0.0
+        assert parse_latency_spec('constant:50')(rng) == 0.05
+        assert 0.01 <= parse_latency_spec('uniform:10:20')(rng) <= 0.02
+        with pytest.raises(ValueError):
+            parse_latency_spec('gamma:1')
+
+
+class TestMockServer:
+    
+    def test_serves_results(self, server):
+        """Test a successful lookup over HTTP"""
+        response = requests.get(server.url, params={'rollNo': '22ENG0001', 'examType': 'general'}, timeout=5)
+        
+        assert response.status_code == 200
+        assert response.json()['student']['rollNo'] == '22ENG0001'
+        assert server.counts['200'] == 1
+    
+    def test_throttle_injection(self, tmp_path):
+        """Test that throttle_rate=1 answers every request with 429 and Retry-After"""
+        server = start_server(throttle_rate=1.0, retry_after=7, replay_dir=str(tmp_path))
+        try:
+            response = requests.get(server.url, params={'rollNo': '22ENG0001'}, timeout=5)
+        finally:
+            server.shutdown()
+            server.server_close()
+        
+        assert response.status_code == 429
+        assert response.headers['Retry-After'] == '7'
+    
+    def test_replays_saved_responses(self, tmp_path):
+        """Test that raw responses in the replay directory are served as-is"""
+        raw = synthesize_response('22ENG0001')
+        raw['student']['fullName'] = 'REPLAYED STUDENT'
+        (tmp_path / 'real_results_raw.json').write_text(json.dumps(raw))
+        (tmp_path / 'real_results.json').write_text(json.dumps({'studentInfo': {}}))
+        
+        server = start_server(replay_dir=str(tmp_path))
+        try:
+            response = requests.get(server.url, params={'rollNo': '22eng0001'}, timeout=5)
+        finally:
+            server.shutdown()
+            server.server_close()
+        
+        assert list(server.replay) == [('22ENG0001', 'general')]
+        assert response.json()['student']['fullName'] == 'REPLAYED STUDENT'
+    
+    def test_replays_match_exam_type(self, tmp_path):
+        """Test that a saved general response is not served for other exam types"""
+        general = synthesize_response('22ENG0001')
+        general['student']['fullName'] = 'REPLAYED GENERAL'
+        supplementary = synthesize_response('22ENG0001', 'supplementary')
+        supplementary['student']['fullName'] = 'REPLAYED SUPPLEMENTARY'
+        (tmp_path / 'real_results_raw.json').write_text(json.dumps(general))
+        (tmp_path / 'real_results_raw.supplementary.json').write_text(json.dumps(supplementary))
+        
+        server = start_server(replay_dir=str(tmp_path))
+        try:
+            names = {
+                exam_type: requests.get(
+                    server.url, params={'rollNo': '22ENG0001', 'examType': exam_type}, timeout=5
+                ).json()['student']['fullName']
+                for exam_type in ('general', 'supplementary', 'revaluation')
+            }
+        finally:
+            server.shutdown()
+            server.server_close()
+        
+        assert names['general'] == 'REPLAYED GENERAL'
+        assert names['supplementary'] == 'REPLAYED SUPPLEMENTARY'
+        assert names['revaluation'] not in ('REPLAYED GENERAL', 'REPLAYED SUPPLEMENTARY')
@@ -0,0 +1,89 @@
+"""
+Unit tests for the compact results model
+"""
+
+import dataclasses
+import json
+import os
+
+import pytest
+# Parser imports the model via the backend path hack, so take the classes from there
+from backend.services.parser import ResultsParser, StudentResult, SubjectResult
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'fixtures')
+
+
+@pytest.fixture
+def api_data():
+    with open(os.path.join(FIXTURES_DIR, 'mock_api_response.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class TestParseCompact:
+    
+    def test_compact_fields(self, api_data):
+        """Test that the compact model carries the parsed fields"""
+        compact = ResultsParser().parse_compact(api_data)
+        
+        assert isinstance(compact, StudentResult)
+        assert compact.hall_ticket == 'XXENG001X01'
+        assert [sem.semester for sem in compact.semesters] == [1, 2]
+        assert len(compact.subjects) == 7
+        assert all(isinstance(s, SubjectResult) for s in compact.subjects)
+    
+    def test_slotted_and_frozen(self, api_data):
+        """Test that records have no per-instance dict and reject mutation"""
+        subject = ResultsParser().parse_compact(api_data).subjects[0]
+        
+        assert not hasattr(subject, '__dict__')
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            subject.grade = 'O'
+    
+    def test_strings_interned(self, api_data):
+        """Test that repeated strings are shared across students"""
+        parser = ResultsParser()
+        first = parser.parse_compact(api_data).subjects[0]
+        second = parser.parse_compact(json.loads(json.dumps(api_data))).subjects[0]
+        
+        assert first.code is second.code
+        assert first.exam_month is second.exam_month
+    
+    def test_empty_input(self):
+        """Test that empty input returns None"""
+        assert ResultsParser().parse_compact({}) is None
+
+
+class TestToDict:
+    
+    def test_matches_api_shape(self, api_data):
+        """Test that to_dict produces the parse_api_response contract"""
+        parsed = ResultsParser().parse_compact(api_data).to_dict()
+        
+        assert set(parsed) == {'studentInfo', 'subjects', 'semesterInfo', 'summary'}
+        assert set(parsed['subjects'][0]) == {
+            'code', 'name', 'credits', 'grade', 'gradePoints', 'marks', 'examMonth',
+            'type', 'status', 'maxMarks', 'semester'
+        }
+        assert parsed['semesterInfo']['cgpa'] == 7.9
+        assert parsed['summary']['credits'] == api_data['summary']['creditsObtained']
+    
+    def test_subject_dicts_shared(self, api_data):
+        """Test that flat and per-semester lists share the same subject dicts"""
+        parsed = ResultsParser().parse_compact(api_data).to_dict()
+        sem1 = parsed['semesterInfo']['semesters'][0]['subjects']
+        
+        assert all(a is b for a, b in zip(sem1, parsed['subjects']))
+    
+    def test_semesters_sorted(self, api_data):
+        """Test that semesters come out sorted even if the API reorders them"""
+        api_data['results'].reverse()
+        parsed = ResultsParser().parse_compact(api_data).to_dict()
+        
+        assert [s['semester'] for s in parsed['semesterInfo']['semesters']] == [1, 2]
+    
+    def test_summary_copied(self, api_data):
+        """Test that analytics filling in summary totals does not touch the model"""
+        compact = ResultsParser().parse_compact(api_data)
+        compact.to_dict()['summary']['marks']['percentage'] = 71.29
+        
+        assert 'percentage' not in compact.summary_marks
@@ -0,0 +1,116 @@
+"""
+Unit tests for the not-found negative cache
+"""
+
+import time
+from unittest.mock import Mock, patch
+
+from backend.services.negative_cache import BloomFilter, NegativeCache
+from backend.services.periodic import PeriodicTask
+from backend.services.scraper import CampXScraper
+
+
+class TestBloomFilter:
+    
+    def test_added_items_are_members(self):
+        """Test that there are no false negatives"""
+        bloom = BloomFilter(capacity=1000, error_rate=0.001)
+        items = [f"TICKET{i:05d}" for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+        
+        assert all(item in bloom for item in items)
+    
+    def test_false_positive_rate_is_bounded(self):
+        """Test that the observed false positive rate is near the target"""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"TICKET{i:05d}")
+        
+        false_positives = sum(1 for i in range(10000) if f"OTHER{i:05d}" in bloom)
+        assert false_positives < 300
+
+
+class TestNegativeCache:
+    
+    def test_remembers_missing_keys(self):
+        """Test lookups for added and unknown keys"""
+        cache = NegativeCache(ttl=60, capacity=1000, error_rate=0.001)
+        cache.add('MISSING01:general')
+        
+        assert cache.contains('MISSING01:general')
+        assert not cache.contains('MISSING01:supplementary')
+        assert cache.stats()['hits'] == 1
+    
+    def test_entries_expire_after_ttl(self):
+        """Test that keys drop out once two windows have passed"""
+        cache = NegativeCache(ttl=2, capacity=1000, error_rate=0.001)
+        cache.add('MISSING01:general')
+        
+        with patch('backend.services.negative_cache.time.time', return_value=time.time() + 2.5):
+            assert not cache.contains('MISSING01:general')
+    
+    def test_persists_across_restarts(self, tmp_path):
+        """Test that a new instance loads the saved filter"""
+        path = str(tmp_path / 'not_found.bloom')
+        first = NegativeCache(path, ttl=600, capacity=1000, error_rate=0.001)
+        first.add('MISSING01:general')
+        first.save()
+        
+        assert NegativeCache(path, ttl=600, capacity=1000, error_rate=0.001).contains('MISSING01:general')
+    
+    def test_save_merges_other_workers(self, tmp_path):
+        """Test that saving keeps keys written to the file by another process"""
+        path = str(tmp_path / 'not_found.bloom')
+        worker_a = NegativeCache(path, ttl=600, capacity=1000, error_rate=0.001)
+        worker_b = NegativeCache(path, ttl=600, capacity=1000, error_rate=0.001)
+        worker_a.add('MISSING0A:general')
+        worker_a.save()
+        worker_b.add('MISSING0B:general')
+        worker_b.save()
+        
+        merged = NegativeCache(path, ttl=600, capacity=1000, error_rate=0.001)
+        assert merged.contains('MISSING0A:general')
+        assert merged.contains('MISSING0B:general')
+    
+    def test_add_does_not_write(self, tmp_path):
+        """Test that adding a key leaves persisting to the background saver"""
+        path = tmp_path / 'not_found.bloom'
+        cache = NegativeCache(str(path), ttl=600, capacity=1000, error_rate=0.001, save_interval=0)
+        cache.add('MISSING01:general')
+        assert not path.exists()
+        
+        saver = PeriodicTask(cache.save_if_dirty, 0.01, 'test-negative-cache-save').start()
+        try:
+            deadline = time.monotonic() + 5
+            while not path.exists() and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            saver.stop(5)
+        assert NegativeCache(str(path), ttl=600, capacity=1000, error_rate=0.001).contains('MISSING01:general')
+    
+    def test_mismatched_file_is_ignored(self, tmp_path):
+        """Test that a file built with other filter parameters is not loaded"""
+        path = str(tmp_path / 'not_found.bloom')
+        old = NegativeCache(path, ttl=600, capacity=1000, error_rate=0.001)
+        old.add('MISSING01:general')
+        old.save()
+        
+        assert not NegativeCache(path, ttl=600, capacity=5000, error_rate=0.001).contains('MISSING01:general')
+
+
+class TestScraperNegativeCache:
+    
+    @patch('backend.services.scraper.requests.Session.get')
+    def test_repeat_404_skips_upstream(self, mock_get):
+        """Test that a second lookup of a missing ticket makes no request"""
+        mock_response = Mock()
+        mock_response.status_code = 404
+        mock_get.return_value = mock_response
+        
+        scraper = CampXScraper()
+        scraper.negative_cache = NegativeCache(ttl=60, capacity=1000, error_rate=0.001)
+        
+        assert scraper.fetch_results('NOSUCH001') is None
+        assert scraper.fetch_results('NOSUCH001') is None
+        assert mock_get.call_count == 1
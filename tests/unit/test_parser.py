@@ -0,0 +1,148 @@
+"""
+Unit tests for ResultsParser (CampX API JSON)
+"""
+
+import copy
+import json
+import os
+
+import pytest
+from backend.services.content_hash import stable_hash
+from backend.services.parser import ResultsParser, exam_month_key
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'fixtures')
+
+
+@pytest.fixture
+def api_data():
+    with open(os.path.join(FIXTURES_DIR, 'mock_api_response.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def supplementary_response(api_data):
+    """Supplementary attempt that clears the semester 2 backlog"""
+    supply = copy.deepcopy(api_data)
+    sem2 = supply['results'][1]
+    sem2['subjectsResults'] = [sem2['subjectsResults'][0]]
+    grade = sem2['subjectsResults'][0]['consideredGrade']
+    grade.update({'grade': 'C', 'gradePoints': 5, 'passed': True, 'monthYear': 'Nov-2023'})
+    supply['results'] = [sem2]
+    supply['cgpa'] = None
+    return supply
+
+
+class TestParseApiResponse:
+    
+    def test_parse_structure(self, api_data):
+        """Test the parsed structure built from a CampX response"""
+        parsed = ResultsParser().parse_api_response(api_data)
+        
+        assert parsed['studentInfo']['hallTicket'] == 'XXENG001X01'
+        assert len(parsed['subjects']) == 7
+        assert [s['semester'] for s in parsed['semesterInfo']['semesters']] == [1, 2]
+        assert parsed['summary']['backlogs'] == {'due': 1}
+    
+    def test_empty_input(self):
+        """Test that empty input returns None"""
+        assert ResultsParser().parse_api_response(None) is None
+
+
+class TestMergeParsedResults:
+    
+    def test_latest_attempt_wins(self, api_data):
+        """Test that a later supplementary pass replaces the regular fail"""
+        parser = ResultsParser()
+        merged = parser.merge_parsed_results([
+            parser.parse_api_response(api_data),
+            parser.parse_api_response(supplementary_response(api_data))
+        ])
+        
+        sem2 = merged['semesterInfo']['semesters'][1]
+        maths = next(s for s in sem2['subjects'] if s['code'] == 'MA102')
+        assert maths['grade'] == 'C'
+        assert maths['examMonth'] == 'Nov-2023'
+        assert len(merged['subjects']) == 7
+        assert len(sem2['subjects']) == 3
+    
+    def test_duplicates_across_exam_types_collapse(self, api_data):
+        """Test that identical attempts from two exam types appear once"""
+        parser = ResultsParser()
+        merged = parser.merge_parsed_results([
+            parser.parse_api_response(api_data),
+            parser.parse_api_response(copy.deepcopy(api_data))
+        ])
+        
+        assert len(merged['subjects']) == 7
+        assert len(merged['semesterInfo']['semesters']) == 2
+    
+    def test_first_result_provides_summary_fields(self, api_data):
+        """Test that SGPA, CGPA and summary come from the first result that has them"""
+        parser = ResultsParser()
+        merged = parser.merge_parsed_results([
+            parser.parse_api_response(supplementary_response(api_data)),
+            parser.parse_api_response(api_data)
+        ])
+        
+        assert merged['semesterInfo']['cgpa'] == 7.9
+        assert merged['semesterInfo']['semesters'][0]['sgpa'] == 8.21
+        assert merged['summary']['credits'] == {'total': 20.5, 'obtained': 16.5}
+    
+    def test_single_and_empty_inputs(self, api_data):
+        """Test pass-through of a single result and None for no results"""
+        parser = ResultsParser()
+        parsed = parser.parse_api_response(api_data)
+        
+        assert parser.merge_parsed_results([parsed, None]) is parsed
+        assert parser.merge_parsed_results([None]) is None
+    
+    def test_exam_month_key(self):
+        """Test examMonth ordering keys"""
+        assert exam_month_key('Nov-2023') > exam_month_key('May-2023')
+        assert exam_month_key('05/2021') == (2021, 5)
+        assert exam_month_key(None) == (0, 0)
+
+
+class TestContentMemo:
+    
+    def test_stable_hash(self, api_data):
+        """Equal documents hash equally; any change to the data changes the hash"""
+        assert stable_hash(api_data) == stable_hash(json.loads(json.dumps(api_data)))
+        changed = copy.deepcopy(api_data)
+        changed['results'][0]['subjectsResults'][0]['consideredGrade']['grade'] = 'B'
+        assert stable_hash(changed) != stable_hash(api_data)
+        assert stable_hash({'a': 1}) != stable_hash({'a': 1.0})
+    
+    def test_memoized_parse_matches_and_is_reused(self, api_data):
+        parser = ResultsParser(memo_entries=4)
+        key, first = parser.parse_compact_keyed(api_data)
+        again_key, again = parser.parse_compact_keyed(json.loads(json.dumps(api_data)))
+        
+        assert key == again_key and again is first
+        assert first.to_dict() == ResultsParser().parse_api_response(api_data)
+        assert parser.memo_stats()['responses']['hits'] == 1
+    
+    def test_unchanged_semesters_are_reused(self, api_data):
+        parser = ResultsParser(memo_entries=4)
+        first = parser.parse_compact(api_data)
+        revalued = copy.deepcopy(api_data)
+        revalued['results'][1]['subjectsResults'][0]['consideredGrade'].update({'grade': 'C', 'passed': True})
+        second = parser.parse_compact(revalued)
+        
+        assert second is not first
+        assert second.semesters[0] is first.semesters[0]
+        assert second.semesters[1] is not first.semesters[1]
+        assert second.to_dict() == ResultsParser().parse_api_response(revalued)
+    
+    def test_memo_is_bounded(self, api_data):
+        parser = ResultsParser(memo_entries=2)
+        for i in range(5):
+            variant = copy.deepcopy(api_data)
+            variant['cgpa'] = i
+            parser.parse_compact(variant)
+        stats = parser.memo_stats()['responses']
+        assert stats['entries'] == 2 and stats['evictions'] == 3
+    
+    def test_no_memo_by_default(self, api_data):
+        parser = ResultsParser()
+        assert parser.parse_compact_keyed(api_data)[0] is None
+        assert parser.memo_stats() is None
@@ -0,0 +1,160 @@
+"""
+Unit tests for KLL quantile sketches
+"""
+
+import copy
+import json
+import os
+import random
+from bisect import bisect_right
+
+import pytest
+from backend.services.parser import ResultsParser
+from backend.services.quantile_sketch import KLLSketch, QuantileSketches, error_for_k, k_for_error
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'fixtures')
+
+
+def max_rank_error(sketch, values):
+    ordered = sorted(values)
+    probes = ordered[::max(1, len(ordered) // 200)]
+    return max(abs(sketch.rank(x) - bisect_right(ordered, x) / len(ordered)) for x in probes)
+
+
+class TestKLLSketch:
+    
+    def test_exact_while_small(self):
+        """Test that a sketch below k holds every value"""
+        sketch = KLLSketch(k=100, seed=1)
+        for x in range(50):
+            sketch.update(x)
+        
+        assert sketch.error_bound == 0.0
+        assert sketch.rank(24) == pytest.approx(0.5)
+        assert sketch.quantile(0.5) == 24
+    
+    def test_rank_error_within_bound(self):
+        """Test rank error on 50k values against exact ranks"""
+        rng = random.Random(11)
+        values = [rng.gauss(7, 1.2) for _ in range(50000)]
+        sketch = KLLSketch(k=200, seed=2)
+        for x in values:
+            sketch.update(x)
+        
+        assert sketch.count == 50000
+        assert sum(len(items) for items in sketch.compactors) < 1000
+        assert max_rank_error(sketch, values) <= error_for_k(200)
+    
+    def test_merge_and_round_trip(self):
+        """Test that merged, serialised sketches keep the bound"""
+        rng = random.Random(12)
+        left = [rng.uniform(0, 10) for _ in range(20000)]
+        right = [rng.uniform(5, 10) for _ in range(20000)]
+        a, b = KLLSketch(k=200, seed=3), KLLSketch(k=200, seed=4)
+        for x in left:
+            a.update(x)
+        for x in right:
+            b.update(x)
+        
+        merged = KLLSketch.from_dict(json.loads(json.dumps(a.to_dict())))
+        merged.merge(KLLSketch.from_dict(b.to_dict()))
+        
+        assert merged.count == 40000
+        assert max_rank_error(merged, left + right) <= error_for_k(200)
+    
+    def test_k_for_error(self):
+        assert error_for_k(k_for_error(0.01)) <= 0.01
+
+
+class TestQuantileSketches:
+    
+    @pytest.fixture
+    def parsed(self):
+        with open(os.path.join(FIXTURES_DIR, 'mock_api_response.json'), 'r', encoding='utf-8') as f:
+            return ResultsParser().parse_api_response(json.load(f))
+    
+    def cohort(self, parsed, count=10):
+        sketches = QuantileSketches(k=64)
+        for i in range(count):
+            data = copy.deepcopy(parsed)
+            data['studentInfo']['hallTicket'] = f"S{i}"
+            data['semesterInfo']['cgpa'] = 6 + i * 0.4
+            sketches.ingest(data)
+        return sketches
+    
+    def test_cgpa_percentile_by_cohort(self, parsed):
+        """Test university, batch and batch + program CGPA percentiles"""
+        sketches = self.cohort(parsed)
+        program = parsed['studentInfo']['program']
+        
+        assert sketches.percentile('cgpa', 7.9)['percentile'] == 50.0
+        assert sketches.percentile('cgpa', 7.9, '2022', program)['count'] == 10
+        assert sketches.percentile('cgpa', 7.9, '2021') is None
+    
+    def test_sgpa_and_marks(self, parsed):
+        """Test per-semester SGPA and per-subject marks sketches"""
+        sketches = self.cohort(parsed, count=3)
+        
+        assert sketches.quantile('sgpa', 0.5, '2022', detail=1)['value'] == 8.21
+        assert sketches.percentile('marks', 1000, '2022', detail='MA102')['percentile'] == 100.0
+    
+    def test_student_added_once(self, parsed):
+        """Test that a repeat ingest of the same student is ignored"""
+        sketches = QuantileSketches(k=64)
+        sketches.ingest(parsed)
+        sketches.ingest(parsed)
+        
+        assert sketches.percentile('cgpa', 10)['count'] == 1
+    
+    def test_save_load_merge(self, parsed, tmp_path):
+        """Test persistence and merging of disjoint registries"""
+        left = self.cohort(parsed, count=4)
+        path = str(tmp_path / 'quantiles.json')
+        left.save(path)
+        right = QuantileSketches(k=64)
+        extra = copy.deepcopy(parsed)
+        extra['studentInfo']['hallTicket'] = 'S99'
+        right.ingest(extra)
+        
+        right.merge(QuantileSketches.load(path))
+        
+        assert right.percentile('cgpa', 10)['count'] == 5
+        assert right.has_student('S2')
+    
+    def test_seen_students_take_fixed_memory(self, parsed):
+        """Test that remembering students does not grow with the cohort"""
+        sketches = QuantileSketches(k=64, student_capacity=1000)
+        filter_bytes = len(sketches._seen.bits)
+        for i in range(500):
+            data = copy.deepcopy(parsed)
+            data['studentInfo']['hallTicket'] = f"S{i}"
+            sketches.ingest(data)
+        
+        assert len(sketches._seen.bits) == filter_bytes
+        assert sketches.stats()['students'] == 500
+        assert sketches.percentile('cgpa', 10)['count'] >= 495
+    
+    def test_save_if_dirty(self, parsed, tmp_path):
+        """Test that only new ingests are written, and survive a reload"""
+        path = tmp_path / 'live' / 'quantiles.json'
+        sketches = QuantileSketches(k=64)
+        sketches.save_if_dirty(str(path))
+        assert not path.exists()
+        
+        sketches.ingest(parsed)
+        sketches.save_if_dirty(str(path))
+        reloaded = QuantileSketches.load(str(path))
+        
+        assert reloaded.has_student(parsed['studentInfo']['hallTicket'])
+        assert reloaded.stats()['students'] == 1
+    
+    def test_loads_student_lists(self, parsed):
+        """Test that files listing hall tickets (before the filter) still load"""
+        data = self.cohort(parsed, count=2).to_dict()
+        data['students'] = ['S0', 'S1']
+        del data['seen']
+        
+        registry = QuantileSketches.from_dict(data)
+        assert registry.has_student('S1')
+        assert registry.stats()['students'] == 2
+
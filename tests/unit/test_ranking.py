@@ -0,0 +1,90 @@
+"""
+Unit tests for the cohort ranking index
+"""
+
+import random
+
+import pytest
+from backend.services.ranking import FenwickTree, RankingIndex, ranking_cgpa
+
+
+class TestFenwickTree:
+    
+    def test_prefix_sums_match_brute_force(self):
+        """Test prefix sums against a plain list"""
+        rng = random.Random(7)
+        tree = FenwickTree(50)
+        counts = [0] * 50
+        for _ in range(500):
+            position, delta = rng.randrange(50), rng.choice([1, 1, -1])
+            tree.add(position, delta)
+            counts[position] += delta
+        
+        for position in range(-1, 50):
+            assert tree.prefix_sum(position) == sum(counts[:position + 1])
+        assert tree.total == sum(counts)
+
+
+class TestRankingIndex:
+    
+    @pytest.fixture
+    def index(self):
+        index = RankingIndex()
+        index.update('22A01', '2022', 'CSE', 9.1, 'Asha')
+        index.update('22A02', '2022', 'CSE', 8.4, 'Ben')
+        index.update('22A03', '2022', 'ECE', 8.4, 'Chen')
+        index.update('22A04', '2022', 'ECE', 7.0, 'Dev')
+        index.update('21A01', '2021', 'CSE', 9.9, 'Eli')
+        return index
+    
+    def test_rank_and_percentile(self, index):
+        """Test batch and program positions, with ties sharing a rank"""
+        ranks = index.rank('22a03')
+        
+        assert ranks['batch'] == {'name': '2022', 'rank': 2, 'outOf': 4, 'percentile': 75.0}
+        assert ranks['program'] == {'name': 'ECE', 'rank': 1, 'outOf': 2, 'percentile': 100.0}
+        assert index.rank('22A02')['batch']['rank'] == 2
+        assert index.rank('22A04')['batch']['rank'] == 4
+    
+    def test_update_moves_student(self, index):
+        """Test that a re-fetched CGPA replaces the old position"""
+        index.update('22A04', '2022', 'ECE', 9.5, 'Dev')
+        
+        assert index.rank('22A04')['batch']['rank'] == 1
+        assert index.rank('22A01')['batch']['rank'] == 2
+        assert index.rank('22A04')['batch']['outOf'] == 4
+        assert index.stats()['students'] == 5
+    
+    def test_program_change(self, index):
+        """Test that moving program leaves the old program cohort"""
+        index.update('22A02', '2022', 'ECE', 8.4, 'Ben')
+        
+        assert index.top('2022', 'CSE') == [{'hallTicket': '22A01', 'name': 'Asha', 'cgpa': 9.1, 'rank': 1}]
+        assert index.rank('22A02')['program']['outOf'] == 3
+    
+    def test_remove(self, index):
+        """Test that a missing CGPA removes the student"""
+        index.update('22A01', '2022', 'CSE', None)
+        
+        assert index.rank('22A01') is None
+        assert index.rank('22A02')['batch']['rank'] == 1
+    
+    def test_top_k(self, index):
+        """Test top-k order, tie ranks and the k limit"""
+        top = index.top('2022', k=3)
+        
+        assert [(s['hallTicket'], s['rank']) for s in top] == [('22A01', 1), ('22A02', 2), ('22A03', 2)]
+        assert index.top('2023') == []
+    
+    def test_unranked(self, index):
+        assert index.rank('missing') is None
+
+
+class TestRankingCgpa:
+    
+    def test_prefers_api_cgpa(self):
+        assert ranking_cgpa({'semesterInfo': {'cgpa': 7.9}, 'analytics': {'gpa': 7.5}}) == 7.9
+    
+    def test_falls_back_to_computed_gpa(self):
+        assert ranking_cgpa({'semesterInfo': {'cgpa': 0.0}, 'analytics': {'gpa': 7.5}}) == 7.5
+        assert ranking_cgpa({'semesterInfo': {}, 'analytics': {'gpa': None}}) is None
@@ -0,0 +1,98 @@
+"""
+Unit tests for AdaptiveRateLimiter
+"""
+
+import time
+from unittest.mock import Mock, patch
+
+from backend.services.rate_limiter import AdaptiveRateLimiter, parse_retry_after
+from backend.services.scraper import CampXScraper
+
+
+def make_limiter(**overrides):
+    settings = dict(initial_rate=10, min_rate=1, max_rate=20, increase=1, decrease=0.5, burst=2)
+    settings.update(overrides)
+    return AdaptiveRateLimiter(**settings)
+
+
+class TestAdaptiveRateLimiter:
+    
+    def test_burst_is_granted_immediately(self):
+        """Test that a full bucket grants `burst` requests without waiting"""
+        limiter = make_limiter(burst=3)
+        start = time.monotonic()
+        assert all(limiter.acquire('tenant') for _ in range(3))
+        assert time.monotonic() - start < 0.05
+    
+    def test_acquire_respects_timeout(self):
+        """Test that acquire refuses when the wait would exceed the timeout"""
+        limiter = make_limiter(initial_rate=1, burst=1)
+        assert limiter.acquire('tenant', timeout=0)
+        assert limiter.acquire('tenant', timeout=0.1) is False
+    
+    def test_additive_increase_on_success(self):
+        """Test that healthy responses grow the rate up to the max"""
+        limiter = make_limiter()
+        limiter.on_success('tenant')
+        assert limiter.get_rate('tenant') == 10.1
+        for _ in range(1000):
+            limiter.on_success('tenant')
+        assert limiter.get_rate('tenant') == 20
+    
+    def test_multiplicative_decrease_once_per_cooldown(self):
+        """Test that a burst of throttles halves the rate only once"""
+        limiter = make_limiter()
+        limiter.on_throttle('tenant')
+        limiter.on_throttle('tenant')
+        assert limiter.get_rate('tenant') == 5
+        assert limiter.stats()['tenant']['throttled'] == 2
+    
+    def test_rate_never_drops_below_min(self):
+        """Test the minimum rate floor"""
+        limiter = make_limiter(cooldown=0)
+        for _ in range(10):
+            limiter.on_throttle('tenant')
+        assert limiter.get_rate('tenant') == 1
+    
+    def test_retry_after_pauses_bucket(self):
+        """Test that Retry-After blocks new requests until the deadline"""
+        limiter = make_limiter()
+        limiter.on_throttle('tenant', retry_after=5)
+        assert limiter.acquire('tenant', timeout=1) is False
+    
+    def test_tenants_are_independent(self):
+        """Test that throttling one tenant does not affect another"""
+        limiter = make_limiter()
+        limiter.on_throttle('tenant-a')
+        assert limiter.get_rate('tenant-a') == 5
+        assert limiter.get_rate('tenant-b') == 10
+    
+    def test_parse_retry_after(self):
+        """Test Retry-After parsing for seconds, dates and junk"""
+        assert parse_retry_after('3') == 3.0
+        assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+        assert parse_retry_after('soon') is None
+        assert parse_retry_after(None) is None
+
+
+class TestScraperRateLimiting:
+    
+    def test_scrapers_share_one_limiter(self):
+        """Test that every scraper in the process uses the same limiter"""
+        assert CampXScraper().rate_limiter is CampXScraper().rate_limiter
+    
+    @patch('backend.services.scraper.requests.Session.get')
+    def test_429_triggers_backoff(self, mock_get):
+        """Test that a 429 with Retry-After is reported to the limiter"""
+        mock_response = Mock()
+        mock_response.status_code = 429
+        mock_response.headers = {'Retry-After': '2'}
+        mock_get.return_value = mock_response
+        
+        scraper = CampXScraper()
+        scraper.rate_limiter = Mock()
+        scraper.rate_limiter.acquire.return_value = True
+        
+        assert scraper.fetch_results('12345') is None
+        scraper.rate_limiter.on_throttle.assert_called_once_with(scraper.tenant_key, 2.0)
+        scraper.rate_limiter.on_success.assert_not_called()
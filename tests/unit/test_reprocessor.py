@@ -0,0 +1,107 @@
+"""
+Unit tests for the parallel archive reprocessor
+"""
+
+import glob
+import json
+import os
+
+import pytest
+from backend.services.reprocessor import ArchiveReprocessor
+from backend.services.response_archive import ResponseArchive
+from tests.benchmarks.mock_campx_server import synthesize_response
+
+
+@pytest.fixture
+def archive_dir(tmp_path):
+    archive = ResponseArchive(str(tmp_path / 'archive'))
+    for i in range(7):
+        ticket = f"22ENG{i:04d}"
+        archive.record(ticket, 'general', synthesize_response(ticket, semesters=2), fetched_at='2024-01-01T00:00:00+00:00')
+    # A newer fetch for one ticket, plus an unparseable response
+    archive.record('22ENG0000', 'general', synthesize_response('22ENG0000', semesters=3), fetched_at='2024-06-01T00:00:00+00:00')
+    archive.record('22ENG9999', 'general', {}, fetched_at='2024-01-01T00:00:00+00:00')
+    return str(tmp_path / 'archive')
+
+
+def read_output(output_dir):
+    records = []
+    for path in sorted(glob.glob(os.path.join(output_dir, 'chunk-*.jsonl'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+    return records
+
+
+class TestArchiveReprocessor:
+    
+    def test_processes_latest_fetch_per_ticket(self, archive_dir, tmp_path):
+        """Test that every ticket's newest response is parsed and analysed"""
+        output_dir = str(tmp_path / 'out')
+        stats = ArchiveReprocessor(archive_dir, output_dir, chunk_size=3, workers=2).run()
+        records = read_output(output_dir)
+        
+        assert stats['chunks'] == 3
+        assert stats['records'] == 8
+        assert stats['errors'] == 1
+        latest = next(r for r in records if r['hallTicket'] == '22ENG0000')
+        assert len(latest['results']['semesterInfo']['semesters']) == 3
+        assert 'gpa' in latest['results']['analytics']
+    
+    def test_resume_skips_completed_chunks(self, archive_dir, tmp_path):
+        """Test that a rerun only processes chunks missing from the output"""
+        output_dir = str(tmp_path / 'out')
+        ArchiveReprocessor(archive_dir, output_dir, chunk_size=3, workers=2).run()
+        os.remove(os.path.join(output_dir, 'chunk-00001.jsonl'))
+        
+        stats = ArchiveReprocessor(archive_dir, output_dir, chunk_size=3, workers=2).run()
+        
+        assert stats['resumedChunks'] == 2
+        assert stats['processedChunks'] == 1
+        assert len(read_output(output_dir)) == 8
+    
+    def test_resume_with_different_plan_is_refused(self, archive_dir, tmp_path):
+        """Test that changing the chunk size cannot mix two runs"""
+        output_dir = str(tmp_path / 'out')
+        ArchiveReprocessor(archive_dir, output_dir, chunk_size=3, workers=1).run()
+        
+        with pytest.raises(ValueError):
+            ArchiveReprocessor(archive_dir, output_dir, chunk_size=4, workers=1).run()
+    
+    def test_subject_stats_merged_across_chunks(self, archive_dir, tmp_path):
+        """Test that per-chunk subject statistics add up to one result per ticket"""
+        output_dir = str(tmp_path / 'out')
+        ArchiveReprocessor(archive_dir, output_dir, chunk_size=3, workers=2).run()
+        
+        with open(os.path.join(output_dir, 'subject_stats.json'), 'r', encoding='utf-8') as f:
+            merged = json.load(f)
+        assert merged['ingested'] == 7
+        records = [r for r in read_output(output_dir) if 'results' in r]
+        attempts = sum(len(r['results']['subjects']) for r in records)
+        assert sum(item['attempts'] for item in merged['subjects']) == attempts
+    
+    def test_all_fetches_mode(self, archive_dir, tmp_path):
+        """Test that every archived fetch can be reprocessed"""
+        stats = ArchiveReprocessor(archive_dir, str(tmp_path / 'out'), chunk_size=5, workers=1, latest_only=False).run()
+        assert stats['records'] == 9
+    
+    def test_cohort_stats_count_each_student_once(self, archive_dir, tmp_path):
+        """Test that repeat fetches and other exam types leave the cohort statistics unchanged"""
+        ResponseArchive(archive_dir).record('22ENG0001', 'supplementary', synthesize_response('22ENG0001', 'supplementary'),
+                                            fetched_at='2024-07-01T00:00:00+00:00')
+        merged = {}
+        for latest_only in (True, False):
+            output_dir = str(tmp_path / f'out-{latest_only}')
+            ArchiveReprocessor(archive_dir, output_dir, chunk_size=2, workers=1, latest_only=latest_only).run()
+            with open(os.path.join(output_dir, 'subject_stats.json'), 'r', encoding='utf-8') as f:
+                merged[latest_only] = json.load(f)
+        
+        assert merged[True]['ingested'] == merged[False]['ingested'] == 7
+        # Chunks merge in a different order, so marks moments only agree to rounding
+        subjects = {
+            latest_only: sorted(
+                ({**item, 'marks': [round(v, 6) for v in item['marks']]} for item in run['subjects']),
+                key=lambda item: (item['batch'], item['code'])
+            )
+            for latest_only, run in merged.items()
+        }
+        assert subjects[True] == subjects[False]
@@ -0,0 +1,86 @@
+"""
+Unit tests for the result diff engine
+"""
+
+import copy
+import json
+import os
+
+import pytest
+from backend.services.parser import ResultsParser
+from backend.services.result_diff import diff_results, result_version
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'fixtures')
+
+
+@pytest.fixture
+def api_data():
+    with open(os.path.join(FIXTURES_DIR, 'mock_api_response.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def parse(api_data):
+    return ResultsParser().parse_api_response(api_data)
+
+
+class TestDiffResults:
+    
+    def test_identical_results(self, api_data):
+        diff = diff_results(parse(api_data), parse(api_data))
+        
+        assert diff['changed'] is False
+        assert diff['subjects'] == {'added': [], 'removed': [], 'changed': []}
+        assert diff['clearedBacklogs'] == [] and diff['sgpa'] == [] and diff['cgpa'] is None
+    
+    def test_revaluation(self, api_data):
+        """Test a grade change on the same attempt with SGPA / CGPA deltas"""
+        old = parse(api_data)
+        grade = api_data['results'][1]['subjectsResults'][0]['consideredGrade']
+        grade.update({'grade': 'C', 'gradePoints': 5, 'passed': True})
+        api_data['results'][1]['sgpa'] = 7.1
+        api_data['cgpa'] = 7.5
+        
+        diff = diff_results(old, parse(api_data))
+        
+        assert diff['changed'] is True
+        [changed] = diff['subjects']['changed']
+        assert changed['code'] == 'MA102'
+        assert changed['changes']['grade'] == {'from': 'F', 'to': 'C'}
+        assert changed['changes']['passed'] == {'from': False, 'to': True}
+        assert [s['code'] for s in diff['clearedBacklogs']] == ['MA102']
+        old_sgpa = old['semesterInfo']['semesters'][1]['sgpa']
+        assert diff['sgpa'] == [{'semester': 2, 'from': old_sgpa, 'to': 7.1, 'delta': round(7.1 - old_sgpa, 2)}]
+        assert diff['cgpa']['to'] == 7.5 and diff['cgpa']['delta'] == round(7.5 - old['semesterInfo']['cgpa'], 2)
+    
+    def test_supplementary_attempt(self, api_data):
+        """Test a new exam month replacing the failed attempt"""
+        old = parse(api_data)
+        grade = api_data['results'][1]['subjectsResults'][0]['consideredGrade']
+        grade.update({'grade': 'C', 'gradePoints': 5, 'passed': True, 'monthYear': 'Nov-2023'})
+        
+        diff = diff_results(old, parse(api_data))
+        
+        assert [(s['code'], s['examMonth']) for s in diff['subjects']['added']] == [('MA102', 'Nov-2023')]
+        assert [(s['code'], s['examMonth']) for s in diff['subjects']['removed']] == [('MA102', 'May-2023')]
+        assert diff['subjects']['changed'] == []
+        assert [s['examMonth'] for s in diff['clearedBacklogs']] == ['Nov-2023']
+    
+    def test_new_backlog(self, api_data):
+        old = parse(api_data)
+        grade = api_data['results'][0]['subjectsResults'][0]['consideredGrade']
+        grade.update({'grade': 'F', 'gradePoints': 0, 'passed': False})
+        
+        diff = diff_results(old, parse(api_data))
+        
+        assert [s['code'] for s in diff['newBacklogs']] == [api_data['results'][0]['subjectsResults'][0]['subject']['subjectCode']]
+        assert diff['clearedBacklogs'] == []
+
+
+class TestResultVersion:
+    
+    def test_version_tracks_content(self, api_data):
+        version = result_version(parse(api_data))
+        assert version == result_version(parse(copy.deepcopy(api_data)))
+        
+        api_data['results'][0]['subjectsResults'][0]['subject']['total'] = 1
+        assert result_version(parse(api_data)) != version
@@ -0,0 +1,145 @@
+"""
+Unit tests for the two-tier results cache
+"""
+
+import time
+
+from backend.services.results_cache import LRUCache, SQLiteResultStore, ResultsCache
+
+
+class TestLRUCache:
+    
+    def test_evicts_least_recently_used(self):
+        """Test that the oldest untouched entry is evicted first"""
+        cache = LRUCache(max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        
+        assert cache.get('a') == 1
+        assert cache.get('b') is None
+        assert cache.stats()['evictions'] == 1
+    
+    def test_entries_expire(self):
+        """Test per-entry TTL"""
+        cache = LRUCache(max_entries=10)
+        cache.set('short', 1, ttl=0.01)
+        cache.set('long', 2, ttl=60)
+        time.sleep(0.02)
+        
+        assert cache.get('short') is None
+        assert cache.get('long') == 2
+        assert cache.stats()['expirations'] == 1
+    
+    def test_hit_miss_counters(self):
+        """Test hit and miss statistics"""
+        cache = LRUCache(max_entries=10)
+        cache.set('a', 1)
+        cache.get('a')
+        cache.get('missing')
+        
+        stats = cache.stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+    
+    def test_byte_bound(self):
+        """Test that entries are evicted once their total size passes max_bytes"""
+        cache = LRUCache(max_entries=10, max_bytes=100)
+        cache.set('a', 1, size=40)
+        cache.set('b', 2, size=40)
+        cache.set('a', 3, size=30)
+        cache.set('c', 4, size=50)
+        cache.set('huge', 5, size=101)
+        
+        assert cache.get('b') is None
+        assert cache.get('a') == 3
+        assert cache.get('c') == 4
+        assert cache.get('huge') is None
+        assert cache.stats()['bytes'] == 80
+
+
+class TestSQLiteResultStore:
+    
+    def test_round_trip(self, tmp_path):
+        """Test storing and reading back a JSON value"""
+        store = SQLiteResultStore(str(tmp_path / 'results.db'), max_bytes=10_000)
+        store.set('key', {'gpa': 8.5}, ttl=60)
+        
+        value, expires_at = store.get('key')
+        assert value == {'gpa': 8.5}
+        assert expires_at > time.time()
+    
+    def test_expired_entries_are_misses(self, tmp_path):
+        """Test that expired entries are not served"""
+        store = SQLiteResultStore(str(tmp_path / 'results.db'), max_bytes=10_000)
+        store.set('key', {'gpa': 8.5}, ttl=0)
+        
+        assert store.get('key') is None
+        assert store.stats()['expirations'] == 1
+    
+    def test_reads_do_not_write(self, tmp_path):
+        """Test that hits write nothing; their read times go out with the next write"""
+        store = SQLiteResultStore(str(tmp_path / 'results.db'), max_bytes=10_000)
+        store.set('key', {'gpa': 8.5}, ttl=60)
+        conn = store._conn()
+        changes = conn.total_changes
+        
+        for _ in range(5):
+            assert store.get('key') is not None
+        assert conn.total_changes == changes
+        
+        store.set('other', {'gpa': 7.0}, ttl=60)
+        assert conn.total_changes == changes + 2
+    
+    def test_size_based_eviction(self, tmp_path):
+        """Test that least recently read entries are evicted past max_bytes"""
+        store = SQLiteResultStore(str(tmp_path / 'results.db'), max_bytes=250)
+        for i in range(5):
+            store.set(f'key{i}', {'payload': 'x' * 80}, ttl=60)
+            time.sleep(0.001)
+        store.get('key0')
+        store.evict()
+        
+        stats = store.stats()
+        assert stats['bytes'] <= 250
+        assert stats['evictions'] > 0
+        assert store.get('key0') is not None
+        assert store.get('key1') is None
+    
+    def test_shared_between_instances(self, tmp_path):
+        """Test that a second store on the same file (another worker) sees writes"""
+        path = str(tmp_path / 'results.db')
+        SQLiteResultStore(path, max_bytes=10_000).set('key', [1, 2, 3], ttl=60)
+        
+        assert SQLiteResultStore(path, max_bytes=10_000).get('key')[0] == [1, 2, 3]
+
+
+class TestResultsCache:
+    
+    def test_disk_hit_is_promoted_to_memory(self, tmp_path):
+        """Test that a disk hit fills the memory tier"""
+        ResultsCache(cache_dir=str(tmp_path), ttl=60).set('key', {'gpa': 9.1})
+        cache = ResultsCache(cache_dir=str(tmp_path), ttl=60)
+        
+        assert cache.get('key') == {'gpa': 9.1}
+        assert cache.get('key') == {'gpa': 9.1}
+        stats = cache.stats()
+        assert stats['disk']['hits'] == 1
+        assert stats['memory']['hits'] == 1
+        assert stats['memory']['bytes'] == len('{"gpa":9.1}')
+    
+    def test_expired_entry_served_as_stale(self, tmp_path):
+        """Test that expired entries stay available through get_stale"""
+        cache = ResultsCache(cache_dir=str(tmp_path), ttl=0, stale_ttl=60)
+        cache.set('key', {'gpa': 9.1})
+        
+        assert cache.get('key') is None
+        assert cache.get_stale('key') == {'gpa': 9.1}
+    
+    def test_miss(self, tmp_path):
+        """Test that unknown keys miss both tiers"""
+        cache = ResultsCache(cache_dir=str(tmp_path), ttl=60)
+        
+        assert cache.get('missing') is None
+        assert cache.stats()['disk']['misses'] == 1
@@ -0,0 +1,197 @@
+"""
+Unit tests for the persistent results store
+"""
+
+import copy
+import json
+import os
+import sqlite3
+
+import pytest
+from backend.services.analytics import AnalyticsEngine
+from backend.services.parser import ResultsParser
+from backend.services.ranking import RankingIndex
+from backend.services.result_diff import result_version
+from backend.services.results_store import ResultsStore
+from tests.benchmarks.mock_campx_server import synthesize_response
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'fixtures')
+
+
+@pytest.fixture
+def api_data():
+    with open(os.path.join(FIXTURES_DIR, 'mock_api_response.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def processed(api_data):
+    """Response as run_pipeline builds it"""
+    results_data = ResultsParser().parse_api_response(api_data)
+    analytics = AnalyticsEngine().calculate_analytics(results_data)
+    return {**results_data, 'analytics': analytics, 'version': result_version(results_data)}
+
+
+class TestResultsStore:
+    
+    def test_round_trip(self, tmp_path, api_data):
+        """Test that a stored result reads back as normalised rows"""
+        store = ResultsStore(str(tmp_path / 'store.db'))
+        response = processed(api_data)
+        assert store.upsert(response)
+        
+        student = store.get_student('xxeng001x01')
+        assert student['hallTicket'] == 'XXENG001X01'
+        assert student['batch'] == response['studentInfo']['batch']
+        assert student['version'] == response['version']
+        assert [s['semester'] for s in student['semesters']] == [1, 2]
+        assert [s['code'] for s in student['subjects']] == [s['code'] for s in response['subjects']]
+        failed = [s['code'] for s in student['subjects'] if not s['status']['passed']]
+        assert failed == ['MA102']
+    
+    def test_same_version_is_not_rewritten(self, tmp_path, api_data):
+        store = ResultsStore(str(tmp_path / 'store.db'))
+        assert store.upsert(processed(api_data))
+        assert not store.upsert(processed(api_data))
+        assert store.stats() == {'students': 1, 'subjectResults': 7, 'cohorts': 4, 'writes': 1, 'unchanged': 1}
+    
+    def test_refresh_replaces_rows(self, tmp_path, api_data):
+        """Test that a changed result replaces the student's subject rows"""
+        store = ResultsStore(str(tmp_path / 'store.db'))
+        store.upsert(processed(api_data))
+        api_data['results'][1]['subjectsResults'][0]['consideredGrade'].update({'grade': 'C', 'passed': True})
+        assert store.upsert(processed(api_data))
+        
+        assert store.stats()['subjectResults'] == 7
+        assert store.subject_results('MA102', grade='F') == []
+        assert [r['grade'] for r in store.subject_results('MA102')] == ['C']
+    
+    def test_cohort_query(self, tmp_path):
+        """Test every F in one subject for one batch"""
+        store = ResultsStore(str(tmp_path / 'store.db'))
+        for i in range(40):
+            store.upsert(processed(synthesize_response(f"22XX1A{i:04d}", 'general', 4)))
+        store.upsert(processed(synthesize_response('21XX1A0001', 'general', 4)))
+        
+        code = store.get_student('22XX1A0000')['subjects'][0]['code']
+        failed = store.subject_results(code, batch='2022', grade='F', limit=1000)
+        everyone = store.subject_results(code, batch='2022', limit=1000)
+        
+        takers = [f"22XX1A{i:04d}" for i in range(40)
+                  if code in {s['code'] for s in store.get_student(f"22XX1A{i:04d}")['subjects']}]
+        assert sorted({r['hallTicket'] for r in everyone}) == takers
+        assert [r['hallTicket'] for r in failed] == [r['hallTicket'] for r in everyone if r['grade'] == 'F']
+        assert all(r['batch'] == '2022' for r in everyone)
+    
+    def test_cohort_query_uses_indexes(self, tmp_path):
+        store = ResultsStore(str(tmp_path / 'store.db'))
+        conn = sqlite3.connect(store.db_path)
+        plan = ' '.join(row[-1] for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM subject_results r JOIN students s ON s.hall_ticket = r.hall_ticket "
+            "WHERE r.code = 'CS101' AND r.grade = 'F' AND s.batch = '2022'"))
+        assert 'idx_subject_results_code_grade' in plan
+        assert 'SCAN' not in plan
+    
+    def test_seed_ranking(self, tmp_path, api_data):
+        store = ResultsStore(str(tmp_path / 'store.db'))
+        store.upsert(processed(api_data))
+        other = copy.deepcopy(api_data)
+        other['student']['rollNo'] = 'XXENG001X02'
+        other['cgpa'] = 9.1
+        store.upsert(processed(other))
+        
+        index = RankingIndex()
+        assert store.seed_ranking(index) == 2
+        assert index.rank('XXENG001X02')['batch']['rank'] == 1
+
+
+def cohort_state(store):
+    conn = sqlite3.connect(store.db_path)
+    state = {}
+    for table in ('cohort_stats', 'cohort_cgpa_buckets', 'subject_difficulty'):
+        state[table] = sorted(
+            tuple(round(v, 6) if isinstance(v, float) else v for v in row)
+            for row in conn.execute(f"SELECT * FROM {table}")
+        )
+    return state
+
+
+class TestCohortAggregates:
+    
+    @pytest.fixture
+    def cohort(self):
+        return [processed(synthesize_response(f"{year}XX1A{i:04d}", 'general', 4))
+                for year in (21, 22) for i in range(30)]
+    
+    def test_summary_matches_stored_students(self, tmp_path, cohort):
+        """Test the materialized summary against a recount over the students"""
+        store = ResultsStore(str(tmp_path / 'store.db'))
+        for response in cohort:
+            store.upsert(response)
+        
+        members = [r for r in cohort if r['studentInfo']['batch'] == '2022']
+        cgpas = [store.get_student(r['studentInfo']['hallTicket'])['cgpa'] for r in members]
+        all_clear = sum(1 for r in members if r['analytics']['passFailStatus']['failed'] == 0)
+        summary = store.cohort_summary('2022')
+        
+        assert summary['students'] == 30
+        assert summary['allClear'] == all_clear
+        assert summary['passRate'] == round(all_clear / 30, 4)
+        assert summary['backlogs'] == sum(r['analytics']['passFailStatus']['failed'] for r in members)
+        assert summary['cgpa']['mean'] == round(sum(cgpas) / len(cgpas), 2)
+        assert sum(b['students'] for b in summary['cgpa']['distribution']) == 30
+        assert store.cohort_summary()['students'] == 60
+        assert store.cohort_summary('1999') is None
+    
+    def test_refresh_updates_aggregates_incrementally(self, tmp_path, cohort, api_data):
+        """Test that replacing results leaves the same aggregates as a rebuild"""
+        store = ResultsStore(str(tmp_path / 'store.db'))
+        for response in cohort:
+            store.upsert(response)
+        store.upsert(processed(api_data))
+        # Refresh: clear the backlog, then move a student to another program
+        api_data['results'][1]['subjectsResults'][0]['consideredGrade'].update({'grade': 'C', 'passed': True})
+        api_data['summary']['subjectDue']['due'] = 0
+        store.upsert(processed(api_data))
+        moved = copy.deepcopy(cohort[0])
+        moved['studentInfo']['program'] = 'B TECH in CIVIL ENGINEERING'
+        moved['version'] = 'moved'
+        store.upsert(moved)
+        
+        incremental = cohort_state(store)
+        store.rebuild_aggregates()
+        assert cohort_state(store) == incremental
+        assert store.cohort_summary(program='B TECH in CIVIL ENGINEERING')['students'] >= 1
+    
+    def test_subject_difficulty_order(self, tmp_path, cohort):
+        store = ResultsStore(str(tmp_path / 'store.db'))
+        for response in cohort:
+            store.upsert(response)
+        
+        hardest = store.subject_difficulty('2022', limit=1000)
+        rates = [s['failRate'] for s in hardest]
+        assert rates == sorted(rates, reverse=True)
+        assert [s['rank'] for s in hardest] == list(range(1, len(hardest) + 1))
+        
+        top = hardest[0]
+        attempts = store.subject_results(top['code'], batch='2022', limit=1000)
+        assert top['attempts'] == len(attempts)
+        assert top['failed'] == sum(1 for a in attempts if not a['status']['passed'])
+        assert store.subject_difficulty('2022', limit=1000, easiest=True)[0]['failRate'] == rates[-1]
+    
+    def test_store_without_aggregates_is_rebuilt(self, tmp_path, api_data):
+        """Test opening a store written before the aggregate tables existed"""
+        path = str(tmp_path / 'store.db')
+        store = ResultsStore(path)
+        store.upsert(processed(api_data))
+        expected = cohort_state(store)
+        
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE students_old AS SELECT hall_ticket, name, batch, program, cgpa, version, "
+                     "exam_types, updated_at FROM students")
+        conn.execute("DROP TABLE students")
+        conn.execute("ALTER TABLE students_old RENAME TO students")
+        for table in ('cohort_stats', 'cohort_cgpa_buckets', 'subject_difficulty'):
+            conn.execute(f"DROP TABLE {table}")
+        conn.commit()
+        
+        assert cohort_state(ResultsStore(path)) == expected
@@ -5,6 +5,7 @@ Unit tests for CampXScraper (API method)
 import pytest
 from unittest.mock import Mock, patch
 from backend.services.scraper import CampXScraper
+from backend.core.config import Config
 
 
 class TestCampXScraper:
@@ -17,7 +18,7 @@ class TestCampXScraper:
         assert 'x-institution-code' in scraper.headers
         assert 'x-tenant-id' in scraper.headers
     
-    @patch('backend.services.scraper.requests.get')
+    @patch('backend.services.scraper.requests.Session.get')
     def test_fetch_results_success(self, mock_get):
         """Test successful result fetching"""
         # Mock API response
@@ -36,7 +37,7 @@ class TestCampXScraper:
         assert 'student' in result
         assert result['student']['rollNo'] == '12345'
     
-    @patch('backend.services.scraper.requests.get')
+    @patch('backend.services.scraper.requests.Session.get')
     def test_fetch_results_not_found(self, mock_get):
         """Test fetching results with invalid hall ticket"""
         mock_response = Mock()
@@ -48,7 +49,7 @@ class TestCampXScraper:
         
         assert result is None
     
-    @patch('backend.services.scraper.requests.get')
+    @patch('backend.services.scraper.requests.Session.get')
     def test_fetch_results_network_error(self, mock_get):
         """Test handling of network errors"""
         mock_get.side_effect = Exception("Network error")
@@ -73,3 +74,39 @@ class TestCampXScraper:
         
         for header in required_headers:
             assert header in scraper.headers
+
+    def test_session_is_shared_across_instances(self):
+        """Test that all scrapers reuse one pooled session"""
+        first = CampXScraper()
+        second = CampXScraper()
+        
+        assert first.get_session() is second.get_session()
+        adapter = first.get_session().get_adapter('https://example.com')
+        assert adapter._pool_maxsize == Config.CAMPX_POOL_SIZE
+    
+    def test_close_session_recreates_pool(self):
+        """Test that closing the shared session builds a fresh one on next use"""
+        old_session = CampXScraper.get_session()
+        CampXScraper.close_session()
+        
+        assert CampXScraper.get_session() is not old_session
+    
+    def test_fetch_results_multi_runs_concurrently(self):
+        """Test that several exam types are fetched in parallel and keyed by type"""
+        import time
+        
+        scraper = CampXScraper()
+        
+        def slow_fetch(hall_ticket, exam_type, view_type):
+            time.sleep(0.1)
+            return None if exam_type == 'honors' else {'examType': exam_type}
+        
+        with patch.object(scraper, 'fetch_results', side_effect=slow_fetch):
+            start = time.monotonic()
+            results = scraper.fetch_results_multi('12345', ['General', 'supplementary', 'honors', 'general'])
+            elapsed = time.monotonic() - start
+        
+        assert list(results) == ['general', 'supplementary', 'honors']
+        assert results['supplementary'] == {'examType': 'supplementary'}
+        assert results['honors'] is None
+        assert elapsed < 0.25
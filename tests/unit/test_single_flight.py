@@ -0,0 +1,82 @@
+"""
+Unit tests for SingleFlight request coalescing
+"""
+
+import threading
+import time
+
+import pytest
+from backend.services.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    
+    def test_sequential_calls_each_execute(self):
+        """Test that calls that do not overlap are not coalesced"""
+        flight = SingleFlight()
+        assert flight.do('key', lambda: 1) == (1, False)
+        assert flight.do('key', lambda: 2) == (2, False)
+        assert flight.stats()['executed'] == 2
+        assert flight.stats()['coalesced'] == 0
+    
+    def test_concurrent_calls_share_one_execution(self):
+        """Test that concurrent callers with the same key share the leader's result"""
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+        results = []
+        
+        def work():
+            calls.append(1)
+            release.wait(2)
+            return {'value': 42}
+        
+        threads = [threading.Thread(target=lambda: results.append(flight.do('key', work))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        while flight.stats()['coalesced'] < 4:
+            time.sleep(0.001)
+        assert flight.in_flight('key')
+        release.set()
+        for thread in threads:
+            thread.join()
+        
+        assert len(calls) == 1
+        assert sum(1 for _, shared in results if shared) == 4
+        assert all(result is results[0][0] for result, _ in results)
+        assert not flight.in_flight('key')
+    
+    def test_different_keys_do_not_coalesce(self):
+        """Test that distinct keys run independently"""
+        flight = SingleFlight()
+        assert flight.do(('A', 'general'), lambda: 'a')[0] == 'a'
+        assert flight.do(('B', 'general'), lambda: 'b')[0] == 'b'
+    
+    def test_exception_propagates_to_waiters(self):
+        """Test that the leader's exception is raised for every waiter"""
+        flight = SingleFlight()
+        release = threading.Event()
+        errors = []
+        
+        def fail():
+            release.wait(2)
+            raise ValueError("upstream down")
+        
+        def call():
+            try:
+                flight.do('key', fail)
+            except ValueError as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=call) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        while flight.stats()['coalesced'] < 2:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+        
+        assert len(errors) == 3
+        with pytest.raises(KeyError):
+            flight.do('key', lambda: {}['missing'])
@@ -0,0 +1,128 @@
+"""
+Unit tests for streaming per-subject statistics
+"""
+
+import copy
+import json
+import os
+import random
+import statistics
+
+import pytest
+from backend.services.parser import ResultsParser
+from backend.services.subject_stats import RunningMoments, SubjectStatsAggregator, marks_value
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'fixtures')
+
+
+@pytest.fixture
+def parsed():
+    with open(os.path.join(FIXTURES_DIR, 'mock_api_response.json'), 'r', encoding='utf-8') as f:
+        return ResultsParser().parse_api_response(json.load(f))
+
+
+def student(parsed, hall_ticket, marks_offset=0, grade=None):
+    """Copy of the fixture student with shifted marks"""
+    data = copy.deepcopy(parsed)
+    data['studentInfo']['hallTicket'] = hall_ticket
+    for sub in data['subjects']:
+        if sub['marks'] is not None:
+            sub['marks'] = str(int(float(sub['marks'])) + marks_offset)
+        if grade:
+            sub['grade'] = grade
+    return data
+
+
+class TestRunningMoments:
+    
+    def test_matches_batch_statistics(self):
+        """Test mean / population std dev against the statistics module"""
+        values = [random.Random(3).uniform(0, 100) for _ in range(200)]
+        moments = RunningMoments()
+        for x in values:
+            moments.add(x)
+        
+        assert moments.mean == pytest.approx(statistics.fmean(values))
+        assert moments.std_dev == pytest.approx(statistics.pstdev(values))
+    
+    def test_remove_and_merge(self):
+        """Test that removal undoes add and merge equals a single stream"""
+        rng = random.Random(5)
+        left, right = [rng.gauss(60, 10) for _ in range(50)], [rng.gauss(70, 5) for _ in range(30)]
+        a, b, both = RunningMoments(), RunningMoments(), RunningMoments()
+        for x in left:
+            a.add(x)
+            both.add(x)
+        for x in right:
+            b.add(x)
+            both.add(x)
+        a.merge(b)
+        
+        assert (a.count, a.mean, a.m2) == pytest.approx((both.count, both.mean, both.m2))
+        for x in right:
+            a.remove(x)
+        assert a.mean == pytest.approx(statistics.fmean(left))
+        assert a.std_dev == pytest.approx(statistics.pstdev(left))
+
+
+class TestSubjectStatsAggregator:
+    
+    def test_marks_value(self):
+        """Test that marks which are not plain numbers read as missing"""
+        assert marks_value('78') == 78.0
+        assert marks_value('78.5') == 78.5
+        assert marks_value(None) is None
+        assert marks_value('AB') is None
+        assert marks_value('1.2.3') is None
+        assert marks_value('\u00b2') is None
+    
+    def test_per_subject_summary(self, parsed):
+        """Test mean, pass rate and histogram for one subject"""
+        aggregator = SubjectStatsAggregator()
+        aggregator.ingest(student(parsed, 'S1'))
+        aggregator.ingest(student(parsed, 'S2', marks_offset=10, grade='O'))
+        code = parsed['subjects'][0]['code']
+        base = float(parsed['subjects'][0]['marks'])
+        
+        stats = aggregator.get('2022', code)
+        
+        assert stats['attempts'] == 2
+        assert stats['marks']['mean'] == pytest.approx(base + 5)
+        assert stats['marks']['stdDev'] == pytest.approx(5)
+        assert stats['gradeHistogram']['O'] == 1
+        assert aggregator.get('2022', 'NOPE') is None
+    
+    def test_reingest_replaces_contribution(self, parsed):
+        """Test that a re-fetched student is not counted twice"""
+        aggregator = SubjectStatsAggregator()
+        aggregator.ingest(student(parsed, 'S1'))
+        aggregator.ingest(student(parsed, 'S1', marks_offset=4))
+        code = parsed['subjects'][0]['code']
+        
+        stats = aggregator.get('2022', code)
+        
+        assert stats['attempts'] == 1
+        assert stats['marks']['mean'] == pytest.approx(float(parsed['subjects'][0]['marks']) + 4)
+        assert stats['marks']['stdDev'] == pytest.approx(0)
+    
+    def test_failed_subject_pass_rate(self, parsed):
+        """Test that the fixture's failed subject shows in the pass rate"""
+        aggregator = SubjectStatsAggregator()
+        aggregator.ingest(parsed)
+        
+        assert aggregator.get('2022', 'MA102')['passRate'] == 0
+        assert len(aggregator.batch_subjects('2022')) == 7
+    
+    def test_merge_via_dicts(self, parsed):
+        """Test that serialised worker aggregators merge into the combined view"""
+        worker_a, worker_b, combined = SubjectStatsAggregator(), SubjectStatsAggregator(), SubjectStatsAggregator()
+        for i in range(6):
+            data = student(parsed, f"S{i}", marks_offset=i)
+            (worker_a if i % 2 else worker_b).ingest(data)
+            combined.ingest(data)
+        
+        merged = SubjectStatsAggregator.from_dict(json.loads(json.dumps(worker_a.to_dict())))
+        merged.merge(SubjectStatsAggregator.from_dict(worker_b.to_dict()))
+        
+        for expected in combined.batch_subjects('2022'):
+            assert merged.get('2022', expected['code']) == expected